@@ -8,6 +8,32 @@ class Settings(BaseSettings):
     ADMIN_PASSWORD: str
     OTP_EXPIRY_MINUTES: int = 180
     TEST_DURATION_MINUTES: int = 60
+    QUESTION_POOL_TTL_SECONDS: int = 300
+    JOB_WORKERS: int = 2
+    JOB_RETENTION_HOURS: int = 24
+    JOBS_DIR: str = ""
+    SESSION_STORE_BACKEND: str = "memory"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: int = 30
+    ANSWER_WRITE_BEHIND: bool = False
+    ANSWER_FLUSH_INTERVAL_MS: int = 200
+    ANSWER_FLUSH_MAX_ROWS: int = 500
+    SESSION_SWEEP_INTERVAL_SECONDS: int = 60
+    ADMIN_TOKEN_EXPIRY_MINUTES: int = 720
+    ADMIN_TOKEN_CACHE_SIZE: int = 256
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""
+    LOG_FORMAT: str = "text"
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0
+    LOG_QUEUE_SIZE: int = 10000
+    METRICS_ENABLED: bool = True
+    SQL_PROFILER_ENABLED: bool = False
+    SQL_PROFILER_REPEAT_THRESHOLD: int = 5
+    ADMIN_PAGE_SIZE: int = 100
+    ADMIN_MAX_PAGE_SIZE: int = 1000
+    ADMIN_COUNT_CACHE_TTL_SECONDS: int = 30
     
     class Config:
         env_file = ".env"
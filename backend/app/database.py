@@ -1,22 +1,207 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Optional
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool, AsyncAdaptedQueuePool
 from app.config import get_settings
 from app.logger import get_logger
+from app.metrics import record_query
+from app.profiler import profile_query
 from app.exceptions import DatabaseException
 
 logger = get_logger("database")
 settings = get_settings()
 
+
+def get_async_database_url(url: str) -> str:
+    """
+    Sync DATABASE_URL'ni async drayverga moslash
+
+    postgresql -> postgresql+asyncpg, sqlite -> sqlite+aiosqlite
+    """
+    scheme, _, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect == "postgresql":
+        return f"postgresql+asyncpg://{rest}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+
+class PoolMetrics:
+    """Ulanishlar pool'i statistikasi: checkout kutish vaqti, band ulanishlar va overflow"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_count = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.peak_overflow = 0
+
+    def record_wait(self, elapsed_ms: float, overflow: int = 0, timed_out: bool = False) -> None:
+        """Pool'dan ulanish olish uchun ketgan vaqtni yozish"""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.wait_count += 1
+            self.wait_total_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def on_checkout(self, *args) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def on_checkin(self, *args) -> None:
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def snapshot(self, pool: Pool) -> dict:
+        """Pool holati va yig'ilgan statistika"""
+        with self._lock:
+            data = {
+                "pool_class": type(pool).__name__,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else None,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "peak_overflow": self.peak_overflow,
+            }
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                timeout=pool.timeout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0)
+            )
+        return data
+
+
+class TimedPoolMixin:
+    """Pool'dan ulanish olish (checkout) vaqtini PoolMetrics'ga yozuvchi mixin"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            if self.metrics:
+                self.metrics.record_wait(0.0, timed_out=True)
+            raise
+        if self.metrics:
+            self.metrics.record_wait((time.perf_counter() - started) * 1000, max(self.overflow(), 0))
+        return connection
+
+    def recreate(self):
+        # dispose() pool'ni qayta yaratadi, metrika obyekti saqlanib qolishi kerak
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_pool_options(url: str, is_async: bool = False) -> dict:
+    """
+    Settings'dagi pool sozlamalari bo'yicha create_engine argumentlari
+
+    SQLite uchun SQLAlchemy'ning standart pool'i qoldiriladi (:memory:
+    va aiosqlite boshqa pool klasslarini talab qiladi).
+    """
+    if url.split(":", 1)[0].split("+")[0] == "sqlite":
+        return {}
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+def instrument_pool(target_engine, metrics: PoolMetrics) -> None:
+    """Engine pool'iga checkout/checkin hodisalari va vaqt o'lchovini ulash"""
+    event.listen(target_engine, "checkout", metrics.on_checkout)
+    event.listen(target_engine, "checkin", metrics.on_checkin)
+    if isinstance(target_engine.pool, TimedPoolMixin):
+        target_engine.pool.metrics = metrics
+
+
+pool_metrics = {"sync": PoolMetrics(), "async": PoolMetrics()}
+
+
+def instrument_queries(target_engine, name: str) -> None:
+    """Har bir SQL so'rov vaqtini /metrics ga, joriy HTTP so'rov statistikasiga va profilga yozish"""
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"]
+        record_query(name, elapsed)
+        profile_query(statement, elapsed)
+
+    event.listen(target_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(target_engine, "after_cursor_execute", after_cursor_execute)
+
+
 # Database engine yaratish
 try:
-    logger.info(f"Database'ga ulanish: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'local'}")
-    engine = create_engine(settings.DATABASE_URL, echo=False, pool_pre_ping=True)
+    logger.info(
+        "Database'ga ulanish: %s",
+        settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'local'
+    )
+    engine = create_engine(
+        settings.DATABASE_URL,
+        echo=False,
+        pool_pre_ping=True,
+        **get_pool_options(settings.DATABASE_URL)
+    )
+    instrument_pool(engine, pool_metrics["sync"])
+    instrument_queries(engine, "sync")
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    # Async engine (talabalar uchun endpoint'lar). expire_on_commit=False:
+    # commit'dan keyin atributlarni o'qish yashirin so'rov yubormasligi uchun
+    async_database_url = get_async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        async_database_url,
+        echo=False,
+        pool_pre_ping=True,
+        **get_pool_options(async_database_url, is_async=True)
+    )
+    instrument_pool(async_engine.sync_engine, pool_metrics["async"])
+    instrument_queries(async_engine.sync_engine, "async")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
     Base = declarative_base()
     logger.info("Database engine muvaffaqiyatli yaratildi")
 except Exception as e:
-    logger.error(f"Database engine yaratishda xatolik: {str(e)}", exc_info=True)
+    logger.error("Database engine yaratishda xatolik: %s", e, exc_info=True)
     raise DatabaseException("Database'ga ulanib bo'lmadi", detail=str(e))
 
 
@@ -34,8 +219,38 @@ def get_db():
     try:
         yield db
     except SQLAlchemyError as e:
-        logger.error(f"Database session xatosi: {str(e)}", exc_info=True)
+        logger.error("Database session xatosi: %s", e, exc_info=True)
         db.rollback()
         raise DatabaseException("Database operatsiyasida xatolik", detail=str(e))
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_pool_stats() -> dict:
+    """Sync va async engine pool'lari statistikasi"""
+    return {
+        "sync": pool_metrics["sync"].snapshot(engine.pool),
+        "async": pool_metrics["async"].snapshot(async_engine.sync_engine.pool),
+    }
+
+
+async def get_async_db():
+    """
+    Async database session yaratish va boshqarish
+
+    Sync servislar kerak bo'lganda `await db.run_sync(Service.method, ...)`
+    orqali chaqiriladi: ular threadpool'siz, shu ulanishda bajariladi.
+
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+
+    Raises:
+        DatabaseException: Database bilan muammo bo'lsa
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except SQLAlchemyError as e:
+            logger.error("Database session xatosi: %s", e, exc_info=True)
+            await db.rollback()
+            raise DatabaseException("Database operatsiyasida xatolik", detail=str(e))
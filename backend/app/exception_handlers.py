@@ -14,7 +14,8 @@ logger = get_logger("exception_handlers")
 async def app_exception_handler(request: Request, exc: AppException) -> JSONResponse:
     """Custom exception'lar uchun handler"""
     logger.error(
-        f"AppException: {exc.message}",
+        "AppException: %s",
+        exc.message,
         extra={
             "status_code": exc.status_code,
             "detail": exc.detail,
@@ -44,7 +45,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         })
 
     logger.warning(
-        f"Validation error: {errors}",
+        "Validation error: %s",
+        errors,
         extra={
             "path": request.url.path,
             "method": request.method
@@ -75,7 +77,8 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError) -
             error_message = "Ma'lumotlar yaxlitligi buzildi"
 
     logger.error(
-        f"Database error: {str(exc)}",
+        "Database error: %s",
+        exc,
         extra={
             "path": request.url.path,
             "method": request.method,
@@ -97,7 +100,8 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError) -
 async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Barcha boshqa exception'lar uchun handler"""
     logger.error(
-        f"Unhandled exception: {str(exc)}",
+        "Unhandled exception: %s",
+        exc,
         extra={
             "path": request.url.path,
             "method": request.method,
@@ -1,76 +1,229 @@
 """
 Logging konfiguratsiyasi
 Test platformasi uchun logging tizimi
+
+Modul logger'lari (`test_platform.<modul>`) o'z handler'lariga ega emas:
+yozuvlar "test_platform" logger'idagi bitta QueueHandler orqali navbatga
+tushadi va fon thread'idagi QueueListener ularni formatlab konsol hamda
+fayllarga yozadi. So'rov thread'i faqat yozuvni navbatga qo'yadi.
+
+Xabarlar `%` uslubidagi argumentlar bilan yoziladi
+(`logger.info("Sessiya: id=%s", session_id)`) va faqat yozuvchi thread'da
+formatlanadi, shuning uchun argumentlar keyin o'zgartirilmaydigan qiymatlar
+bo'lishi kerak.
 """
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
+from typing import Optional
+from app.config import get_settings
 
 
 # Logs papkasini yaratish
 LOGS_DIR = Path(__file__).parent.parent / "logs"
 LOGS_DIR.mkdir(exist_ok=True)
 
+ROOT_LOGGER_NAME = "test_platform"
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# LogRecord'ning standart atributlari: qolganlari `extra` orqali berilgan
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Har bir yozuvni bitta JSON qatori sifatida formatlash"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "func": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """DEBUG yozuvlarining faqat rate qismini o'tkazish (yuqori hajmli hodisalar uchun)"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        return random.random() < self.rate
 
-def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
+
+class NonBlockingQueueHandler(QueueHandler):
     """
-    Logger'ni sozlash
+    Yozuvni formatlamasdan navbatga qo'yuvchi handler
 
-    Args:
-        name: Logger nomi
-        level: Logging darajasi
+    Standart QueueHandler.prepare xabarni chaqiruvchi thread'da formatlaydi;
+    bu yerda formatlash QueueListener thread'iga qoldiriladi. Navbat to'lsa
+    yozuv kutmasdan tashlanadi va `dropped` da sanaladi.
+    """
 
-    Returns:
-        Konfiguratsiya qilingan logger
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_levels(value: str) -> dict[str, int]:
     """
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
+    Modullar bo'yicha darajalarni o'qish
 
-    # Agar handler'lar allaqachon qo'shilgan bo'lsa, qaytadan qo'shmaslik
-    if logger.handlers:
-        return logger
+    Misol: "test_service=DEBUG,database=WARNING" ->
+    {"test_service": 10, "database": 30}
 
-    # Format
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    Noto'g'ri yozuvlar (nomsiz yoki noma'lum daraja) ilovani to'xtatmaydi:
+    ogohlantirish bilan o'tkazib yuboriladi.
+    """
+    levels = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        level_number = logging.getLevelName(level.strip().upper())
+        if not name.strip() or not isinstance(level_number, int):
+            logging.getLogger(f"{ROOT_LOGGER_NAME}.logger").warning(
+                "LOG_LEVELS'dagi noto'g'ri yozuv o'tkazib yuborildi: %r", item.strip()
+            )
+            continue
+        levels[name.strip()] = level_number
+    return levels
+
+
+def create_handlers(log_format: str = "text", directory: Path = LOGS_DIR, stream=None) -> list[logging.Handler]:
+    """Konsol, app.log va errors.log handler'lari"""
+    if log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(fmt=TEXT_FORMAT, datefmt=DATE_FORMAT)
 
     # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    console_handler = logging.StreamHandler(stream or sys.stdout)
 
     # File handler - Barcha loglar
     file_handler = RotatingFileHandler(
-        LOGS_DIR / "app.log",
+        directory / "app.log",
         maxBytes=10 * 1024 * 1024,  # 10MB
         backupCount=5,
         encoding='utf-8'
     )
-    file_handler.setLevel(level)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
     # File handler - Faqat xatolar
     error_handler = RotatingFileHandler(
-        LOGS_DIR / "errors.log",
+        directory / "errors.log",
         maxBytes=10 * 1024 * 1024,  # 10MB
         backupCount=5,
         encoding='utf-8'
     )
     error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(formatter)
-    logger.addHandler(error_handler)
 
-    return logger
+    handlers = [console_handler, file_handler, error_handler]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+class LoggingPipeline:
+    """Bitta QueueHandler va uni o'quvchi QueueListener (fon yozuvchisi)"""
+
+    def __init__(self):
+        self.handler: Optional[NonBlockingQueueHandler] = None
+        self.listener: Optional[QueueListener] = None
+        self.levels: dict[str, int] = {}
+
+    def setup(
+        self,
+        level: str = "INFO",
+        levels: str = "",
+        log_format: str = "text",
+        debug_sample_rate: float = 1.0,
+        queue_size: int = 10000,
+        handlers: Optional[list[logging.Handler]] = None
+    ) -> logging.Logger:
+        """
+        "test_platform" logger'ini navbat orqali yozadigan qilib sozlash
+
+        Qayta chaqirilsa avvalgi listener to'xtatilib, yangisi o'rnatiladi.
+        """
+        self.stop()
+
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        root.setLevel(logging.getLevelName(level.upper()))
+        # Yozuvlar Python root logger'iga ikkinchi marta chiqmasligi uchun
+        root.propagate = False
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        self.handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.handler.addFilter(DebugSamplingFilter(debug_sample_rate))
+        root.addHandler(self.handler)
+
+        self.listener = QueueListener(
+            self.handler.queue,
+            *(handlers if handlers is not None else create_handlers(log_format)),
+            respect_handler_level=True
+        )
+        self.listener.start()
+
+        self.levels = parse_levels(levels)
+        for name, module_level in self.levels.items():
+            logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}").setLevel(module_level)
+        return root
+
+    def stop(self) -> None:
+        """Navbatdagi yozuvlarni yozib, listener'ni to'xtatish"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+
+pipeline = LoggingPipeline()
+
+
+def setup_logging() -> logging.Logger:
+    """Settings bo'yicha logging'ni sozlash"""
+    settings = get_settings()
+    return pipeline.setup(
+        level=settings.LOG_LEVEL,
+        levels=settings.LOG_LEVELS,
+        log_format=settings.LOG_FORMAT,
+        debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+        queue_size=settings.LOG_QUEUE_SIZE
+    )
 
 
 # Asosiy logger
-app_logger = setup_logger("test_platform", logging.INFO)
+app_logger = setup_logging()
+atexit.register(pipeline.stop)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -83,4 +236,4 @@ def get_logger(name: str) -> logging.Logger:
     Returns:
         Logger instance
     """
-    return setup_logger(f"test_platform.{name}", logging.INFO)
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
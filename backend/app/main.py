@@ -1,9 +1,14 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
-from app.database import Base, engine
+from app.config import get_settings
+from app.database import async_engine
 from app.routers import admin, student, test
+from app.services.answer_buffer import answer_buffer
+from app.services.job_service import job_manager
+from app.services.session_sweeper import session_sweeper, deadline_scheduler
 from app.exceptions import AppException
 from app.exception_handlers import (
     app_exception_handler,
@@ -12,22 +17,40 @@ from app.exception_handlers import (
     general_exception_handler
 )
 from app.logger import get_logger
+from app.metrics import registry
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiler import QueryProfilerMiddleware
 
 logger = get_logger("main")
+settings = get_settings()
 
-# Bazani yaratish
-try:
-    logger.info("Database jadvallarini yaratish boshlandi")
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database jadvallar muvaffaqiyatli yaratildi")
-except Exception as e:
-    logger.error(f"Database yaratishda xatolik: {str(e)}", exc_info=True)
-    raise
+# Database sxemasi ishga tushishda yaratilmaydi: deploy'dan oldin
+# `python manage.py migrate` bir marta bajariladi (app/migrations.py)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Fon xizmatlarini ishga tushirish va to'xtashda javoblarni yo'qotmasdan yopish"""
+    if settings.ANSWER_WRITE_BEHIND:
+        answer_buffer.start()
+    if settings.SESSION_SWEEP_INTERVAL_SECONDS > 0:
+        session_sweeper.start()
+    deadline_scheduler.start()
+    # Oldingi ishga tushirishdan qolgan eski vazifalar va yuklangan fayllar
+    job_manager.prune()
+    yield
+    deadline_scheduler.stop()
+    session_sweeper.stop()
+    if settings.ANSWER_WRITE_BEHIND:
+        answer_buffer.stop()
+    job_manager.shutdown()
+    await async_engine.dispose()
+    logger.info("Application to'xtatildi")
 
 app = FastAPI(
     title="Test Platform API",
     description="Kollej o'quvchilar uchun test platformasi",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Exception handler'larni ro'yxatdan o'tkazish
@@ -43,8 +66,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Admin ro'yxatlari paginatsiyasi (frontend o'qishi uchun)
+    expose_headers=["X-Next-After-Id", "X-Total-Count"],
 )
 
+# Metrikalar: har bir so'rov soni, davomiyligi va SQL so'rovlari (/metrics)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# SQL profilovchi: Server-Timing sarlavhasi va N+1 ogohlantirishlari (faqat diagnostika uchun)
+if settings.SQL_PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware)
+
 # Routerlarni qo'shish
 app.include_router(admin.router)
 app.include_router(student.router)
@@ -62,6 +95,12 @@ def health_check():
     logger.debug("Health check endpoint chaqirildi")
     return {"status": "ok"}
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus text formatidagi metrikalar"""
+        return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
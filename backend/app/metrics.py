@@ -0,0 +1,269 @@
+"""
+Ilova metrikalari (Prometheus text formatida)
+
+Har bir metrika qiymatlari thread'lar bo'yicha bo'lingan (shard): har bir
+thread faqat o'z lug'atini o'zgartiradi, shuning uchun yozishda lock
+ishlatilmaydi. Lock faqat thread birinchi marta yozganda (shard
+ro'yxatdan o'tishi) va /metrics o'qilganda kerak bo'ladi. Histogramma
+bucket'lari har bir label to'plami uchun oldindan ajratilgan ro'yxatda.
+"""
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+# HTTP so'rov davomiyligi uchun bucket'lar (soniya)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bitta SQL so'rov davomiyligi uchun bucket'lar (soniya)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Bitta HTTP so'rovdagi SQL so'rovlar soni uchun bucket'lar
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    """Thread'lar bo'yicha bo'lingan qiymatlar: har bir thread o'z lug'atiga yozadi"""
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def _snapshots(self) -> list[dict]:
+        with self._lock:
+            # dict.copy() CPython'da atomik: yozayotgan thread bilan to'qnashmaydi
+            return [shard.copy() for shard in self._shards]
+
+    def reset(self) -> None:
+        with self._lock:
+            for shard in self._shards:
+                shard.clear()
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        ...
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> dict[tuple, float]:
+        totals: dict[tuple, float] = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def value(self, labels: tuple = ()) -> float:
+        return self.values().get(labels, 0)
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.values().items())
+        ]
+
+
+class Gauge(Counter):
+    """Oshib-kamayuvchi qiymat (shard'lar yig'indisi)"""
+
+    type = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    """
+    Bucket'lari oldindan ajratilgan histogramma
+
+    Har bir label to'plami uchun ro'yxat: [bucket_0, ..., bucket_n, +Inf, sum].
+    Bucket'larga kumulyativ bo'lmagan sonlar yoziladi, render'da yig'iladi.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            counts = shard[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def values(self) -> dict[tuple, list]:
+        totals: dict[tuple, list] = {}
+        for shard in self._snapshots():
+            for labels, counts in shard.items():
+                total = totals.setdefault(labels, [0] * len(counts))
+                for i, count in enumerate(list(counts)):
+                    total[i] += count
+        return totals
+
+    def render(self) -> list[str]:
+        lines = []
+        for labels, counts in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrikalar ro'yxati va Prometheus text formatida chiqarish"""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], list[str]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], list[str]]) -> None:
+        """/metrics o'qilganda hisoblanadigan qo'shimcha qatorlar"""
+        self._collectors.append(collector)
+
+    def reset(self) -> None:
+        for metric in self._metrics:
+            metric.reset()
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+class RequestDbStats:
+    """Bitta HTTP so'rovdagi SQL so'rovlar soni va vaqti"""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# MetricsMiddleware har bir so'rov uchun o'rnatadi, engine event'lari to'ldiradi
+request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP so'rovlar soni", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP so'rov davomiyligi", ("method", "route")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "Bajarilayotgan HTTP so'rovlar"
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries", "Bitta HTTP so'rovdagi SQL so'rovlar soni", ("route",), QUERY_COUNT_BUCKETS
+)
+http_request_db_seconds = registry.counter(
+    "http_request_db_seconds_total", "HTTP so'rovlar ichida SQL so'rovlarga ketgan vaqt", ("route",)
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "Bitta SQL so'rov davomiyligi", ("engine",), QUERY_BUCKETS
+)
+cache_requests = registry.counter(
+    "cache_requests_total", "Kesh murojaatlari", ("cache", "result")
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    cache_requests.inc((cache, "hit" if hit else "miss"))
+
+
+def _cache_hit_ratios() -> list[str]:
+    totals: dict[str, list[float]] = {}
+    for (cache, result), value in cache_requests.values().items():
+        total = totals.setdefault(cache, [0, 0])
+        total[0 if result == "hit" else 1] += value
+    lines = [
+        "# HELP cache_hit_ratio Kesh murojaatlaridan topilganlari ulushi",
+        "# TYPE cache_hit_ratio gauge",
+    ]
+    for cache, (hits, misses) in sorted(totals.items()):
+        lines.append(f'cache_hit_ratio{{cache="{_escape(cache)}"}} {round(hits / (hits + misses), 4)}')
+    return lines
+
+
+registry.add_collector(_cache_hit_ratios)
+
+
+def record_query(engine: str, elapsed: float) -> None:
+    """Engine event'idan: SQL so'rov vaqtini yozish va joriy HTTP so'rovga qo'shish"""
+    db_query_duration.observe(elapsed, (engine,))
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+def record_request(method: str, route: str, status: int, elapsed: float, stats: RequestDbStats) -> None:
+    http_requests.inc((method, route, str(status)))
+    http_request_duration.observe(elapsed, (method, route))
+    http_request_db_queries.observe(stats.queries, (route,))
+    http_request_db_seconds.inc((route,), stats.seconds)
@@ -1,7 +1,16 @@
-from fastapi import HTTPException, status
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
 from app.config import get_settings
 from app.logger import get_logger
-from app.exceptions import AuthenticationException
+from app.metrics import record_cache
 
 logger = get_logger("auth_middleware")
 settings = get_settings()
@@ -16,17 +25,106 @@ def verify_admin_credentials(login: str, password: str) -> bool:
 
     Returns:
         bool: To'g'ri bo'lsa True, aks holda False
-
-    Raises:
-        AuthenticationException: Autentifikatsiya xatosi
     """
-    logger.info(f"Admin autentifikatsiya urinishi: login={login}")
+    logger.info("Admin autentifikatsiya urinishi: login=%s", login)
 
-    is_valid = login == settings.ADMIN_LOGIN and password == settings.ADMIN_PASSWORD
+    is_valid = (
+        hmac.compare_digest(login.encode(), settings.ADMIN_LOGIN.encode())
+        and hmac.compare_digest(password.encode(), settings.ADMIN_PASSWORD.encode())
+    )
 
     if is_valid:
-        logger.info(f"Admin muvaffaqiyatli autentifikatsiya qilindi: {login}")
+        logger.info("Admin muvaffaqiyatli autentifikatsiya qilindi: %s", login)
     else:
-        logger.warning(f"Admin autentifikatsiya xatosi: login={login}")
+        logger.warning("Admin autentifikatsiya xatosi: login=%s", login)
+
+    return is_valid
+
+
+class AdminTokenCache:
+    """Yaqinda tekshirilgan tokenlar (LRU): token -> amal qilish muddati (unix vaqt)"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._tokens: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def get(self, token: str) -> Optional[float]:
+        with self._lock:
+            expires = self._tokens.get(token)
+            if expires is not None:
+                self._tokens.move_to_end(token)
+        record_cache("admin_token", expires is not None)
+        return expires
+
+    def put(self, token: str, expires: float) -> None:
+        with self._lock:
+            self._tokens[token] = expires
+            self._tokens.move_to_end(token)
+            while len(self._tokens) > self.max_size:
+                self._tokens.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+
+admin_token_cache = AdminTokenCache(max_size=settings.ADMIN_TOKEN_CACHE_SIZE)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).digest()
+    return _b64encode(digest)
+
+def create_admin_token(login: str) -> tuple[str, datetime]:
+    """
+    SECRET_KEY bilan imzolangan, muddatli admin tokeni yaratish
+
+    Token `payload.imzo` ko'rinishida: payload - {"sub": login, "exp": unix vaqt}
+    JSON'ining base64url'i, imzo - uning HMAC-SHA256'i.
+
+    Returns:
+        tuple: (token, amal qilish muddati)
+    """
+    expires = int(time.time()) + settings.ADMIN_TOKEN_EXPIRY_MINUTES * 60
+    payload = _b64encode(json.dumps({"sub": login, "exp": expires}, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}", datetime.utcfromtimestamp(expires)
+
+def verify_admin_token(token: str) -> bool:
+    """
+    Admin tokenini tekshirish
+
+    Yaqinda tekshirilgan tokenlar uchun imzo qayta hisoblanmaydi, faqat
+    muddati solishtiriladi. Muvaffaqiyatli tekshiruv log yozmaydi.
+
+    Returns:
+        bool: Imzo to'g'ri va muddati o'tmagan bo'lsa True
+    """
+    now = time.time()
+    expires = admin_token_cache.get(token)
+    if expires is not None:
+        return now < expires
+
+    payload, _, signature = token.partition(".")
+    if not signature or not hmac.compare_digest(_sign(payload).encode(), signature.encode()):
+        return False
+    try:
+        claims = json.loads(_b64decode(payload))
+        expires = float(claims["exp"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        return False
+    # ADMIN_LOGIN o'zgarsa eski tokenlar yaroqsiz bo'ladi
+    if claims.get("sub") != settings.ADMIN_LOGIN or now >= expires:
+        return False
 
-    return is_valid
\ No newline at end of file
+    admin_token_cache.put(token, expires)
+    return True
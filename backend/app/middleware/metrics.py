@@ -0,0 +1,49 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.metrics import RequestDbStats, http_requests_in_flight, record_request, request_db_stats
+
+# Hech bir route'ga mos kelmagan so'rovlar (404) uchun label: yo'llar soni cheksiz bo'lmasligi kerak
+UNMATCHED_ROUTE = "unmatched"
+
+class MetricsMiddleware:
+    """
+    Har bir HTTP so'rov uchun soni, davomiyligi va SQL so'rovlarini yozuvchi ASGI middleware
+
+    Route label'i shablon bo'yicha (`/api/test/session/{session_id}`), FastAPI
+    so'rovni route'ga moslaganda scope'ga qo'ygan `route` dan olinadi.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestDbStats()
+        token = request_db_stats.set(stats)
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            request_db_stats.reset(token)
+            route = scope.get("route")
+            record_request(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status,
+                elapsed,
+                stats
+            )
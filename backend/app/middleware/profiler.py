@@ -0,0 +1,57 @@
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.profiler import QueryProfile, current_profile
+from app.middleware.metrics import UNMATCHED_ROUTE
+from app.logger import get_logger
+
+logger = get_logger("sql_profiler")
+
+class QueryProfilerMiddleware:
+    """
+    Har bir HTTP so'rovning SQL so'rovlarini profillovchi ASGI middleware
+
+    Javobga `Server-Timing` sarlavhasi qo'shiladi va so'rov tugagach bitta
+    xulosa qatori yoziladi; takrorlangan shakllar (N+1) WARNING bilan.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            self._log(scope, status, profile, time.perf_counter() - started)
+
+    @staticmethod
+    def _log(scope: Scope, status: int, profile: QueryProfile, elapsed: float) -> None:
+        route = scope.get("route")
+        path = route.path if route is not None else UNMATCHED_ROUTE
+        logger.info(
+            "SQL profil: %s %s status=%s queries=%s db=%.1fms vaqt=%.1fms",
+            scope["method"], path, status, profile.total_queries, profile.total_seconds * 1000, elapsed * 1000
+        )
+        for shape, count, seconds in profile.repeated():
+            logger.warning(
+                "N+1 gumoni: %s %s: %sx (%.1fms) %s",
+                scope["method"], path, count, seconds * 1000, shape
+            )
@@ -0,0 +1,189 @@
+"""
+Versiyalangan database migratsiyalari
+Migratsiyalar backend/migrations papkasida `NNNN_nom.sql` yoki `NNNN_nom.py`
+ko'rinishida saqlanadi va deploy'dan oldin bir marta `python manage.py migrate`
+bilan qo'llaniladi. Qo'llangan versiyalar schema_migrations jadvalida yoziladi.
+
+SQL fayllarda `-- downgrade` qatoridan keyingi qism orqaga qaytarish uchun.
+Python fayllarda `upgrade(connection)` va `downgrade(connection)` funksiyalari bo'ladi.
+"""
+import importlib.util
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from app.database import Base
+from app.logger import get_logger
+from app.exceptions import ValidationException
+
+logger = get_logger("migrations")
+
+MIGRATIONS_DIR = Path(__file__).parent.parent / "migrations"
+
+_FILENAME_PATTERN = re.compile(r"^(\d{4})_(\w+)\.(sql|py)$")
+_DOWNGRADE_MARKER = re.compile(r"^--\s*downgrade\s*$", re.IGNORECASE | re.MULTILINE)
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String(32), primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+
+def _split_sql(script: str) -> list[str]:
+    """SQL skriptni izohlarsiz alohida buyruqlarga ajratish"""
+    lines = [line for line in script.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+class Migration:
+    """Bitta migratsiya fayli"""
+
+    def __init__(self, path: Path):
+        match = _FILENAME_PATTERN.match(path.name)
+        self.path = path
+        self.version = match.group(1)
+        self.name = match.group(2)
+        self.kind = match.group(3)
+
+    def upgrade(self, connection: Connection) -> None:
+        self._run(connection, "upgrade")
+
+    def downgrade(self, connection: Connection) -> None:
+        self._run(connection, "downgrade")
+
+    def _run(self, connection: Connection, direction: str) -> None:
+        if self.kind == "py":
+            spec = importlib.util.spec_from_file_location(f"migration_{self.version}", self.path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            getattr(module, direction)(connection)
+            return
+
+        parts = _DOWNGRADE_MARKER.split(self.path.read_text(encoding="utf-8"), maxsplit=1)
+        script = parts[0] if direction == "upgrade" else (parts[1] if len(parts) > 1 else "")
+        for statement in _split_sql(script):
+            connection.exec_driver_sql(statement)
+
+
+def discover_migrations(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """Papkadagi migratsiyalarni versiya bo'yicha tartiblab qaytarish"""
+    migrations = [Migration(path) for path in directory.iterdir() if _FILENAME_PATTERN.match(path.name)]
+    migrations.sort(key=lambda migration: migration.version)
+
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValidationException(f"Takroriy migratsiya versiyasi: {directory}")
+    return migrations
+
+
+def load_models() -> None:
+    """Base.metadata to'liq bo'lishi uchun barcha modellarni import qilish"""
+    from app.models import group, student, subject, topic, test, question, test_session, answer, result  # noqa: F401
+
+
+class MigrationRunner:
+    """Migratsiyalarni qo'llash, orqaga qaytarish va holatini ko'rsatish"""
+
+    def __init__(self, engine: Engine, directory: Path = MIGRATIONS_DIR):
+        self.engine = engine
+        self.migrations = discover_migrations(directory)
+
+    def applied_versions(self) -> set[str]:
+        if not inspect(self.engine).has_table(schema_migrations.name):
+            return set()
+        with self.engine.connect() as connection:
+            return set(connection.scalars(select(schema_migrations.c.version)))
+
+    def pending(self) -> list[Migration]:
+        applied = self.applied_versions()
+        return [migration for migration in self.migrations if migration.version not in applied]
+
+    def status(self) -> list[dict]:
+        applied = self.applied_versions()
+        return [
+            {"version": migration.version, "name": migration.name, "applied": migration.version in applied}
+            for migration in self.migrations
+        ]
+
+    def _initialize(self) -> bool:
+        """
+        schema_migrations jadvali yo'q bo'lsa uni yaratish
+
+        Bo'sh database'da sxema modellardan yaratiladi va barcha migratsiyalar
+        qo'llangan deb belgilanadi. Jadvallari bor (migratsiyadan oldingi)
+        database'da esa migratsiyalar odatdagidek qo'llaniladi.
+
+        Returns:
+            bool: Sxema modellardan yaratilgan bo'lsa True
+        """
+        inspector = inspect(self.engine)
+        if inspector.has_table(schema_migrations.name):
+            return False
+
+        load_models()
+        is_empty = not any(inspector.has_table(table) for table in Base.metadata.tables)
+        with self.engine.begin() as connection:
+            schema_migrations.create(connection)
+            if is_empty:
+                Base.metadata.create_all(connection)
+                for migration in self.migrations:
+                    self._record(connection, migration)
+        if is_empty:
+            logger.info("Sxema modellardan yaratildi, migratsiyalar belgilandi: %s", len(self.migrations))
+        return is_empty
+
+    def _record(self, connection: Connection, migration: Migration) -> None:
+        connection.execute(schema_migrations.insert().values(
+            version=migration.version,
+            name=migration.name,
+            applied_at=datetime.utcnow()
+        ))
+
+    def upgrade(self, target: Optional[str] = None) -> list[str]:
+        """
+        Qo'llanmagan migratsiyalarni (target versiyagacha) qo'llash
+
+        Har bir migratsiya alohida tranzaksiyada bajariladi.
+
+        Returns:
+            list[str]: Qo'llangan versiyalar
+        """
+        if self._initialize():
+            return [migration.version for migration in self.migrations]
+
+        applied = []
+        for migration in self.pending():
+            if target and migration.version > target:
+                break
+            logger.info("Migratsiya qo'llanmoqda: %s_%s", migration.version, migration.name)
+            with self.engine.begin() as connection:
+                migration.upgrade(connection)
+                self._record(connection, migration)
+            applied.append(migration.version)
+        return applied
+
+    def downgrade(self, target: str) -> list[str]:
+        """
+        target versiyadan keyingi qo'llangan migratsiyalarni teskari tartibda qaytarish
+
+        Returns:
+            list[str]: Qaytarilgan versiyalar
+        """
+        applied_versions = self.applied_versions()
+        reverted = []
+        for migration in reversed(self.migrations):
+            if migration.version <= target or migration.version not in applied_versions:
+                continue
+            logger.info("Migratsiya qaytarilmoqda: %s_%s", migration.version, migration.name)
+            with self.engine.begin() as connection:
+                migration.downgrade(connection)
+                connection.execute(
+                    schema_migrations.delete().where(schema_migrations.c.version == migration.version)
+                )
+            reverted.append(migration.version)
+        return reverted
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
 class Answer(Base):
     __tablename__ = "answers"
+    __table_args__ = (
+        # Sessiya javoblari (natija hisoblash, sessiyani o'chirish);
+        # har bir savolga bitta javob - qayta yuborilgani upsert bilan almashtiriladi
+        Index("uq_answers_session_question", "test_session_id", "question_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     test_session_id = Column(Integer, ForeignKey("test_sessions.id"), nullable=False)
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
 class Result(Base):
     __tablename__ = "results"
+    __table_args__ = (
+        # Har bir o'quvchining har bir test bo'yicha bitta natijasi bor
+        Index("uq_results_student_test", "student_id", "test_id", unique=True),
+        # Admin natijalar ro'yxati: test bo'yicha filtr va id bo'yicha keyset
+        Index("ix_results_test_id", "test_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -7,7 +7,7 @@ class Student(Base):
     __tablename__ = "students"
     
     id = Column(Integer, primary_key=True, index=True)
-    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
+    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False, index=True)
     full_name = Column(String(255), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Table
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Table, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -12,6 +12,10 @@ test_topics = Table(
 
 class Test(Base):
     __tablename__ = "tests"
+    __table_args__ = (
+        # Admin testlar ro'yxati: fan bo'yicha filtr va id bo'yicha keyset
+        Index("ix_tests_subject_id", "subject_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=False)
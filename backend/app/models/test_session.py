@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -12,6 +12,12 @@ class SessionStatus(str, enum.Enum):
 
 class TestSession(Base):
     __tablename__ = "test_sessions"
+    __table_args__ = (
+        # OTPService.create_session: o'quvchining shu testdagi faol sessiyalari
+        Index("ix_test_sessions_student_test_status", "student_id", "test_id", "status"),
+        # Sessiyalar tozalovchisi: muddati o'tgan faol sessiyalar
+        Index("ix_test_sessions_status_expires", "status", "expires_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -24,6 +30,10 @@ class TestSession(Base):
     expires_at = Column(DateTime, nullable=False)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
+    # Test tugashi kerak bo'lgan vaqt: started_at + Test.duration_minutes
+    deadline_at = Column(DateTime, nullable=True)
+    # OTP tasdiqlanganda tanlangan savollar: [[question_id, [option_id, ...]], ...]
+    question_set = Column(JSON, nullable=True)
     
     # Relationships
     student = relationship("Student", back_populates="test_sessions")
@@ -0,0 +1,114 @@
+"""
+SQL so'rovlar profilovchisi va N+1 aniqlovchi
+Engine event'lari har bir SQL so'rovni normallashtirilgan ko'rinishi
+(literal va parametrlarsiz) bo'yicha joriy profilga yozadi. Bitta so'rov
+ichida bir xil ko'rinish SQL_PROFILER_REPEAT_THRESHOLD martadan ko'p
+takrorlansa, bu N+1 gumoni sifatida belgilanadi.
+
+Profil HTTP so'rov uchun QueryProfilerMiddleware (SQL_PROFILER_ENABLED=true)
+orqali, testlarda esa `capture_queries()` orqali yoqiladi.
+"""
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|:\w+\b|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    SQL so'rovni shakliga keltirish: literal va parametrlar `?`, IN ro'yxatlari `(?...)`
+
+    Misol: "SELECT * FROM options WHERE question_id = 17" ->
+    "SELECT * FROM options WHERE question_id = ?"
+    """
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryProfile:
+    """Bitta HTTP so'rov (yoki test bloki) ichidagi SQL so'rovlar, shakllar bo'yicha guruhlangan"""
+
+    def __init__(self, repeat_threshold: Optional[int] = None):
+        self.repeat_threshold = repeat_threshold or settings.SQL_PROFILER_REPEAT_THRESHOLD
+        self.total_queries = 0
+        self.total_seconds = 0.0
+        # shakl -> [soni, jami vaqt]
+        self.shapes: dict[str, list] = {}
+
+    def add(self, statement: str, elapsed: float) -> None:
+        self.total_queries += 1
+        self.total_seconds += elapsed
+        shape = normalize_sql(statement)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            self.shapes[shape] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def repeated(self) -> list[tuple[str, int, float]]:
+        """N+1 gumoni: threshold'dan ko'p takrorlangan shakllar (ko'pidan kamiga)"""
+        found = [
+            (shape, count, seconds)
+            for shape, (count, seconds) in self.shapes.items()
+            if count > self.repeat_threshold
+        ]
+        return sorted(found, key=lambda item: item[1], reverse=True)
+
+    def server_timing(self, total_seconds: Optional[float] = None) -> str:
+        """Server-Timing sarlavhasi qiymati"""
+        value = f'db;dur={self.total_seconds * 1000:.1f};desc="{self.total_queries} queries"'
+        if total_seconds is not None:
+            value += f", app;dur={total_seconds * 1000:.1f}"
+        return value
+
+    def report(self) -> str:
+        """Testlar uchun: har bir shakl soni va vaqti"""
+        lines = [f"SQL so'rovlar: {self.total_queries}, vaqt={self.total_seconds * 1000:.1f}ms"]
+        for shape, (count, seconds) in sorted(self.shapes.items(), key=lambda item: item[1][0], reverse=True):
+            lines.append(f"  {count}x {seconds * 1000:.1f}ms  {shape}")
+        return "\n".join(lines)
+
+
+# QueryProfilerMiddleware har bir HTTP so'rov uchun o'rnatadi
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("current_profile", default=None)
+
+# capture_queries() bloklari: barcha thread'lardagi so'rovlarni yig'adi
+_captures: list[QueryProfile] = []
+
+
+def profile_query(statement: str, elapsed: float) -> None:
+    """Engine event'idan: so'rovni joriy profilga va ochiq capture'larga yozish"""
+    profile = current_profile.get()
+    if profile is not None:
+        profile.add(statement, elapsed)
+    for capture in _captures:
+        capture.add(statement, elapsed)
+
+
+@contextmanager
+def capture_queries(repeat_threshold: Optional[int] = None) -> Iterator[QueryProfile]:
+    """
+    Blok davomida bajarilgan barcha SQL so'rovlarni yig'ish
+
+    Context'ga bog'liq emas: TestClient ilovani boshqa thread'da ishlatsa ham
+    so'rovlar yig'iladi.
+    """
+    profile = QueryProfile(repeat_threshold)
+    _captures.append(profile)
+    try:
+        yield profile
+    finally:
+        _captures.remove(profile)
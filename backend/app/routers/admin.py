@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+import os
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.middleware.auth import verify_admin_credentials
+from app.config import get_settings
+from app.database import get_db, get_pool_stats
+from app.middleware.auth import verify_admin_credentials, create_admin_token, verify_admin_token
 from app.models.group import Group
 from app.models.student import Student
 from app.models.subject import Subject
@@ -9,14 +17,19 @@ from app.models.topic import Topic
 from app.models.test import Test
 from app.models.test_session import TestSession
 from app.models.result import Result
+from app.schemas.admin_schema import AdminLogin, AdminTokenResponse
 from app.schemas.group_schema import GroupCreate, GroupResponse, GroupWithStudents
 from app.schemas.student_schema import StudentCreate, StudentResponse
 from app.schemas.subject_schema import SubjectCreate, SubjectResponse
 from app.schemas.topic_schema import TopicCreate, TopicResponse
 from app.schemas.test_schema import TestCreate, TestResponse
+from app.schemas.result_schema import ResultListItem
 from app.services.otp_service import OTPService
 from app.services.import_service import ImportService
-from app.services.export_service import ExportService
+from app.services.export_service import ExportService, EXPORT_MEDIA_TYPES
+from app.services.question_pool import question_pool_cache
+from app.services.job_service import JobService, JobStatus, job_manager
+from app.services.pagination import Page, PaginationService, SORT_PATTERN, count_cache
 from app.logger import get_logger
 from app.exceptions import (
     NotFoundException,
@@ -27,14 +40,63 @@ from app.exceptions import (
 
 logger = get_logger("admin_router")
 router = APIRouter(prefix="/api/admin", tags=["admin"])
+settings = get_settings()
 
-def admin_auth(login: str = Query(...), password: str = Query(...)):
-    """Admin autentifikatsiyasi"""
-    if not verify_admin_credentials(login, password):
-        logger.warning(f"Noto'g'ri admin kirish urinishi: login={login}")
-        raise AuthenticationException("Admin login yoki parol xato")
+admin_token_scheme = HTTPBearer(auto_error=False)
+
+def admin_auth(credentials: Optional[HTTPAuthorizationCredentials] = Depends(admin_token_scheme)):
+    """Admin autentifikatsiyasi: `Authorization: Bearer <token>` sarlavhasi"""
+    if credentials is None or not verify_admin_token(credentials.credentials):
+        logger.warning("Noto'g'ri yoki muddati o'tgan admin tokeni")
+        raise AuthenticationException("Admin tokeni yaroqsiz yoki muddati o'tgan")
     return True
 
+@router.post("/login", response_model=AdminTokenResponse)
+def admin_login(credentials: AdminLogin):
+    """Admin login va paroli bilan token olish"""
+    if not verify_admin_credentials(credentials.login, credentials.password):
+        raise AuthenticationException("Admin login yoki parol xato")
+    token, expires_at = create_admin_token(credentials.login)
+    return AdminTokenResponse(access_token=token, expires_at=expires_at)
+
+class PageParams:
+    """
+    Ro'yxat endpoint'larining keyset paginatsiya parametrlari
+
+    Keyingi sahifa kursori `X-Next-After-Id`, umumiy son (include_total=true
+    bo'lsa) `X-Total-Count` sarlavhasida qaytariladi.
+    """
+
+    def __init__(
+        self,
+        after_id: Optional[int] = Query(None, ge=0),
+        limit: int = Query(settings.ADMIN_PAGE_SIZE, ge=1, le=settings.ADMIN_MAX_PAGE_SIZE),
+        sort: str = Query("id", pattern=SORT_PATTERN),
+        include_total: bool = Query(False)
+    ):
+        self.after_id = after_id
+        self.limit = limit
+        self.sort = sort
+        self.include_total = include_total
+
+def paginate(
+    db: Session,
+    response: Response,
+    params: PageParams,
+    columns: list,
+    id_column,
+    filters: list,
+    count_key: tuple
+) -> Page:
+    """Sahifani olish va paginatsiya sarlavhalarini qo'yish"""
+    page = PaginationService.fetch_page(db, columns, id_column, filters, params.after_id, params.limit, params.sort)
+    if page.next_after_id is not None:
+        response.headers["X-Next-After-Id"] = str(page.next_after_id)
+    if params.include_total:
+        page.total = PaginationService.count(db, count_key, id_column, filters)
+        response.headers["X-Total-Count"] = str(page.total)
+    return page
+
 # ============= GRUPPALAR =============
 
 @router.post("/groups", response_model=GroupResponse)
@@ -44,29 +106,43 @@ def create_group(
     authenticated: bool = Depends(admin_auth)
 ):
     """Yangi guruhni yaratish"""
-    logger.info(f"Yangi guruh yaratish: name={group.name}")
+    logger.info("Yangi guruh yaratish: name=%s", group.name)
 
     existing = db.query(Group).filter(Group.name == group.name).first()
     if existing:
-        logger.warning(f"Guruh allaqachon mavjud: name={group.name}")
+        logger.warning("Guruh allaqachon mavjud: name=%s", group.name)
         raise AlreadyExistsException("Guruh", "name", group.name)
 
     db_group = Group(name=group.name)
     db.add(db_group)
     db.commit()
     db.refresh(db_group)
+    count_cache.invalidate("groups")
 
-    logger.info(f"Guruh yaratildi: id={db_group.id}, name={db_group.name}")
+    logger.info("Guruh yaratildi: id=%s, name=%s", db_group.id, db_group.name)
     return db_group
 
 @router.get("/groups", response_model=list[GroupWithStudents])
 def list_groups(
+    response: Response,
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     authenticated: bool = Depends(admin_auth)
 ):
-    """Barcha guruhlarni ko'rish"""
-    groups = db.query(Group).all()
-    return groups
+    """Guruhlarni ko'rish (sahifalab)"""
+    page = paginate(db, response, params, [Group.id, Group.name], Group.id, [], ("groups",))
+
+    # Sahifadagi guruhlar talabalari bitta IN so'rovi bilan
+    groups = {group["id"]: {**group, "students": []} for group in page.items}
+    if groups:
+        students = db.execute(
+            select(Student.id, Student.full_name, Student.group_id)
+            .where(Student.group_id.in_(groups))
+            .order_by(Student.id)
+        ).all()
+        for student in students:
+            groups[student.group_id]["students"].append(student._asdict())
+    return list(groups.values())
 
 @router.delete("/groups/{group_id}")
 def delete_group(
@@ -75,16 +151,18 @@ def delete_group(
     authenticated: bool = Depends(admin_auth)
 ):
     """Guruhni o'chirish"""
-    logger.info(f"Guruh o'chirish: group_id={group_id}")
+    logger.info("Guruh o'chirish: group_id=%s", group_id)
 
     group = db.query(Group).filter(Group.id == group_id).first()
     if not group:
-        logger.error(f"Guruh topilmadi: group_id={group_id}")
+        logger.error("Guruh topilmadi: group_id=%s", group_id)
         raise NotFoundException("Guruh", group_id)
 
     db.delete(group)
     db.commit()
-    logger.info(f"Guruh o'chirildi: group_id={group_id}")
+    count_cache.invalidate("groups")
+    count_cache.invalidate("students")
+    logger.info("Guruh o'chirildi: group_id=%s", group_id)
     return {"message": "Guruh o'chirildi", "success": True}
 
 # ============= O'QUVCHILAR =============
@@ -107,17 +185,24 @@ def create_student(
     db.add(db_student)
     db.commit()
     db.refresh(db_student)
+    count_cache.invalidate("students")
     return db_student
 
 @router.get("/groups/{group_id}/students", response_model=list[StudentResponse])
 def list_students(
     group_id: int,
+    response: Response,
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     authenticated: bool = Depends(admin_auth)
 ):
-    """Guruhning o'quvchilarini ko'rish"""
-    students = db.query(Student).filter(Student.group_id == group_id).all()
-    return students
+    """Guruhning o'quvchilarini ko'rish (sahifalab)"""
+    page = paginate(
+        db, response, params,
+        [Student.id, Student.full_name, Student.group_id], Student.id,
+        [Student.group_id == group_id], ("students", group_id)
+    )
+    return page.items
 
 @router.delete("/students/{student_id}")
 def delete_student(
@@ -132,6 +217,7 @@ def delete_student(
     
     db.delete(student)
     db.commit()
+    count_cache.invalidate("students")
     return {"message": "O'quvchi o'chirildi"}
 
 # ============= FANLAR =============
@@ -226,19 +312,26 @@ def create_test(
     
     db.commit()
     db.refresh(db_test)
+    question_pool_cache.invalidate(db_test.id)
+    count_cache.invalidate("tests")
     return db_test
 
 @router.get("/tests", response_model=list[TestResponse])
 def list_tests(
+    response: Response,
     subject_id: int = Query(None),
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     authenticated: bool = Depends(admin_auth)
 ):
-    """Testlarni ko'rish"""
-    query = db.query(Test)
-    if subject_id:
-        query = query.filter(Test.subject_id == subject_id)
-    return query.all()
+    """Testlarni ko'rish (sahifalab)"""
+    filters = [Test.subject_id == subject_id] if subject_id else []
+    page = paginate(
+        db, response, params,
+        [Test.id, Test.name, Test.subject_id, Test.duration_minutes], Test.id,
+        filters, ("tests", subject_id)
+    )
+    return page.items
 
 # ============= OTP =============
 
@@ -250,21 +343,21 @@ def generate_otp(
     authenticated: bool = Depends(admin_auth)
 ):
     """Talaba uchun OTP yaratish"""
-    logger.info(f"OTP generatsiya qilish: student_id={student_id}, test_id={test_id}")
+    logger.info("OTP generatsiya qilish: student_id=%s, test_id=%s", student_id, test_id)
 
     student = db.query(Student).filter(Student.id == student_id).first()
     if not student:
-        logger.error(f"O'quvchi topilmadi: student_id={student_id}")
+        logger.error("O'quvchi topilmadi: student_id=%s", student_id)
         raise NotFoundException("O'quvchi", student_id)
 
     test = db.query(Test).filter(Test.id == test_id).first()
     if not test:
-        logger.error(f"Test topilmadi: test_id={test_id}")
+        logger.error("Test topilmadi: test_id=%s", test_id)
         raise NotFoundException("Test", test_id)
 
     session = OTPService.create_session(db, student_id, test_id)
 
-    logger.info(f"OTP yaratildi: session_id={session.id}, otp={session.otp}")
+    logger.info("OTP yaratildi: session_id=%s, otp=%s", session.id, session.otp)
     return {
         "session_id": session.id,
         "otp": session.otp,
@@ -272,50 +365,189 @@ def generate_otp(
         "success": True
     }
 
+@router.post("/groups/{group_id}/generate-otps")
+def generate_group_otps(
+    group_id: int,
+    test_id: int = Query(...),
+    db: Session = Depends(get_db),
+    authenticated: bool = Depends(admin_auth)
+):
+    """Guruhning barcha talabalari uchun OTP yaratish (chop etish uchun ro'yxat)"""
+    logger.info("Guruh uchun OTP generatsiya qilish: group_id=%s, test_id=%s", group_id, test_id)
+
+    group = db.query(Group).filter(Group.id == group_id).first()
+    if not group:
+        logger.error("Guruh topilmadi: group_id=%s", group_id)
+        raise NotFoundException("Guruh", group_id)
+
+    test = db.query(Test).filter(Test.id == test_id).first()
+    if not test:
+        logger.error("Test topilmadi: test_id=%s", test_id)
+        raise NotFoundException("Test", test_id)
+
+    group_name, test_name = group.name, test.name
+    roster = OTPService.create_group_sessions(db, group_id, test_id)
+    if not roster:
+        raise ValidationException("Guruhda talabalar yo'q")
+
+    return {
+        "group_id": group_id,
+        "group_name": group_name,
+        "test_id": test_id,
+        "test_name": test_name,
+        "expires_at": roster[0]["expires_at"],
+        "students": roster,
+        "success": True
+    }
+
 # ============= NATIJALARI =============
 
-@router.get("/results")
+@router.get("/results", response_model=list[ResultListItem])
 def list_results(
+    response: Response,
     student_id: int = Query(None),
     test_id: int = Query(None),
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     authenticated: bool = Depends(admin_auth)
 ):
-    """Natijalari ko'rish"""
-    query = db.query(Result)
+    """
+    Natijalarni ko'rish (sahifalab)
+
+    Natijalar soni test yakunlanganda o'zgaradi va faqat TTL bilan
+    yangilanadi (ADMIN_COUNT_CACHE_TTL_SECONDS).
+    """
+    filters = []
     if student_id:
-        query = query.filter(Result.student_id == student_id)
+        filters.append(Result.student_id == student_id)
     if test_id:
-        query = query.filter(Result.test_id == test_id)
-    return query.all()
+        filters.append(Result.test_id == test_id)
+    page = paginate(
+        db, response, params,
+        [
+            Result.id, Result.student_id, Result.test_id, Result.correct_count,
+            Result.total_count, Result.percentage, Result.created_at
+        ],
+        Result.id, filters, ("results", student_id, test_id)
+    )
+    return page.items
 
 @router.get("/export-results")
 def export_results(
+    format: str = Query("xlsx", pattern="^(xlsx|csv|ndjson)$"),
+    group_id: int = Query(None),
+    test_id: int = Query(None),
+    date_from: date = Query(None),
+    date_to: date = Query(None),
     db: Session = Depends(get_db),
     authenticated: bool = Depends(admin_auth)
 ):
-    """Natijalalarni Excel formatida export qilish"""
-    from fastapi.responses import Response
-    
-    file_content = ExportService.export_results_to_excel(db)
-    
-    return Response(
-        content=file_content,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=results.xlsx"}
+    """Natijalalarni Excel, CSV yoki NDJSON formatida export qilish"""
+    logger.info(
+        "Natijalar eksporti: format=%s, group_id=%s, test_id=%s, date_from=%s, date_to=%s",
+        format, group_id, test_id, date_from, date_to
+    )
+    filters = {"group_id": group_id, "test_id": test_id, "date_from": date_from, "date_to": date_to}
+    media_type = EXPORT_MEDIA_TYPES[format]
+
+    if format == "csv":
+        return StreamingResponse(
+            ExportService.iter_results_csv(**filters),
+            media_type=media_type,
+            headers={"Content-Disposition": "attachment; filename=results.csv"}
+        )
+    if format == "ndjson":
+        return StreamingResponse(
+            ExportService.iter_results_ndjson(**filters),
+            media_type=media_type,
+            headers={"Content-Disposition": "attachment; filename=results.ndjson"}
+        )
+
+    path = ExportService.export_results_to_excel_file(db, **filters)
+
+    # Fayl qismlab yuboriladi va yuborilgandan keyin o'chiriladi
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename="results.xlsx",
+        background=BackgroundTask(os.remove, path)
     )
 
 # ============= IMPORT =============
 
 @router.post("/import-tests")
-async def import_tests(
+def import_tests(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     authenticated: bool = Depends(admin_auth)
 ):
     """JSON fayldan testlarni import qilish"""
-    content = await file.read()
-    json_data = content.decode('utf-8')
-    
-    result = ImportService.import_tests_from_json(db, json_data)
-    return result
\ No newline at end of file
+    logger.info("Testlar importi: filename=%s", file.filename)
+
+    # Fayl qismlab o'qiladi va elementlar partiyalab yoziladi
+    return ImportService.import_tests_from_stream(db, file.file)
+
+# ============= FON VAZIFALARI =============
+
+@router.post("/jobs/import")
+def create_import_job(
+    file: UploadFile = File(...),
+    authenticated: bool = Depends(admin_auth)
+):
+    """JSON fayldan testlarni fonda import qilish"""
+    logger.info("Import vazifasi: filename=%s", file.filename)
+    job = JobService.submit_import(file.file, file.filename)
+    return job.to_dict()
+
+@router.post("/jobs/export")
+def create_export_job(
+    format: str = Query("xlsx", pattern="^(xlsx|csv|ndjson)$"),
+    group_id: int = Query(None),
+    test_id: int = Query(None),
+    date_from: date = Query(None),
+    date_to: date = Query(None),
+    authenticated: bool = Depends(admin_auth)
+):
+    """Natijalar eksportini fonda boshlash"""
+    logger.info("Eksport vazifasi: format=%s, group_id=%s, test_id=%s", format, group_id, test_id)
+    job = JobService.submit_export(
+        format, group_id=group_id, test_id=test_id, date_from=date_from, date_to=date_to
+    )
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}")
+def get_job(
+    job_id: str,
+    authenticated: bool = Depends(admin_auth)
+):
+    """Vazifa holati: progress, tezlik va taxminiy qolgan vaqt"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise NotFoundException("Vazifa", job_id)
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}/download")
+def download_job_result(
+    job_id: str,
+    authenticated: bool = Depends(admin_auth)
+):
+    """Yakunlangan eksport vazifasining faylini yuklab olish"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise NotFoundException("Vazifa", job_id)
+    if job.status != JobStatus.COMPLETED or not job.result_path or not os.path.exists(job.result_path):
+        raise ValidationException("Vazifa natijasi hali tayyor emas")
+
+    return FileResponse(job.result_path, media_type=job.media_type, filename=job.filename)
+
+# ============= STATISTIKA =============
+
+@router.get("/stats/db-pool")
+def db_pool_stats(authenticated: bool = Depends(admin_auth)):
+    """
+    Database ulanishlar pool'i statistikasi (sync va async engine)
+
+    Har bir uvicorn worker o'z pool'iga ega: database'ga jami ulanishlar
+    soni workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) gacha yetadi.
+    """
+    return get_pool_stats()
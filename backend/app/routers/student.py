@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.group import Group
 from app.models.student import Student
 from app.models.subject import Subject
@@ -12,22 +13,22 @@ from app.schemas.subject_schema import SubjectResponse
 router = APIRouter(prefix="/api/student", tags=["student"])
 
 @router.get("/groups", response_model=list[GroupResponse])
-def get_groups(db: Session = Depends(get_db)):
+async def get_groups(db: AsyncSession = Depends(get_async_db)):
     """Barcha guruhlarni olish"""
-    groups = db.query(Group).all()
-    return groups
+    groups = await db.scalars(select(Group))
+    return groups.all()
 
 @router.get("/groups/{group_id}/students", response_model=list[StudentListResponse])
-def get_students_by_group(
+async def get_students_by_group(
     group_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Guruhning o'quvchilarini olish"""
-    students = db.query(Student).filter(Student.group_id == group_id).all()
-    return students
+    students = await db.scalars(select(Student).where(Student.group_id == group_id))
+    return students.all()
 
 @router.get("/subjects", response_model=list[SubjectResponse])
-def get_subjects(db: Session = Depends(get_db)):
+async def get_subjects(db: AsyncSession = Depends(get_async_db)):
     """Barcha fanlarni olish"""
-    subjects = db.query(Subject).all()
-    return subjects
\ No newline at end of file
+    subjects = await db.scalars(select(Subject))
+    return subjects.all()
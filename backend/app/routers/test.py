@@ -1,122 +1,126 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from app.database import get_db
+from app.config import get_settings
+from app.database import get_async_db
 from app.models.test_session import TestSession, SessionStatus
 from app.models.question import Question, Option
 from app.models.test import Test
+from app.models.result import Result
 from app.services.otp_service import OTPService
 from app.services.test_service import TestService
 from app.services.result_service import ResultService
+from app.services.session_store import SessionState, session_store
+from app.services.answer_buffer import answer_buffer
+from app.schemas.answer_schema import AnswerBatchSubmit
 from app.logger import get_logger
 from app.exceptions import NotFoundException, OTPException, SessionException
 
 logger = get_logger("test_router")
 router = APIRouter(prefix="/api/test", tags=["test"])
+settings = get_settings()
 
 @router.get("/session/{session_id}")
-def get_session_info(
+async def get_session_info(
     session_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Test sessiyasi haqida ma'lumot"""
-    logger.info(f"Sessiya ma'lumotlari so'raldi: session_id={session_id}")
+    logger.info("Sessiya ma'lumotlari so'raldi: session_id=%s", session_id)
 
-    session = db.query(TestSession).filter(TestSession.id == session_id).first()
+    session = await db.get(TestSession, session_id)
     if not session:
-        logger.error(f"Sessiya topilmadi: session_id={session_id}")
+        logger.error("Sessiya topilmadi: session_id=%s", session_id)
         raise NotFoundException("Sessiya", session_id)
 
-    logger.debug(f"Sessiya ma'lumoti qaytarildi: status={session.status}")
+    # Urinishlar soni va bloklash holati omborda bo'lishi mumkin
+    state = session_store.get(session_id) or SessionState.from_session(session)
+
+    logger.debug("Sessiya ma'lumoti qaytarildi: status=%s", state.status)
     return {
         "id": session.id,
-        "status": session.status,
-        "otp_attempts": session.otp_attempts,
-        "blocked_until": session.blocked_until,
+        "status": state.status,
+        "otp_attempts": state.otp_attempts,
+        "blocked_until": state.blocked_until,
         "expires_at": session.expires_at,
-        "started_at": session.started_at
+        "started_at": session.started_at,
+        "deadline_at": state.deadline_at,
+        # Mijoz soati farqini hisobga olish uchun: qolgan vaqt = deadline_at - server_time
+        "server_time": datetime.utcnow()
     }
 
 @router.post("/verify-otp")
-def verify_otp(
+async def verify_otp(
     session_id: int = Query(...),
     otp: str = Query(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """OTP tekshirish va testni boshlash"""
-    logger.info(f"OTP tekshirish so'rovi: session_id={session_id}")
-
-    session = db.query(TestSession).filter(TestSession.id == session_id).first()
-    if not session:
-        logger.error(f"Sessiya topilmadi: session_id={session_id}")
-        raise NotFoundException("Sessiya", session_id)
+    logger.info("OTP tekshirish so'rovi: session_id=%s", session_id)
 
-    is_valid, updated_session = OTPService.verify_otp(db, session_id, otp)
+    # Sessiya holati ombordan olinadi (topilmasa NotFoundException)
+    is_valid, updated_session = await db.run_sync(OTPService.verify_otp, session_id, otp)
 
     if not is_valid:
         if updated_session.status == SessionStatus.BLOCKED:
-            logger.warning(f"Sessiya bloklangan: session_id={session_id}")
+            logger.warning("Sessiya bloklangan: session_id=%s", session_id)
             raise OTPException(
                 f"Juda ko'p urinish. {updated_session.blocked_until} gacha kutib turish kerak",
                 status_code=429,
                 detail={"blocked_until": updated_session.blocked_until}
             )
         elif updated_session.status == SessionStatus.EXPIRED:
-            logger.warning(f"OTP vaqti o'tgan: session_id={session_id}")
+            logger.warning("OTP vaqti o'tgan: session_id=%s", session_id)
             raise OTPException("OTP vaqti o'tgan", status_code=401)
+        elif updated_session.status == SessionStatus.COMPLETED:
+            logger.warning("Sessiya allaqachon yakunlangan: session_id=%s", session_id)
+            raise OTPException("Test allaqachon yakunlangan", status_code=401)
         else:
-            logger.warning(f"OTP noto'g'ri: session_id={session_id}")
+            logger.warning("OTP noto'g'ri: session_id=%s", session_id)
             raise OTPException("OTP noto'g'ri", status_code=401)
 
-    logger.info(f"OTP muvaffaqiyatli tasdiqlandi, test boshlandi: session_id={session_id}")
+    logger.info("OTP muvaffaqiyatli tasdiqlandi, test boshlandi: session_id=%s", session_id)
     return {
         "success": True,
-        "session_id": session.id,
-        "test_id": session.test_id
+        "session_id": updated_session.id,
+        "test_id": updated_session.test_id
     }
 
 @router.get("/questions/{session_id}")
-def get_test_questions(
+async def get_test_questions(
     session_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Test savollarini olish"""
-    logger.info(f"Savollar so'raldi: session_id={session_id}")
+    logger.info("Savollar so'raldi: session_id=%s", session_id)
 
-    session = db.query(TestSession).filter(TestSession.id == session_id).first()
+    session = await db.get(TestSession, session_id)
     if not session:
-        logger.error(f"Sessiya topilmadi: session_id={session_id}")
+        logger.error("Sessiya topilmadi: session_id=%s", session_id)
         raise NotFoundException("Sessiya", session_id)
 
     # Sessiya faol ekanligini tekshirish
     if not OTPService.is_session_active(session):
-        logger.warning(f"Sessiya faol emas: session_id={session_id}, status={session.status}")
+        logger.warning("Sessiya faol emas: session_id=%s, status=%s", session_id, session.status)
         raise SessionException("Sessiya faol emas yoki vaqti o'tgan", status_code=401)
 
-    # Random savollarni olish
-    questions = TestService.get_random_questions(db, session.test_id, limit=20)
+    # OTP tasdiqlanganda tanlangan savollar to'plami
+    result = await db.run_sync(TestService.get_session_questions, session, 20)
 
-    result = []
-    for question in questions:
-        options = db.query(Option).filter(Option.question_id == question.id).all()
-        result.append({
-            "id": question.id,
-            "text": question.text,
-            "options": [{"id": opt.id, "text": opt.text} for opt in options]
-        })
-
-    logger.info(f"{len(result)} ta savol qaytarildi: session_id={session_id}")
+    logger.info("%s ta savol qaytarildi: session_id=%s", len(result), session_id)
     return result
 
 @router.post("/submit-answer")
-def submit_answer(
+async def submit_answer(
     session_id: int = Query(...),
     question_id: int = Query(...),
     answer: str = Query(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Talabaning javobini qabul qilish"""
-    session = db.query(TestSession).filter(TestSession.id == session_id).first()
+    session = await db.get(TestSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Sessiya topilmadi")
     
@@ -125,36 +129,70 @@ def submit_answer(
         raise HTTPException(status_code=401, detail="Sessiya vaqti o'tgan")
     
     # Javobni saqlash
-    answer_obj = TestService.submit_answer(db, session_id, question_id, answer)
+    answer_obj = await db.run_sync(TestService.submit_answer, session_id, session.test_id, question_id, answer)
     
     return {
         "question_id": question_id,
         "is_correct": answer_obj.is_correct
     }
 
+@router.post("/submit-answers")
+async def submit_answers(
+    payload: AnswerBatchSubmit,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Sessiyaning barcha javoblarini bitta so'rovda qabul qilish"""
+    logger.info(
+        "Javoblar to'plami qabul qilindi: session_id=%s, count=%s",
+        payload.session_id, len(payload.answers)
+    )
+
+    session = await db.get(TestSession, payload.session_id)
+    if not session:
+        logger.error("Sessiya topilmadi: session_id=%s", payload.session_id)
+        raise NotFoundException("Sessiya", payload.session_id)
+
+    # Sessiya faol ekanligini tekshirish (deadline paytida yuborilgan yakuniy to'plam ham qabul qilinadi)
+    if not OTPService.accepts_final_answers(session):
+        logger.warning("Sessiya faol emas: session_id=%s, status=%s", payload.session_id, session.status)
+        raise SessionException("Sessiya vaqti o'tgan", status_code=401)
+
+    graded = await db.run_sync(TestService.submit_answers, session.id, session.test_id, payload.answers)
+
+    return {
+        "session_id": payload.session_id,
+        "saved_count": len(graded),
+        "answers": graded
+    }
+
 @router.post("/finish-test/{session_id}")
-def finish_test(
+async def finish_test(
     session_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Testni yakunlash va natijani hisoblash"""
-    logger.info(f"Test yakunlanmoqda: session_id={session_id}")
+    logger.info("Test yakunlanmoqda: session_id=%s", session_id)
 
-    session = db.query(TestSession).filter(TestSession.id == session_id).first()
+    session = await db.get(TestSession, session_id)
     if not session:
-        logger.error(f"Sessiya topilmadi: session_id={session_id}")
+        logger.error("Sessiya topilmadi: session_id=%s", session_id)
         raise NotFoundException("Sessiya", session_id)
 
     # Sessiyaning statusini o'zgartirish
     session.status = SessionStatus.COMPLETED
     session.completed_at = datetime.utcnow()
-    db.commit()
-    logger.info(f"Sessiya COMPLETED holatiga o'tkazildi: session_id={session_id}")
+    await db.commit()
+    session_store.delete(session_id)
+    logger.info("Sessiya COMPLETED holatiga o'tkazildi: session_id=%s", session_id)
+
+    # Buferdagi javoblar natijadan oldin yozilishi kerak
+    if settings.ANSWER_WRITE_BEHIND:
+        await run_in_threadpool(answer_buffer.flush, session_id)
 
     # Natijani hisoblash
-    result = ResultService.calculate_result(db, session_id)
+    result = await db.run_sync(ResultService.calculate_result, session_id)
 
-    logger.info(f"Test yakunlandi: session_id={session_id}, natija={result.percentage:.1f}%")
+    logger.info("Test yakunlandi: session_id=%s, natija=%.1f%%", session_id, result.percentage)
     return {
         "correct_count": result.correct_count,
         "total_count": result.total_count,
@@ -163,21 +201,22 @@ def finish_test(
     }
 
 @router.get("/result/{session_id}")
-def get_session_result(
+async def get_session_result(
     session_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Sessiyaning natijasini olish"""
-    session = db.query(TestSession).filter(TestSession.id == session_id).first()
+    session = await db.get(TestSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Sessiya topilmadi")
     
     # Natijavni olish
-    from app.models.result import Result
-    result = db.query(Result).filter(
-        Result.student_id == session.student_id,
-        Result.test_id == session.test_id
-    ).first()
+    result = await db.scalar(
+        select(Result).where(
+            Result.student_id == session.student_id,
+            Result.test_id == session.test_id
+        ).limit(1)
+    )
     
     if not result:
         raise HTTPException(status_code=404, detail="Natija topilmadi")
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+class AdminLogin(BaseModel):
+    login: str
+    password: str
+
+class AdminTokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_at: datetime
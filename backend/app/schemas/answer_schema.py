@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import List
+
+class AnswerSubmit(BaseModel):
+    question_id: int
+    answer: str
+
+class AnswerBatchSubmit(BaseModel):
+    session_id: int
+    answers: List[AnswerSubmit]
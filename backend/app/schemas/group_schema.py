@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
+from app.schemas.student_schema import StudentResponse
 
 class GroupBase(BaseModel):
     name: str
@@ -14,7 +15,7 @@ class GroupResponse(GroupBase):
         from_attributes = True
 
 class GroupWithStudents(GroupResponse):
-    students: List = []
+    students: List[StudentResponse] = []
     
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 class ResultResponse(BaseModel):
     correct_count: int
@@ -13,4 +14,14 @@ class ResultWithDetails(ResultResponse):
     student_name: str
     group_name: str
     topic_number: int
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+
+class ResultListItem(BaseModel):
+    """Admin natijalar ro'yxatining bitta qatori"""
+    id: int
+    student_id: int
+    test_id: int
+    correct_count: int
+    total_count: int
+    percentage: float
+    created_at: Optional[datetime] = None
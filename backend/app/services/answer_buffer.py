@@ -0,0 +1,176 @@
+"""
+Javoblar uchun write-behind bufer
+Tekshirilgan javoblar darhol qaytariladi, database'ga esa fon thread'ida
+har ANSWER_FLUSH_INTERVAL_MS da yoki ANSWER_FLUSH_MAX_ROWS ta qator
+yig'ilganda bitta upsert bilan yoziladi. /finish-test sessiya javoblarini,
+ilova to'xtashida (lifespan) esa butun buferni majburan yozadi.
+
+Bufer process ichida: bir nechta uvicorn worker bo'lsa, sessiyaning barcha
+so'rovlari bitta worker'ga tushishi kerak (sticky routing), aks holda
+/finish-test boshqa worker buferidagi javoblarni ko'rmaydi.
+"""
+import threading
+import time
+from typing import Optional
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.answer_writer import upsert_answers
+from app.logger import get_logger
+
+logger = get_logger("answer_buffer")
+settings = get_settings()
+
+
+class AnswerBuffer:
+    """Sessiyalar bo'yicha guruhlangan, partiyalab yoziladigan javoblar"""
+
+    def __init__(self, flush_interval_ms: int, max_rows: int):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_rows = max_rows
+        self.flushed_rows = 0
+        self.dropped_rows = 0
+        self.batches = 0
+        self._rows: dict[int, list[dict]] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        # Bir vaqtda faqat bitta flush database'ga yozadi
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def add(self, rows: list[dict]) -> None:
+        """Answer qatorlarini (test_session_id bilan) buferga qo'shish"""
+        with self._lock:
+            for row in rows:
+                self._rows.setdefault(row["test_session_id"], []).append(row)
+            self._pending += len(rows)
+            full = self._pending >= self.max_rows
+        if full:
+            self._wakeup.set()
+
+    def _take(self, session_id: Optional[int]) -> list[dict]:
+        with self._lock:
+            if session_id is None:
+                rows = [row for session_rows in self._rows.values() for row in session_rows]
+                self._rows.clear()
+            else:
+                rows = self._rows.pop(session_id, [])
+            self._pending -= len(rows)
+            return rows
+
+    def _requeue(self, rows: list[dict]) -> None:
+        with self._lock:
+            for row in reversed(rows):
+                self._rows.setdefault(row["test_session_id"], []).insert(0, row)
+            self._pending += len(rows)
+
+    def flush(self, session_id: Optional[int] = None) -> int:
+        """
+        Bitta sessiya yoki butun bufer javoblarini database'ga yozish
+
+        Ulanish xatosida qatorlar buferga qaytariladi. Birgalikdagi upsert
+        IntegrityError bersa (masalan sessiya o'chirilgan), qatorlar sessiyalar
+        bo'yicha qayta yoziladi va faqat xato bergan sessiya javoblari tashlanadi.
+
+        Returns:
+            int: Yozilgan qatorlar soni
+        """
+        with self._flush_lock:
+            rows = self._take(session_id)
+            if not rows:
+                return 0
+
+            started = time.perf_counter()
+            db = SessionLocal()
+            try:
+                written = self._write(db, rows)
+            except SQLAlchemyError as e:
+                db.rollback()
+                self._requeue(rows)
+                logger.error("Javoblarni yozib bo'lmadi, buferga qaytarildi: rows=%s, error=%s", len(rows), e)
+                return 0
+            finally:
+                db.close()
+
+            self.flushed_rows += written
+            self.batches += 1
+            logger.debug(
+                "Javoblar buferi yozildi: rows=%s, vaqt=%.1fms",
+                written, (time.perf_counter() - started) * 1000
+            )
+            return written
+
+    def _write(self, db, rows: list[dict]) -> int:
+        try:
+            written = upsert_answers(db, rows)
+            db.commit()
+            return written
+        except IntegrityError:
+            db.rollback()
+
+        by_session: dict[int, list[dict]] = {}
+        for row in rows:
+            by_session.setdefault(row["test_session_id"], []).append(row)
+
+        written = 0
+        for session_id, session_rows in by_session.items():
+            try:
+                written += upsert_answers(db, session_rows)
+                db.commit()
+            except IntegrityError as e:
+                db.rollback()
+                self.dropped_rows += len(session_rows)
+                logger.error(
+                    "Sessiya javoblari yozilmadi va tashlandi: session_id=%s, rows=%s, error=%s",
+                    session_id, len(session_rows), e
+                )
+        return written
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Javoblar buferi xatosi: %s", e, exc_info=True)
+
+    def start(self) -> None:
+        """Fon flush thread'ini ishga tushirish"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="answer-buffer", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Javoblar buferi ishga tushdi: interval=%.0fms, max_rows=%s",
+            self.flush_interval * 1000, self.max_rows
+        )
+
+    def stop(self) -> None:
+        """Thread'ni to'xtatish va qolgan javoblarni yozish"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        written = self.flush()
+        logger.info("Javoblar buferi to'xtatildi: oxirgi yozilgan=%s, jami=%s", written, self.flushed_rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+            self._pending = 0
+
+
+answer_buffer = AnswerBuffer(
+    flush_interval_ms=settings.ANSWER_FLUSH_INTERVAL_MS,
+    max_rows=settings.ANSWER_FLUSH_MAX_ROWS
+)
@@ -0,0 +1,55 @@
+"""
+Answer qatorlarini yozish
+Sessiyada har bir savolga bitta javob bo'ladi: qayta yuborilgan javob
+INSERT ... ON CONFLICT (test_session_id, question_id) DO UPDATE bilan
+avvalgisini almashtiradi. Shuning uchun avtosaqlash, qayta urinish yoki
+write-behind buferi natija hisobida savolni ikki marta sanatmaydi.
+"""
+from sqlalchemy.orm import Session
+from app.models.answer import Answer
+from app.services.result_service import UPSERT_INSERTS
+from app.exceptions import DatabaseException
+
+
+def answer_upsert(db: Session):
+    """
+    Answer uchun INSERT ... ON CONFLICT (test_session_id, question_id) DO UPDATE
+
+    Raises:
+        DatabaseException: Dialekt ON CONFLICT'ni qo'llab-quvvatlamasa
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in UPSERT_INSERTS:
+        raise DatabaseException(f"Javoblarni yozish {dialect} uchun qo'llab-quvvatlanmaydi")
+
+    statement = UPSERT_INSERTS[dialect](Answer)
+    return statement.on_conflict_do_update(
+        index_elements=[Answer.test_session_id, Answer.question_id],
+        set_={
+            "student_answer": statement.excluded.student_answer,
+            "is_correct": statement.excluded.is_correct,
+            "created_at": statement.excluded.created_at
+        }
+    )
+
+
+def upsert_answers(db: Session, rows: list[dict]) -> int:
+    """
+    Javoblarni yozish yoki mavjudini yangilash (commit qilinmaydi)
+
+    Bitta partiyada bir savolga bir nechta javob bo'lsa, oxirgisi olinadi:
+    ON CONFLICT bitta so'rovda bir qatorni ikki marta yangilay olmaydi.
+
+    Args:
+        db: Database session
+        rows: Answer ustunlari (test_session_id, question_id, student_answer, is_correct, created_at)
+
+    Returns:
+        int: Yozilgan (takrorlarsiz) qatorlar soni
+    """
+    latest = {(row["test_session_id"], row["question_id"]): row for row in rows}
+    if not latest:
+        return 0
+
+    db.execute(answer_upsert(db), list(latest.values()))
+    return len(latest)
@@ -1,63 +1,207 @@
+import csv
+import json
+import os
+import tempfile
+from datetime import date, datetime, time, timedelta
+from io import BytesIO, StringIO
+from typing import BinaryIO, Callable, Iterator, Optional
 from openpyxl import Workbook
-from sqlalchemy.orm import Session
-from sqlalchemy import join
+from sqlalchemy.orm import Session, Query
+from app.database import SessionLocal
 from app.models.result import Result
 from app.models.student import Student
 from app.models.group import Group
 from app.models.test import Test
+from app.logger import get_logger
+
+logger = get_logger("export_service")
+
+# Server-side cursor'dan bir marta olinadigan qatorlar soni
+EXPORT_BATCH_SIZE = 1000
+
+EXCEL_HEADERS = ["Student ID", "Guruh nomi", "O'quvchining to'liq ismi", "Test nomi", "Ball"]
+EXCEL_COLUMN_WIDTHS = {"A": 12, "B": 20, "C": 25, "D": 20, "E": 10}
+EXPORT_FIELDS = ["student_id", "group_name", "full_name", "test_name", "correct_count"]
+
+EXPORT_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
 
 class ExportService:
-    
+
     @staticmethod
-    def export_results_to_excel(db: Session) -> bytes:
+    def results_query(
+        db: Session,
+        group_id: Optional[int] = None,
+        test_id: Optional[int] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Query:
         """
-        Barcha natijalalarni Excel faylga export qilish
-        Ustunlar: Student_id, Group_name, Student_full_name, Topic, result (ball)
+        Eksport uchun natijalar so'rovi (faqat kerakli ustunlar)
+
+        Filtrlar SQL join'ning o'zida qo'llaniladi. date_to kuni ham
+        natijaga kiradi.
         """
-        # Natijalalarni olish
-        results = db.query(
-            Result.id,
+        query = db.query(
             Student.id.label('student_id'),
-            Student.full_name,
             Group.name.label('group_name'),
-            Test.name.label('test_name')
+            Student.full_name,
+            Test.name.label('test_name'),
+            Result.correct_count
         ).join(
             Student, Result.student_id == Student.id
         ).join(
             Group, Student.group_id == Group.id
         ).join(
             Test, Result.test_id == Test.id
-        ).all()
-        
-        # Excel workbook yaratish
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Natijalari"
-        
-        # Ustun sarlavhalari
-        headers = ["Student ID", "Guruh nomi", "O'quvchining to'liq ismi", "Test nomi", "Ball"]
-        ws.append(headers)
-        
-        # Qatorlarni qo'shish
-        for result in results:
+        )
+
+        if group_id:
+            query = query.filter(Student.group_id == group_id)
+        if test_id:
+            query = query.filter(Result.test_id == test_id)
+        if date_from:
+            query = query.filter(Result.created_at >= datetime.combine(date_from, time.min))
+        if date_to:
+            query = query.filter(Result.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+
+        return query.order_by(Result.id)
+
+    @staticmethod
+    def count_results(db: Session, **filters) -> int:
+        """Filtrlarga mos natijalar soni"""
+        return ExportService.results_query(db, **filters).order_by(None).count()
+
+    @staticmethod
+    def write_results_workbook(
+        db: Session,
+        target: BinaryIO,
+        progress: Optional[Callable[[int], None]] = None,
+        **filters
+    ) -> int:
+        """
+        Natijalarni write-only workbook orqali faylga yozish
+
+        Qatorlar server-side cursor'dan (yield_per) partiyalab o'qiladi va
+        darhol yoziladi, shuning uchun xotira qatorlar soniga bog'liq emas.
+
+        Args:
+            db: Database session
+            target: Yoziladigan fayl obyekti
+            progress: Har bir partiyadan keyin yozilgan qatorlar soni bilan chaqiriladi
+
+        Returns:
+            int: Yozilgan qatorlar soni
+        """
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title="Natijalari")
+
+        # Ustun kengliklari qatorlardan oldin berilishi kerak
+        for column, width in EXCEL_COLUMN_WIDTHS.items():
+            ws.column_dimensions[column].width = width
+
+        ws.append(EXCEL_HEADERS)
+
+        row_count = 0
+        for row in ExportService.results_query(db, **filters).yield_per(EXPORT_BATCH_SIZE):
             ws.append([
-                result.student_id,
-                result.group_name,
-                result.full_name,
-                result.test_name,
-                result[0]  # result.correct_count
+                row.student_id,
+                row.group_name,
+                row.full_name,
+                row.test_name,
+                row.correct_count
             ])
-        
-        # Ustun kengliklarini sozlash
-        ws.column_dimensions['A'].width = 12
-        ws.column_dimensions['B'].width = 20
-        ws.column_dimensions['C'].width = 25
-        ws.column_dimensions['D'].width = 20
-        ws.column_dimensions['E'].width = 10
-        
-        # Faylni byte ga o'tkazish
-        from io import BytesIO
+            row_count += 1
+            if progress and row_count % EXPORT_BATCH_SIZE == 0:
+                progress(row_count)
+
+        wb.save(target)
+        if progress:
+            progress(row_count)
+        return row_count
+
+    @staticmethod
+    def export_results_to_excel(db: Session) -> bytes:
+        """
+        Barcha natijalalarni Excel faylga export qilish
+        Ustunlar: Student_id, Group_name, Student_full_name, Topic, result (ball)
+        """
         file_stream = BytesIO()
-        wb.save(file_stream)
-        file_stream.seek(0)
-        return file_stream.getvalue()
\ No newline at end of file
+        ExportService.write_results_workbook(db, file_stream)
+        return file_stream.getvalue()
+
+    @staticmethod
+    def export_results_to_excel_file(
+        db: Session,
+        progress: Optional[Callable[[int], None]] = None,
+        **filters
+    ) -> str:
+        """
+        Natijalarni vaqtinchalik .xlsx faylga export qilish
+
+        Returns:
+            str: Vaqtinchalik fayl yo'li (yuborilgandan keyin o'chirilishi kerak)
+        """
+        fd, path = tempfile.mkstemp(prefix="results_", suffix=".xlsx")
+        try:
+            with os.fdopen(fd, "wb") as file_stream:
+                row_count = ExportService.write_results_workbook(db, file_stream, progress, **filters)
+        except Exception:
+            os.remove(path)
+            raise
+
+        logger.info("Natijalar eksport qilindi: rows=%s, file=%s", row_count, path)
+        return path
+
+    @staticmethod
+    def _iter_rows(progress: Optional[Callable[[int], None]] = None, **filters) -> Iterator:
+        """
+        Natijalarni alohida database sessiyasida partiyalab o'qish
+
+        Generator javob yuborilayotganda ishlaydi, ya'ni so'rovning get_db
+        sessiyasi allaqachon yopilgan bo'ladi, shuning uchun o'z sessiyasi ochiladi.
+        """
+        db = SessionLocal()
+        try:
+            row_count = 0
+            for row in ExportService.results_query(db, **filters).yield_per(EXPORT_BATCH_SIZE):
+                yield row
+                row_count += 1
+                if progress and row_count % EXPORT_BATCH_SIZE == 0:
+                    progress(row_count)
+            if progress:
+                progress(row_count)
+        finally:
+            db.close()
+
+    @staticmethod
+    def iter_results_csv(progress: Optional[Callable[[int], None]] = None, **filters) -> Iterator[str]:
+        """Natijalarni CSV ko'rinishida qismlab qaytarish"""
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXCEL_HEADERS)
+
+        for index, row in enumerate(ExportService._iter_rows(progress, **filters), start=1):
+            writer.writerow([getattr(row, field) for field in EXPORT_FIELDS])
+            if index % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
+
+    @staticmethod
+    def iter_results_ndjson(progress: Optional[Callable[[int], None]] = None, **filters) -> Iterator[str]:
+        """Natijalarni NDJSON (har qatorda bitta JSON obyekt) ko'rinishida qismlab qaytarish"""
+        lines = []
+        for row in ExportService._iter_rows(progress, **filters):
+            lines.append(json.dumps({field: getattr(row, field) for field in EXPORT_FIELDS}, ensure_ascii=False))
+            if len(lines) == EXPORT_BATCH_SIZE:
+                yield "\n".join(lines) + "\n"
+                lines = []
+
+        if lines:
+            yield "\n".join(lines) + "\n"
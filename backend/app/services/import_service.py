@@ -1,12 +1,355 @@
+import codecs
 import json
+import time
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from app.models.subject import Subject
 from app.models.topic import Topic
-from app.models.test import Test
+from app.models.test import Test, test_topics
 from app.models.question import Question, Option
+from app.services.question_pool import question_pool_cache
+from app.services.pagination import count_cache
+from app.logger import get_logger
+
+logger = get_logger("import_service")
+
+# Bitta INSERT partiyasidagi savollar soni
+IMPORT_BATCH_SIZE = 1000
+
+# Yuklangan fayldan bir marta o'qiladigan baytlar soni
+READ_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(stream: BinaryIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator:
+    """
+    Fayldagi yuqori darajali JSON massiv elementlarini birma-bir qaytarish
+
+    Fayl qismlab o'qiladi va har bir element json.JSONDecoder.raw_decode
+    bilan ajratiladi, shuning uchun xotirada faqat joriy element turadi.
+    Element to'liq o'qilmagan bo'lsa, keyingi o'qish hajmi ikki baravar
+    oshiriladi (katta elementlarni qayta-qayta parse qilmaslik uchun).
+
+    Raises:
+        json.JSONDecodeError: JSON noto'g'ri bo'lsa
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read(size: int) -> bool:
+        nonlocal buffer, pos, eof
+        chunk = stream.read(size)
+        if not chunk:
+            buffer = buffer[pos:] + text_decoder.decode(b"", final=True)
+            pos = 0
+            eof = True
+            return False
+        buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        return True
+
+    def skip_whitespace() -> bool:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return True
+            if eof or not read(chunk_size):
+                return False
+
+    if not skip_whitespace() or buffer[pos] != "[":
+        raise json.JSONDecodeError("JSON massiv kutilgan edi", buffer, pos)
+    pos += 1
+
+    expect_value = True
+    first = True
+    while True:
+        if not skip_whitespace():
+            raise json.JSONDecodeError("Kutilmagan fayl oxiri", buffer, pos)
+
+        if buffer[pos] == "]" and (first or not expect_value):
+            pos += 1
+            break
+        if not expect_value:
+            if buffer[pos] != ",":
+                raise json.JSONDecodeError("',' yoki ']' kutilgan edi", buffer, pos)
+            pos += 1
+            expect_value = True
+            continue
+
+        read_size = chunk_size
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read(read_size)
+                read_size *= 2
+                continue
+            # Raqam bufer oxirida bo'lsa, u hali to'liq o'qilmagan bo'lishi mumkin
+            if end == len(buffer) and not eof:
+                read(read_size)
+                continue
+            break
+
+        pos = end
+        expect_value = False
+        first = False
+        yield item
+
+    if skip_whitespace():
+        raise json.JSONDecodeError("Massivdan keyin ortiqcha ma'lumot", buffer, pos)
+
+
+class QuestionBankWriter:
+    """
+    Savollar bazasini partiyalab yozuvchi
+
+    Fan, mavzu va testlar lug'atlarda saqlanadi, mavjud (test_id, text)
+    juftliklari har bir test uchun bir marta hash set'ga yuklanadi. Savollar
+    insert().returning() bilan, variantlar esa executemany bilan yoziladi.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        progress: Optional[Callable[[int], None]] = None
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.progress = progress
+        self.imported_count = 0
+        self.errors: list[str] = []
+        self.batches: list[dict] = []
+
+        self._subjects = {name: subject_id for subject_id, name in db.query(Subject.id, Subject.name)}
+        self._topics: dict[int, dict[str, int]] = {}
+        self._tests: dict[int, dict[str, int]] = {}
+        self._existing: set[tuple[int, str]] = set()
+        self._loaded_tests: set[int] = set()
+        self._touched_tests: set[int] = set()
+        self._created_tests = False
+        self._pending: list[tuple[dict, list[str]]] = []
+
+    def _get_subject_id(self, name: str) -> int:
+        subject_id = self._subjects.get(name)
+        if subject_id is None:
+            subject = Subject(name=name)
+            self.db.add(subject)
+            self.db.flush()
+            subject_id = self._subjects[name] = subject.id
+        return subject_id
+
+    def _get_topic_id(self, subject_id: int, name: str) -> int:
+        topics = self._topics.get(subject_id)
+        if topics is None:
+            topics = self._topics[subject_id] = {
+                topic_name: topic_id
+                for topic_id, topic_name in self.db.query(Topic.id, Topic.name).filter(
+                    Topic.subject_id == subject_id
+                )
+            }
+
+        topic_id = topics.get(name)
+        if topic_id is None:
+            # Topic raqami = fandagi mavzular soni + 1
+            topic = Topic(subject_id=subject_id, topic_number=len(topics) + 1, name=name)
+            self.db.add(topic)
+            self.db.flush()
+            topic_id = topics[name] = topic.id
+        return topic_id
+
+    def _get_test_id(self, subject_id: int, name: str, topic_id: int) -> int:
+        tests = self._tests.get(subject_id)
+        if tests is None:
+            tests = self._tests[subject_id] = {
+                test_name: test_id
+                for test_id, test_name in self.db.query(Test.id, Test.name).filter(
+                    Test.subject_id == subject_id
+                )
+            }
+
+        test_id = tests.get(name)
+        if test_id is None:
+            test = Test(name=name, subject_id=subject_id)
+            self.db.add(test)
+            self.db.flush()
+            self.db.execute(insert(test_topics).values(test_id=test.id, topic_id=topic_id))
+            test_id = tests[name] = test.id
+            self._created_tests = True
+
+        if test_id not in self._loaded_tests:
+            self._existing.update(
+                (test_id, text)
+                for (text,) in self.db.query(Question.text).filter(Question.test_id == test_id)
+            )
+            self._loaded_tests.add(test_id)
+        return test_id
+
+    def add_item(self, item: dict) -> None:
+        """Bitta {subject, tests} elementini navbatga qo'shish"""
+        subject_name = item.get("subject")
+        test_data = item.get("tests", {})
+
+        if not subject_name:
+            self.errors.append("Fanning nomi topilmadi")
+            return
+
+        theme_name = test_data.get("theme")
+        if not theme_name:
+            self.errors.append(f"{subject_name} uchun tema topilmadi")
+            return
+
+        subject_id = self._get_subject_id(subject_name)
+        topic_id = self._get_topic_id(subject_id, theme_name)
+        test_id = self._get_test_id(subject_id, theme_name, topic_id)
+
+        for q_data in test_data.get("testQuestions", []):
+            q_text = q_data.get("question")
+            q_correct = q_data.get("correctAnswer")
+
+            if not q_text or not q_correct:
+                self.errors.append(f"Savolning matn yoki javobida xatolik: {q_data.get('id')}")
+                continue
+
+            # Savol qaytarilmasligi uchun
+            key = (test_id, q_text)
+            if key in self._existing:
+                continue
+            self._existing.add(key)
+
+            self._pending.append((
+                {
+                    "test_id": test_id,
+                    "topic_id": topic_id,
+                    "text": q_text,
+                    "correct_answer": q_correct
+                },
+                q_data.get("options", [])
+            ))
+            self._touched_tests.add(test_id)
+
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Navbatdagi savollar va variantlarni yozish (commit finish() da)"""
+        if not self._pending:
+            return
+
+        started = time.perf_counter()
+        question_rows = [question for question, _ in self._pending]
+        question_ids = self.db.scalars(
+            insert(Question).returning(Question.id, sort_by_parameter_order=True),
+            question_rows
+        ).all()
+
+        option_rows = [
+            {"question_id": question_id, "text": opt_text}
+            for question_id, (_, options) in zip(question_ids, self._pending)
+            for opt_text in options
+        ]
+        if option_rows:
+            self.db.execute(insert(Option), option_rows)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.batches.append({
+            "questions": len(question_rows),
+            "options": len(option_rows),
+            "elapsed_ms": round(elapsed_ms, 2)
+        })
+        self.imported_count += len(question_rows)
+        self._pending = []
+
+        if self.progress:
+            self.progress(self.imported_count)
+
+        logger.info(
+            "Import partiyasi yozildi: batch=%s, savollar=%s, variantlar=%s, vaqt=%.1fms",
+            len(self.batches), len(question_rows), len(option_rows), elapsed_ms
+        )
+
+    def finish(self) -> dict:
+        """
+        Qolgan savollarni yozish, butun importni commit qilish va natijani qaytarish
+
+        Partiyalar oldinroq database'ga yuboriladi, lekin commit bitta: fayl
+        oxirida JSON xatosi bo'lsa import_items hammasini bekor qiladi va
+        database'da qisman import qolmaydi. Keshlar commit'dan keyin tozalanadi.
+        """
+        self.flush()
+        self.db.commit()
+
+        for test_id in self._touched_tests:
+            question_pool_cache.invalidate(test_id)
+        self._touched_tests.clear()
+        if self._created_tests:
+            count_cache.invalidate("tests")
+            self._created_tests = False
+
+        return {
+            "success": True,
+            "imported_count": self.imported_count,
+            "errors": self.errors,
+            "batches": self.batches
+        }
+
 
 class ImportService:
-    
+
+    @staticmethod
+    def import_items(
+        db: Session,
+        items: Iterable[dict],
+        progress: Optional[Callable[[int], None]] = None
+    ) -> dict:
+        """
+        {subject, tests} elementlarini partiyalab import qilish
+
+        Elementlar iterator bo'lishi mumkin: ular kelishi bilan yozuvchiga
+        uzatiladi, shuning uchun xotira partiya hajmiga bog'liq.
+        progress har bir partiyadan keyin yozilgan savollar soni bilan chaqiriladi.
+        Import bitta tranzaksiya: xato bo'lsa hech narsa saqlanmaydi
+        (imported_count=0), shuning uchun faylni tuzatib qayta yuklash takror yaratmaydi.
+        """
+        try:
+            started = time.perf_counter()
+            writer = QuestionBankWriter(db, progress=progress)
+            for item in items:
+                writer.add_item(item)
+            result = writer.finish()
+
+            result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            logger.info(
+                "Import yakunlandi: savollar=%s, vaqt=%sms",
+                result['imported_count'], result['elapsed_ms']
+            )
+            return result
+
+        except json.JSONDecodeError as e:
+            db.rollback()
+            return {
+                "success": False,
+                "imported_count": 0,
+                "message": f"JSON parsing xatosi: {str(e)}"
+            }
+        except Exception as e:
+            db.rollback()
+            return {
+                "success": False,
+                "imported_count": 0,
+                "message": f"Import xatosi: {str(e)}"
+            }
+
     @staticmethod
     def import_tests_from_json(db: Session, json_data: str) -> dict:
         """
@@ -24,126 +367,23 @@ class ImportService:
         """
         try:
             data = json.loads(json_data)
-            
-            imported_count = 0
-            errors = []
-            
-            for item in data:
-                subject_name = item.get("subject")
-                test_data = item.get("tests", {})
-                
-                if not subject_name:
-                    errors.append("Fanning nomi topilmadi")
-                    continue
-                
-                # Fanini topish yoki yaratish
-                subject = db.query(Subject).filter(
-                    Subject.name == subject_name
-                ).first()
-                
-                if not subject:
-                    subject = Subject(name=subject_name)
-                    db.add(subject)
-                    db.flush()
-                
-                # Mavzuni topish yoki yaratish
-                theme_name = test_data.get("theme")
-                if not theme_name:
-                    errors.append(f"{subject_name} uchun tema topilmadi")
-                    continue
-                
-                topic = db.query(Topic).filter(
-                    Topic.subject_id == subject.id,
-                    Topic.name == theme_name
-                ).first()
-                
-                if not topic:
-                    # Topic raqamini aniqlash
-                    max_number = db.query(Topic).filter(
-                        Topic.subject_id == subject.id
-                    ).count()
-                    
-                    topic = Topic(
-                        subject_id=subject.id,
-                        topic_number=max_number + 1,
-                        name=theme_name
-                    )
-                    db.add(topic)
-                    db.flush()
-                
-                # Testni yaratish
-                test_name = theme_name
-                test = db.query(Test).filter(
-                    Test.name == test_name,
-                    Test.subject_id == subject.id
-                ).first()
-                
-                if not test:
-                    test = Test(
-                        name=test_name,
-                        subject_id=subject.id
-                    )
-                    db.add(test)
-                    db.flush()
-                    test.topics.append(topic)
-                
-                # Savol va variantlarni qo'shish
-                questions_data = test_data.get("testQuestions", [])
-                
-                for q_data in questions_data:
-                    q_id = q_data.get("id")
-                    q_text = q_data.get("question")
-                    q_options = q_data.get("options", [])
-                    q_correct = q_data.get("correctAnswer")
-                    
-                    if not q_text or not q_correct:
-                        errors.append(f"Savolning matn yoki javobida xatolik: {q_id}")
-                        continue
-                    
-                    # Savolni tekshirish (qaytarilmasligi uchun)
-                    existing_question = db.query(Question).filter(
-                        Question.test_id == test.id,
-                        Question.text == q_text
-                    ).first()
-                    
-                    if existing_question:
-                        continue
-                    
-                    question = Question(
-                        test_id=test.id,
-                        topic_id=topic.id,
-                        text=q_text,
-                        correct_answer=q_correct
-                    )
-                    db.add(question)
-                    db.flush()
-                    
-                    # Variantlarni qo'shish
-                    for opt_text in q_options:
-                        option = Option(
-                            question_id=question.id,
-                            text=opt_text
-                        )
-                        db.add(option)
-                    
-                    imported_count += 1
-                
-                db.commit()
-            
-            return {
-                "success": True,
-                "imported_count": imported_count,
-                "errors": errors
-            }
-            
         except json.JSONDecodeError as e:
             return {
                 "success": False,
                 "message": f"JSON parsing xatosi: {str(e)}"
             }
-        except Exception as e:
-            db.rollback()
-            return {
-                "success": False,
-                "message": f"Import xatosi: {str(e)}"
-            }
\ No newline at end of file
+        return ImportService.import_items(db, data)
+
+    @staticmethod
+    def import_tests_from_stream(
+        db: Session,
+        stream: BinaryIO,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> dict:
+        """
+        Yuklangan JSON fayldan testlarni oqim sifatida import qilish
+
+        Format import_tests_from_json bilan bir xil; fayl to'liq xotiraga
+        o'qilmaydi.
+        """
+        return ImportService.import_items(db, iter_json_array(stream), progress=progress)
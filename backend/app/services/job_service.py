@@ -0,0 +1,332 @@
+"""
+Fon vazifalari (import/export) tizimi
+Vazifalar thread pool'da bajariladi, holati va natija fayllari diskda saqlanadi
+"""
+import enum
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.import_service import ImportService
+from app.services.export_service import ExportService, EXPORT_MEDIA_TYPES
+from app.logger import get_logger
+
+logger = get_logger("job_service")
+settings = get_settings()
+
+# Vazifalar papkasi (holat JSON'lari, yuklangan va eksport fayllari);
+# JOBS_DIR sozlamasi bo'sh bo'lsa backend/jobs. Papka birinchi yozishda yaratiladi.
+JOBS_DIR = Path(settings.JOBS_DIR) if settings.JOBS_DIR else Path(__file__).parent.parent.parent / "jobs"
+
+# Progress holati diskka shu oraliqdan tez-tez yozilmaydi
+PROGRESS_SAVE_INTERVAL_SECONDS = 1.0
+
+
+class JobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Job:
+    """Bitta fon vazifasi va uning progressi"""
+
+    def __init__(self, kind: str, job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.status = JobStatus.PENDING
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.processed = 0
+        self.total: Optional[int] = None
+        self.fraction: Optional[float] = None
+        self.result: Optional[dict] = None
+        self.result_path: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.media_type: Optional[str] = None
+        self.error: Optional[str] = None
+        self._saved_at = 0.0
+        self._save_lock = threading.Lock()
+
+    @property
+    def state_path(self) -> Path:
+        return JOBS_DIR / f"{self.id}.json"
+
+    @property
+    def upload_path(self) -> Path:
+        """Import vazifasi uchun yuklangan fayl"""
+        return JOBS_DIR / f"{self.id}.upload"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def update_progress(self, processed: int, fraction: Optional[float] = None) -> None:
+        """Progressni yangilash (diskka vaqti-vaqti bilan yoziladi)"""
+        self.processed = processed
+        if fraction is None and self.total:
+            fraction = processed / self.total
+        if fraction is not None:
+            self.fraction = min(fraction, 1.0)
+
+        if time.monotonic() - self._saved_at >= PROGRESS_SAVE_INTERVAL_SECONDS:
+            self.save()
+
+    def to_dict(self) -> dict:
+        """Progress, tezlik (qator/s) va taxminiy qolgan vaqt bilan holat"""
+        rate = None
+        eta_seconds = None
+        if self.started_at:
+            end = self.finished_at or datetime.utcnow()
+            elapsed = (end - self.started_at).total_seconds()
+            if elapsed > 0:
+                rate = round(self.processed / elapsed, 2)
+            if self.status == JobStatus.RUNNING and self.fraction:
+                eta_seconds = round(elapsed * (1 - self.fraction) / self.fraction, 1)
+
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "processed": self.processed,
+            "total": self.total,
+            "progress": round(self.fraction * 100, 1) if self.fraction is not None else None,
+            "rate": rate,
+            "eta_seconds": eta_seconds,
+            "result": self.result,
+            "download_ready": self.result_path is not None,
+            "error": self.error
+        }
+
+    def save(self) -> None:
+        """
+        Holatni diskka atomar yozish (boshqa worker'lar ham o'qiy olishi uchun)
+
+        Har bir yozish o'z vaqtinchalik faylidan foydalanadi, holatni o'qish va
+        os.replace esa vazifa lock'i ostida: shutdown() va vazifa thread'i bir
+        vaqtda saqlasa, diskda eskirgan holat oxirgi bo'lib qolmaydi.
+        """
+        with self._save_lock:
+            data = self.to_dict()
+            data.update(result_path=self.result_path, filename=self.filename, media_type=self.media_type)
+            JOBS_DIR.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=JOBS_DIR, prefix=f"{self.id}.", suffix=".tmp", delete=False
+            ) as target:
+                target.write(json.dumps(data, ensure_ascii=False))
+            os.replace(target.name, self.state_path)
+            self._saved_at = time.monotonic()
+
+    @classmethod
+    def load(cls, job_id: str) -> Optional["Job"]:
+        """Diskdagi holatdan vazifani tiklash"""
+        path = JOBS_DIR / f"{job_id}.json"
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+
+        job = cls(data["kind"], job_id=data["id"])
+        job.status = JobStatus(data["status"])
+        job.created_at = datetime.fromisoformat(data["created_at"])
+        job.started_at = datetime.fromisoformat(data["started_at"]) if data["started_at"] else None
+        job.finished_at = datetime.fromisoformat(data["finished_at"]) if data["finished_at"] else None
+        job.processed = data["processed"]
+        job.total = data["total"]
+        job.fraction = data["progress"] / 100 if data["progress"] is not None else None
+        job.result = data["result"]
+        job.result_path = data["result_path"]
+        job.filename = data["filename"]
+        job.media_type = data["media_type"]
+        job.error = data["error"]
+        return job
+
+
+class JobManager:
+    """Vazifalarni thread pool'da bajaruvchi menejer"""
+
+    def __init__(self, max_workers: int, retention_hours: int):
+        self.retention = timedelta(hours=retention_hours)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job: Job, func: Callable[[Job], None]) -> Job:
+        """Vazifani navbatga qo'yish"""
+        self.prune()
+        with self._lock:
+            self._jobs[job.id] = job
+        job.save()
+        self._executor.submit(self._run, job, func)
+        logger.info("Vazifa navbatga qo'yildi: job_id=%s, kind=%s", job.id, job.kind)
+        return job
+
+    def _run(self, job: Job, func: Callable[[Job], None]) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        job.save()
+        try:
+            func(job)
+            job.status = JobStatus.COMPLETED
+            job.fraction = 1.0
+            logger.info("Vazifa yakunlandi: job_id=%s, processed=%s", job.id, job.processed)
+        except Exception as e:
+            logger.error("Vazifa xatosi: job_id=%s, error=%s", job.id, e, exc_info=True)
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            job.save()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Vazifani xotiradan yoki diskdan olish"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        # Faqat uuid hex ko'rinishidagi id'lar diskdan qidiriladi
+        if job is None and len(job_id) == 32 and all(ch in "0123456789abcdef" for ch in job_id):
+            job = Job.load(job_id)
+        return job
+
+    def prune(self) -> None:
+        """
+        Muddati o'tgan vazifalar va ularning fayllarini o'chirish
+
+        Yakunlanmagan vazifalar (process to'xtab qolgan) created_at bo'yicha
+        o'chiriladi, yuklangan fayli bilan birga. Bajarilayotgan vazifalar
+        o'tkazib yuboriladi: shu process'dagilari, va holat fayli muddat
+        ichida yangilangan RUNNING vazifalar (boshqa worker'larniki).
+        """
+        threshold = datetime.utcnow() - self.retention
+        with self._lock:
+            active = {job_id for job_id, job in self._jobs.items() if not job.is_finished}
+        for state_path in JOBS_DIR.glob("*.json"):
+            if state_path.stem in active:
+                continue
+            job = Job.load(state_path.stem)
+            if job is None or (job.finished_at or job.created_at) >= threshold:
+                continue
+            if job.status == JobStatus.RUNNING and datetime.utcfromtimestamp(state_path.stat().st_mtime) >= threshold:
+                continue
+            for path in (job.result_path, str(job.upload_path), str(state_path)):
+                if path and os.path.exists(path):
+                    os.remove(path)
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            logger.info("Eski vazifa o'chirildi: job_id=%s", job.id)
+
+    def shutdown(self) -> None:
+        """
+        Navbatdagi vazifalarni bekor qilish
+
+        Shu process'ning yakunlanmagan vazifalari diskda FAILED deb
+        belgilanadi, aks holda mijoz "running" holatini abadiy so'raydi.
+        Bajarilayotgan vazifa baribir tugasa, holatini o'zi qayta yozadi.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            unfinished = [job for job in self._jobs.values() if not job.is_finished]
+        for job in unfinished:
+            if job.status == JobStatus.PENDING and job.upload_path.exists():
+                os.remove(job.upload_path)
+            job.status = JobStatus.FAILED
+            job.error = "Server to'xtatildi, vazifa yakunlanmadi"
+            job.finished_at = datetime.utcnow()
+            job.save()
+            logger.warning("Yakunlanmagan vazifa FAILED deb belgilandi: job_id=%s", job.id)
+
+
+job_manager = JobManager(max_workers=settings.JOB_WORKERS, retention_hours=settings.JOB_RETENTION_HOURS)
+
+
+class JobService:
+
+    @staticmethod
+    def submit_import(stream: BinaryIO, filename: Optional[str] = None) -> Job:
+        """
+        Yuklangan JSON faylni diskka saqlab, importni fonda boshlash
+
+        Args:
+            stream: Yuklangan fayl oqimi
+            filename: Asl fayl nomi
+
+        Returns:
+            Job: Yaratilgan vazifa
+        """
+        job = Job("import")
+        upload_path = job.upload_path
+        JOBS_DIR.mkdir(parents=True, exist_ok=True)
+        with open(upload_path, "wb") as target:
+            shutil.copyfileobj(stream, target)
+        job.filename = filename
+
+        def run(job: Job) -> None:
+            size = os.path.getsize(upload_path)
+            db = SessionLocal()
+            try:
+                with open(upload_path, "rb") as source:
+                    def progress(processed: int) -> None:
+                        job.update_progress(processed, source.tell() / size if size else None)
+
+                    job.result = ImportService.import_tests_from_stream(db, source, progress=progress)
+                    job.processed = job.result.get("imported_count", job.processed)
+                if not job.result.get("success"):
+                    raise RuntimeError(job.result.get("message"))
+            finally:
+                db.close()
+                os.remove(upload_path)
+
+        return job_manager.submit(job, run)
+
+    @staticmethod
+    def submit_export(format: str, **filters) -> Job:
+        """
+        Natijalar eksportini fonda boshlash; tayyor fayl diskda saqlanadi
+
+        Args:
+            format: xlsx, csv yoki ndjson
+            filters: ExportService.results_query filtrlari
+
+        Returns:
+            Job: Yaratilgan vazifa
+        """
+        job = Job("export")
+        job.filename = f"results.{format}"
+        job.media_type = EXPORT_MEDIA_TYPES[format]
+        result_path = JOBS_DIR / f"{job.id}.{format}"
+
+        def run(job: Job) -> None:
+            db = SessionLocal()
+            try:
+                job.total = ExportService.count_results(db, **filters)
+                if format == "xlsx":
+                    with open(result_path, "wb") as target:
+                        ExportService.write_results_workbook(db, target, job.update_progress, **filters)
+                else:
+                    chunks = ExportService.iter_results_csv if format == "csv" else ExportService.iter_results_ndjson
+                    with open(result_path, "w", encoding="utf-8", newline="") as target:
+                        for chunk in chunks(job.update_progress, **filters):
+                            target.write(chunk)
+            except Exception:
+                if result_path.exists():
+                    os.remove(result_path)
+                raise
+            finally:
+                db.close()
+
+            job.result = {"rows": job.processed}
+            job.result_path = str(result_path)
+
+        return job_manager.submit(job, run)
@@ -2,7 +2,12 @@ import random
 import string
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, update
+from app.models.student import Student
 from app.models.test_session import TestSession, SessionStatus
+from app.services.test_service import TestService
+from app.services.session_store import SessionState, session_store
+from app.services.session_sweeper import DEADLINE_GRACE_SECONDS, compute_deadline, deadline_scheduler
 from app.config import get_settings
 from app.logger import get_logger
 from app.exceptions import OTPException, NotFoundException
@@ -16,7 +21,7 @@ class OTPService:
     def generate_otp() -> str:
         """6 raqamli OTP generatsiya qilish"""
         otp = ''.join(random.choices(string.digits, k=6))
-        logger.debug(f"OTP generatsiya qilindi")
+        logger.debug("OTP generatsiya qilindi")
         return otp
     
     @staticmethod
@@ -36,17 +41,22 @@ class OTPService:
             OTPException: Sessiya yaratishda xatolik
         """
         try:
-            logger.info(f"Yangi sessiya yaratish: student_id={student_id}, test_id={test_id}")
+            logger.info("Yangi sessiya yaratish: student_id=%s, test_id=%s", student_id, test_id)
 
             # Eski faol sessiyalarni tugatish
-            expired_count = db.query(TestSession).filter(
-                TestSession.student_id == student_id,
-                TestSession.test_id == test_id,
-                TestSession.status == SessionStatus.ACTIVE
-            ).update({"status": SessionStatus.EXPIRED})
+            expired_ids = db.scalars(
+                update(TestSession).where(
+                    TestSession.student_id == student_id,
+                    TestSession.test_id == test_id,
+                    TestSession.status == SessionStatus.ACTIVE
+                ).values(status=SessionStatus.EXPIRED).returning(TestSession.id),
+                execution_options={"synchronize_session": False}
+            ).all()
 
-            if expired_count > 0:
-                logger.info(f"{expired_count} ta eski sessiya tugatilib, EXPIRED qilindi")
+            for expired_id in expired_ids:
+                session_store.delete(expired_id)
+            if expired_ids:
+                logger.info("%s ta eski sessiya tugatilib, EXPIRED qilindi", len(expired_ids))
 
             db.commit()
 
@@ -62,83 +72,306 @@ class OTPService:
             db.add(session)
             db.commit()
             db.refresh(session)
+            session_store.put(SessionState.from_session(session))
 
-            logger.info(f"Sessiya muvaffaqiyatli yaratildi: session_id={session.id}, expires_at={expires_at}")
+            logger.info(
+                "Sessiya muvaffaqiyatli yaratildi: session_id=%s, expires_at=%s",
+                session.id, expires_at
+            )
             return session
 
         except Exception as e:
-            logger.error(f"Sessiya yaratishda xatolik: {str(e)}", exc_info=True)
+            logger.error("Sessiya yaratishda xatolik: %s", e, exc_info=True)
             db.rollback()
             raise OTPException("Sessiya yaratishda xatolik yuz berdi", status_code=500)
     
     @staticmethod
-    def verify_otp(db: Session, session_id: int, otp: str) -> tuple[bool, TestSession]:
+    def generate_unique_otps(db: Session, count: int) -> list[str]:
         """
-        OTP tekshirish
+        count ta bir-biridan va database'dagi OTP'lardan farqli OTP generatsiya qilish
 
-        Args:
-            db: Database session
-            session_id: Sessiya ID
-            otp: Kiritilgan OTP
+        Nomzodlar xotirada takrorlanmaydigan qilib yaratiladi, database'dagi
+        band OTP'lar esa har aylanishda bitta so'rov bilan tekshiriladi.
+        """
+        otps: set[str] = set()
+        while len(otps) < count:
+            candidates: set[str] = set()
+            while len(otps) + len(candidates) < count:
+                otp = OTPService.generate_otp()
+                if otp not in otps:
+                    candidates.add(otp)
+            taken = set(db.scalars(select(TestSession.otp).where(TestSession.otp.in_(candidates))))
+            otps |= candidates - taken
+        return list(otps)
+
+    @staticmethod
+    def create_group_sessions(db: Session, group_id: int, test_id: int) -> list[dict]:
+        """
+        Guruhning barcha talabalari uchun test sessiyalarini yaratish
+
+        Eski faol sessiyalar bitta UPDATE bilan tugatiladi, yangilari bitta
+        INSERT bilan yoziladi va bitta tranzaksiyada commit qilinadi.
 
         Returns:
-            tuple: (success: bool, session: TestSession)
+            list[dict]: Talabalar ismi bo'yicha tartiblangan ro'yxat
+                (student_id, full_name, session_id, otp, expires_at)
+
+        Raises:
+            OTPException: Sessiyalar yaratishda xatolik
+        """
+        try:
+            students = db.execute(
+                select(Student.id, Student.full_name).where(
+                    Student.group_id == group_id
+                ).order_by(Student.full_name, Student.id)
+            ).all()
+            if not students:
+                return []
+
+            logger.info(
+                "Guruh uchun sessiyalar yaratish: group_id=%s, test_id=%s, talabalar=%s",
+                group_id, test_id, len(students)
+            )
+
+            student_ids = [student.id for student in students]
+            expired_ids = db.scalars(
+                update(TestSession).where(
+                    TestSession.student_id.in_(student_ids),
+                    TestSession.test_id == test_id,
+                    TestSession.status == SessionStatus.ACTIVE
+                ).values(status=SessionStatus.EXPIRED).returning(TestSession.id),
+                execution_options={"synchronize_session": False}
+            ).all()
+
+            now = datetime.utcnow()
+            expires_at = now + timedelta(minutes=settings.OTP_EXPIRY_MINUTES)
+            otps = OTPService.generate_unique_otps(db, len(students))
+            rows = [
+                {
+                    "student_id": student.id,
+                    "test_id": test_id,
+                    "otp": otp,
+                    "status": SessionStatus.ACTIVE,
+                    "otp_attempts": 0,
+                    "created_at": now,
+                    "expires_at": expires_at
+                }
+                for student, otp in zip(students, otps)
+            ]
+            # RETURNING tartibi kafolatlanmagan: id'lar noyob OTP bo'yicha moslanadi
+            session_ids = {
+                otp: session_id for session_id, otp in db.execute(
+                    insert(TestSession).returning(TestSession.id, TestSession.otp),
+                    rows
+                )
+            }
+            db.commit()
+
+            for expired_id in expired_ids:
+                session_store.delete(expired_id)
+
+            roster = []
+            for student, row in zip(students, rows):
+                session_id = session_ids[row["otp"]]
+                session_store.put(SessionState(
+                    id=session_id,
+                    student_id=student.id,
+                    test_id=test_id,
+                    otp=row["otp"],
+                    status=SessionStatus.ACTIVE,
+                    expires_at=expires_at
+                ))
+                roster.append({
+                    "student_id": student.id,
+                    "full_name": student.full_name,
+                    "session_id": session_id,
+                    "otp": row["otp"],
+                    "expires_at": expires_at
+                })
+
+            logger.info(
+                "Guruh sessiyalari yaratildi: group_id=%s, yaratildi=%s, tugatildi=%s",
+                group_id, len(roster), len(expired_ids)
+            )
+            return roster
+
+        except Exception as e:
+            logger.error("Guruh sessiyalarini yaratishda xatolik: %s", e, exc_info=True)
+            db.rollback()
+            raise OTPException("Sessiyalar yaratishda xatolik yuz berdi", status_code=500)
+
+    @staticmethod
+    def get_state(db: Session, session_id: int) -> SessionState:
+        """
+        Sessiya holatini ombordan olish, bo'lmasa database'dan yuklash
 
         Raises:
             NotFoundException: Sessiya topilmasa
         """
-        logger.info(f"OTP tekshirish: session_id={session_id}")
+        state = session_store.get(session_id)
+        if state is not None:
+            return state
 
         session = db.query(TestSession).filter(
             TestSession.id == session_id
         ).first()
 
         if not session:
-            logger.warning(f"Sessiya topilmadi: session_id={session_id}")
+            logger.warning("Sessiya topilmadi: session_id=%s", session_id)
             raise NotFoundException("Sessiya", session_id)
 
+        state = SessionState.from_session(session)
+        session_store.put(state)
+        return state
+
+    @staticmethod
+    def _write_through(db: Session, session_id: int, values: dict) -> bool:
+        """
+        Holat o'zgarishini database'ga yozish
+
+        Faqat hali ACTIVE/BLOCKED sessiya yangilanadi: boshqa worker'ning
+        eskirgan ombor yozuvi yakunlangan sessiyani qayta ochmasligi uchun.
+
+        Returns:
+            bool: Qator yangilangan bo'lsa True
+        """
+        updated = db.query(TestSession).filter(
+            TestSession.id == session_id,
+            TestSession.status.in_((SessionStatus.ACTIVE, SessionStatus.BLOCKED))
+        ).update(values, synchronize_session=False)
+        db.commit()
+        return updated > 0
+
+    @staticmethod
+    def _reload_state(db: Session, session_id: int) -> SessionState:
+        """Ombordagi eskirgan holatni tashlab, database'dan qayta yuklash"""
+        logger.warning("Ombordagi sessiya holati eskirgan, qayta yuklanadi: session_id=%s", session_id)
+        session_store.delete(session_id)
+        return OTPService.get_state(db, session_id)
+
+    @staticmethod
+    def verify_otp(db: Session, session_id: int, otp: str) -> tuple[bool, SessionState]:
+        """
+        OTP tekshirish
+
+        Holat ombordan olinadi; noto'g'ri urinishlar faqat omborda sanaladi,
+        database'ga esa faqat holat o'zgarganda (boshlandi, bloklandi,
+        muddati o'tdi) yoziladi.
+
+        Args:
+            db: Database session
+            session_id: Sessiya ID
+            otp: Kiritilgan OTP
+
+        Returns:
+            tuple: (success: bool, state: SessionState)
+
+        Raises:
+            NotFoundException: Sessiya topilmasa
+            ValidationException: To'g'ri OTP, lekin test uchun savollar mavjud bo'lmasa
+        """
+        logger.info("OTP tekshirish: session_id=%s", session_id)
+
+        state = OTPService.get_state(db, session_id)
+        now = datetime.utcnow()
+        recovered = False
+
         # OTP vaqti o'tganmi?
-        if datetime.utcnow() > session.expires_at:
-            logger.warning(f"OTP vaqti o'tgan: session_id={session_id}")
-            session.status = SessionStatus.EXPIRED
-            db.commit()
-            return False, session
+        if now > state.expires_at:
+            logger.warning("OTP vaqti o'tgan: session_id=%s", session_id)
+            if state.status != SessionStatus.EXPIRED:
+                if not OTPService._write_through(db, session_id, {"status": SessionStatus.EXPIRED}):
+                    return False, OTPService._reload_state(db, session_id)
+                state.status = SessionStatus.EXPIRED
+            return False, state
 
         # Bloklanganmi?
-        if session.status == SessionStatus.BLOCKED:
-            if session.blocked_until and datetime.utcnow() < session.blocked_until:
-                logger.warning(f"Sessiya bloklangan: session_id={session_id}, blocked_until={session.blocked_until}")
-                return False, session
-            elif session.blocked_until and datetime.utcnow() >= session.blocked_until:
-                logger.info(f"Bloklash vaqti tugadi, sessiya qayta faollashtirildi: session_id={session_id}")
-                session.status = SessionStatus.ACTIVE
-                session.otp_attempts = 0
+        blocked = state.status == SessionStatus.BLOCKED and state.blocked_until is not None
+        if blocked and now < state.blocked_until:
+            logger.warning(
+                "Sessiya bloklangan: session_id=%s, blocked_until=%s",
+                session_id, state.blocked_until
+            )
+            return False, state
+
+        # To'g'ri OTP bilan boshlanadigan testning savollar puli holat o'zgarishidan
+        # oldin olinadi: savolsiz test ValidationException beradi, sessiya
+        # boshlanmaydi va urinish sarflanmaydi
+        pool = None
+        if state.otp == otp and (not state.has_question_set or state.deadline_at is None):
+            pool = TestService.get_question_pool(db, state.test_id)
+
+        if blocked:
+            logger.info("Bloklash vaqti tugadi, sessiya qayta faollashtirildi: session_id=%s", session_id)
+            state.status = SessionStatus.ACTIVE
+            state.otp_attempts = 0
+            recovered = True
 
         # OTP tekshirish
-        if session.otp != otp:
-            session.otp_attempts += 1
-            logger.warning(f"Noto'g'ri OTP: session_id={session_id}, attempts={session.otp_attempts}")
+        if state.otp != otp:
+            state.otp_attempts += 1
+            logger.warning("Noto'g'ri OTP: session_id=%s, attempts=%s", session_id, state.otp_attempts)
 
-            if session.otp_attempts >= 3:
-                session.status = SessionStatus.BLOCKED
-                session.blocked_until = datetime.utcnow() + timedelta(seconds=15)
-                logger.warning(f"Sessiya bloklandi (3 ta noto'g'ri urinish): session_id={session_id}")
+            if state.otp_attempts >= 3:
+                state.status = SessionStatus.BLOCKED
+                state.blocked_until = now + timedelta(seconds=15)
+                logger.warning("Sessiya bloklandi (3 ta noto'g'ri urinish): session_id=%s", session_id)
+                if not OTPService._write_through(db, session_id, {
+                    "status": SessionStatus.BLOCKED,
+                    "otp_attempts": state.otp_attempts,
+                    "blocked_until": state.blocked_until
+                }):
+                    return False, OTPService._reload_state(db, session_id)
 
-            db.commit()
-            return False, session
+            return False, state
 
         # OTP to'g'ri
-        logger.info(f"OTP muvaffaqiyatli tasdiqlandi: session_id={session_id}")
-        session.started_at = datetime.utcnow()
-        db.commit()
-        return True, session
-    
+        logger.info("OTP muvaffaqiyatli tasdiqlandi: session_id=%s", session_id)
+        values = {
+            "otp_attempts": state.otp_attempts,
+            "started_at": now
+        }
+        # Status faqat BLOCKED -> ACTIVE tiklanishida yoziladi
+        if recovered:
+            values["status"] = SessionStatus.ACTIVE
+        if not state.has_question_set:
+            values["question_set"] = TestService.draw_question_set(db, state.test_id)
+
+        # Deadline faqat birinchi boshlashda belgilanadi (qayta kirish vaqtni uzaytirmaydi)
+        deadline_at = state.deadline_at
+        if deadline_at is None:
+            deadline_at = values["deadline_at"] = compute_deadline(now, pool.duration_minutes)
+        if not OTPService._write_through(db, session_id, values):
+            # Sessiya boshqa worker'da yakunlangan yoki muddati o'tgan
+            return False, OTPService._reload_state(db, session_id)
+
+        state.started_at = now
+        state.deadline_at = deadline_at
+        state.has_question_set = True
+        deadline_scheduler.schedule(session_id, deadline_at)
+        return True, state
+
     @staticmethod
-    def is_session_active(session: TestSession) -> bool:
+    def is_session_active(session: TestSession, grace_seconds: int = 0) -> bool:
+        """
+        Sessiya javob qabul qila oladimi
+
+        grace_seconds: deadline_at'dan keyingi qo'shimcha vaqt. Yakuniy javoblar
+        (/submit-answers, /finish-test) deadline paytida yo'lda bo'lishi mumkin,
+        DeadlineScheduler esa sessiyani DEADLINE_GRACE_SECONDS dan keyin yopadi.
+        """
         if session.status != SessionStatus.ACTIVE:
             return False
-        if datetime.utcnow() > session.expires_at:
+        now = datetime.utcnow()
+        if now > session.expires_at:
             return False
         if session.started_at is None:
             return False
-        return True
\ No newline at end of file
+        if session.deadline_at is not None and now > session.deadline_at + timedelta(seconds=grace_seconds):
+            return False
+        return True
+
+    @staticmethod
+    def accepts_final_answers(session: TestSession) -> bool:
+        """Yakuniy javoblar to'plami: deadline'dan keyin DEADLINE_GRACE_SECONDS ichida ham qabul qilinadi"""
+        return OTPService.is_session_active(session, grace_seconds=DEADLINE_GRACE_SECONDS)
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Admin ro'yxatlari uchun keyset (kursor) paginatsiya
+Sahifa OFFSET bilan emas, oxirgi qator id'sidan keyingi (`after_id`)
+qatorlar bilan olinadi: jadval qancha katta bo'lmasin, har bir sahifa
+primary key indeksidan o'qiladi. Qatorlar faqat javobga kerakli ustunlar
+bilan tanlanadi (ORM obyektlari yaratilmaydi).
+
+Umumiy son (`include_total=true`) ixtiyoriy va qisqa muddat keshlanadi.
+"""
+import threading
+import time
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.logger import get_logger
+from app.metrics import record_cache
+
+logger = get_logger("pagination")
+settings = get_settings()
+
+# Ruxsat etilgan tartiblar: ikkalasi ham primary key indeksidan o'qiladi
+SORT_PATTERN = "^-?id$"
+
+
+class Page:
+    """Bitta sahifa: qatorlar, keyingi sahifa kursori va (so'ralsa) umumiy son"""
+
+    __slots__ = ("items", "next_after_id", "total")
+
+    def __init__(self, items: list[dict], next_after_id: Optional[int], total: Optional[int] = None):
+        self.items = items
+        self.next_after_id = next_after_id
+        self.total = total
+
+
+class CountCache:
+    """Ro'yxatlar umumiy soni keshi (TTL bilan), kalit: (jadval, filtrlar...)"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._counts: dict[tuple, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[int]:
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._counts[key]
+                entry = None
+        record_cache("list_count", entry is not None)
+        return entry[0] if entry is not None else None
+
+    def put(self, key: tuple, value: int) -> None:
+        with self._lock:
+            self._counts[key] = (value, time.monotonic())
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Bitta jadvalning yoki barcha sonlarni tozalash"""
+        with self._lock:
+            if table is None:
+                self._counts.clear()
+            else:
+                for key in [key for key in self._counts if key[0] == table]:
+                    del self._counts[key]
+
+
+count_cache = CountCache(ttl_seconds=settings.ADMIN_COUNT_CACHE_TTL_SECONDS)
+
+
+class PaginationService:
+
+    @staticmethod
+    def fetch_page(
+        db: Session,
+        columns: list,
+        id_column,
+        filters: list,
+        after_id: Optional[int],
+        limit: int,
+        sort: str = "id"
+    ) -> Page:
+        """
+        Bitta sahifani keyset usulida olish
+
+        Args:
+            columns: Tanlanadigan ustunlar (javob sxemasi maydonlari)
+            id_column: Kursor ustuni (primary key)
+            filters: WHERE shartlari
+            after_id: Oldingi sahifaning `next_after_id` qiymati
+            limit: Sahifadagi qatorlar soni
+            sort: "id" (o'sish) yoki "-id" (kamayish)
+
+        Returns:
+            Page: next_after_id oxirgi sahifada None
+        """
+        descending = sort.startswith("-")
+        statement = select(*columns).where(*filters)
+        if after_id is not None:
+            statement = statement.where(id_column < after_id if descending else id_column > after_id)
+        statement = statement.order_by(id_column.desc() if descending else id_column.asc())
+
+        # Bitta ortiqcha qator: keyingi sahifa bor-yo'qligini bilish uchun
+        rows = db.execute(statement.limit(limit + 1)).all()
+        items = [row._asdict() for row in rows[:limit]]
+        next_after_id = items[-1][id_column.key] if len(rows) > limit else None
+        return Page(items, next_after_id)
+
+    @staticmethod
+    def count(db: Session, key: tuple, id_column, filters: list) -> int:
+        """Filtrlangan qatorlar soni (count_cache orqali)"""
+        total = count_cache.get(key)
+        if total is None:
+            total = db.scalar(select(func.count(id_column)).where(*filters))
+            count_cache.put(key, total)
+            logger.debug("Ro'yxat soni hisoblandi: key=%s, total=%s", key, total)
+        return total
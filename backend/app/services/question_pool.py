@@ -0,0 +1,83 @@
+"""
+Savollar puli keshi
+Har bir test uchun tanlanishi mumkin bo'lgan savollar, ularning tayyor
+(serialize qilingan) ko'rinishi va javoblar kaliti process ichida saqlanadi
+"""
+import threading
+import time
+from array import array
+from typing import Optional
+from app.config import get_settings
+from app.logger import get_logger
+from app.metrics import record_cache
+
+logger = get_logger("question_pool")
+settings = get_settings()
+
+
+def normalize_answer(answer: str) -> str:
+    """Javoblarni solishtirish uchun bir xil ko'rinishga keltirish"""
+    return answer.strip().lower()
+
+
+class QuestionPool:
+    """
+    Bitta testning savollar puli
+
+    answer_key: question_id -> normalize_answer() qilingan to'g'ri javob
+    """
+
+    __slots__ = ("test_id", "question_ids", "payloads", "answer_key", "duration_minutes", "loaded_at")
+
+    def __init__(
+        self,
+        test_id: int,
+        payloads: dict[int, dict],
+        answer_key: Optional[dict[int, str]] = None,
+        duration_minutes: Optional[int] = None
+    ):
+        self.test_id = test_id
+        self.question_ids = array("i", payloads.keys())
+        self.payloads = payloads
+        self.answer_key = answer_key or {}
+        self.duration_minutes = duration_minutes
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+
+class QuestionPoolCache:
+    """test_id bo'yicha QuestionPool keshi (TTL bilan)"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._pools: dict[int, QuestionPool] = {}
+        self._lock = threading.Lock()
+
+    def get(self, test_id: int) -> Optional[QuestionPool]:
+        """Keshdagi pulni olish, muddati o'tgan bo'lsa o'chiriladi"""
+        with self._lock:
+            pool = self._pools.get(test_id)
+            if pool is not None and time.monotonic() - pool.loaded_at > self.ttl_seconds:
+                del self._pools[test_id]
+                logger.debug("Savollar puli muddati o'tdi: test_id=%s", test_id)
+                pool = None
+        record_cache("question_pool", pool is not None)
+        return pool
+
+    def put(self, pool: QuestionPool) -> None:
+        with self._lock:
+            self._pools[pool.test_id] = pool
+
+    def invalidate(self, test_id: Optional[int] = None) -> None:
+        """Bitta test yoki butun keshni tozalash"""
+        with self._lock:
+            if test_id is None:
+                self._pools.clear()
+            else:
+                self._pools.pop(test_id, None)
+        logger.debug("Savollar puli bekor qilindi: test_id=%s", test_id)
+
+
+question_pool_cache = QuestionPoolCache(ttl_seconds=settings.QUESTION_POOL_TTL_SECONDS)
@@ -1,13 +1,20 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects import postgresql, sqlite
 from app.models.answer import Answer
 from app.models.result import Result
 from app.models.test_session import TestSession, SessionStatus
 from app.logger import get_logger
-from app.exceptions import NotFoundException
+from app.exceptions import NotFoundException, DatabaseException
 
 logger = get_logger("result_service")
 
+# ON CONFLICT ... DO UPDATE qo'llab-quvvatlaydigan dialektlar uchun insert()
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
 class ResultService:
     
     @staticmethod
@@ -15,6 +22,11 @@ class ResultService:
         """
         Test natijasini hisoblash
 
+        Javoblar soni va to'g'rilari bitta aggregate so'rov bilan sanaladi,
+        natija esa bitta INSERT ... ON CONFLICT (student_id, test_id) DO UPDATE
+        bilan yoziladi. Shuning uchun bir vaqtda kelgan ikki yakunlash
+        so'rovi ham bitta natija qatorini yangilaydi.
+
         Args:
             db: Database session
             test_session_id: Test sessiya ID
@@ -25,57 +37,57 @@ class ResultService:
         Raises:
             NotFoundException: Sessiya topilmasa
         """
-        logger.info(f"Natijani hisoblash: session_id={test_session_id}")
+        logger.info("Natijani hisoblash: session_id=%s", test_session_id)
 
-        test_session = db.query(TestSession).filter(
-            TestSession.id == test_session_id
+        row = db.execute(
+            select(
+                TestSession.student_id,
+                TestSession.test_id,
+                func.count(Answer.id).label("total_count"),
+                func.coalesce(func.sum(case((Answer.is_correct.is_(True), 1), else_=0)), 0).label("correct_count")
+            ).outerjoin(
+                Answer, Answer.test_session_id == TestSession.id
+            ).where(
+                TestSession.id == test_session_id
+            ).group_by(
+                TestSession.student_id, TestSession.test_id
+            )
         ).first()
 
-        if not test_session:
-            logger.error(f"Test sessiyasi topilmadi: session_id={test_session_id}")
+        if not row:
+            logger.error("Test sessiyasi topilmadi: session_id=%s", test_session_id)
             raise NotFoundException("Test sessiyasi", test_session_id)
 
-        # Talabaning javoblarini olish
-        answers = db.query(Answer).filter(
-            Answer.test_session_id == test_session_id
-        ).all()
-
-        total_count = len(answers)
-        correct_count = sum(1 for answer in answers if answer.is_correct)
+        total_count = row.total_count
+        correct_count = row.correct_count
         percentage = (correct_count / total_count * 100) if total_count > 0 else 0
 
-        logger.info(f"Natija: correct={correct_count}, total={total_count}, percentage={percentage:.2f}%")
+        logger.info("Natija: correct=%s, total=%s, percentage=%.2f%%", correct_count, total_count, percentage)
 
         # Eski natijani almashtirish (qayta topshirganda)
-        existing_result = db.query(Result).filter(
-            and_(
-                Result.student_id == test_session.student_id,
-                Result.test_id == test_session.test_id
-            )
-        ).first()
-
-        if existing_result:
-            logger.info(f"Mavjud natija yangilanmoqda: result_id={existing_result.id}")
-            existing_result.correct_count = correct_count
-            existing_result.total_count = total_count
-            existing_result.percentage = percentage
-            db.commit()
-            logger.info(f"Natija muvaffaqiyatli yangilandi")
-            return existing_result
+        dialect = db.get_bind().dialect.name
+        if dialect not in UPSERT_INSERTS:
+            raise DatabaseException(f"Natijani yozish {dialect} uchun qo'llab-quvvatlanmaydi")
 
-        # Yangi natijani yaratish
-        result = Result(
-            student_id=test_session.student_id,
-            test_id=test_session.test_id,
+        statement = UPSERT_INSERTS[dialect](Result).values(
+            student_id=row.student_id,
+            test_id=row.test_id,
             correct_count=correct_count,
             total_count=total_count,
             percentage=percentage
         )
-        db.add(result)
-        db.commit()
-        db.refresh(result)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Result.student_id, Result.test_id],
+            set_={
+                "correct_count": statement.excluded.correct_count,
+                "total_count": statement.excluded.total_count,
+                "percentage": statement.excluded.percentage
+            }
+        ).returning(Result)
 
-        logger.info(f"Yangi natija yaratildi: result_id={result.id}")
+        result = db.scalars(statement, execution_options={"populate_existing": True}).one()
+        logger.info("Natija saqlandi: result_id=%s", result.id)
+        db.commit()
         return result
     
     @staticmethod
@@ -0,0 +1,140 @@
+"""
+Test sessiyalari holati ombori
+OTP tekshirish uchun kerak bo'lgan holat (OTP, urinishlar, bloklash va
+muddat) xotirada saqlanadi; database'ga faqat holat o'zgarganda yoziladi
+"""
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+from app.models.test_session import TestSession, SessionStatus
+from app.config import get_settings
+from app.logger import get_logger
+from app.metrics import record_cache
+
+logger = get_logger("session_store")
+settings = get_settings()
+
+
+class SessionState:
+    """OTP tekshirish uchun sessiya holati"""
+
+    __slots__ = (
+        "id", "student_id", "test_id", "otp", "status", "otp_attempts",
+        "blocked_until", "expires_at", "started_at", "deadline_at", "has_question_set"
+    )
+
+    def __init__(
+        self,
+        id: int,
+        student_id: int,
+        test_id: int,
+        otp: str,
+        status: SessionStatus,
+        expires_at: datetime,
+        otp_attempts: int = 0,
+        blocked_until: Optional[datetime] = None,
+        started_at: Optional[datetime] = None,
+        deadline_at: Optional[datetime] = None,
+        has_question_set: bool = False
+    ):
+        self.id = id
+        self.student_id = student_id
+        self.test_id = test_id
+        self.otp = otp
+        self.status = status
+        self.expires_at = expires_at
+        self.otp_attempts = otp_attempts
+        self.blocked_until = blocked_until
+        self.started_at = started_at
+        self.deadline_at = deadline_at
+        self.has_question_set = has_question_set
+
+    @classmethod
+    def from_session(cls, session: TestSession) -> "SessionState":
+        return cls(
+            id=session.id,
+            student_id=session.student_id,
+            test_id=session.test_id,
+            otp=session.otp,
+            status=session.status or SessionStatus.ACTIVE,
+            expires_at=session.expires_at,
+            otp_attempts=session.otp_attempts or 0,
+            blocked_until=session.blocked_until,
+            started_at=session.started_at,
+            deadline_at=session.deadline_at,
+            has_question_set=session.question_set is not None
+        )
+
+
+class SessionStateStore(ABC):
+    """
+    Sessiya holati ombori interfeysi
+
+    Umumiy (bir nechta worker uchun) backend, masalan Redis, shu klassdan
+    meros olib get/put/delete/clear metodlarini amalga oshiradi.
+    """
+
+    @abstractmethod
+    def get(self, session_id: int) -> Optional[SessionState]:
+        ...
+
+    @abstractmethod
+    def put(self, state: SessionState) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: int) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class InMemorySessionStateStore(SessionStateStore):
+    """Process ichidagi ombor (standart)"""
+
+    def __init__(self):
+        self._states: dict[int, SessionState] = {}
+        self._lock = threading.Lock()
+        self._next_purge = 1024
+
+    def get(self, session_id: int) -> Optional[SessionState]:
+        with self._lock:
+            state = self._states.get(session_id)
+        record_cache("session_store", state is not None)
+        return state
+
+    def put(self, state: SessionState) -> None:
+        with self._lock:
+            self._states[state.id] = state
+            if len(self._states) >= self._next_purge:
+                self._purge_expired()
+
+    def delete(self, session_id: int) -> None:
+        with self._lock:
+            self._states.pop(session_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def _purge_expired(self) -> None:
+        """OTP muddati o'tgan holatlarni o'chirish (lock ichida chaqiriladi)"""
+        now = datetime.utcnow()
+        expired = [session_id for session_id, state in self._states.items() if state.expires_at < now]
+        for session_id in expired:
+            del self._states[session_id]
+        self._next_purge = max(1024, len(self._states) * 2)
+        logger.debug("Sessiya holatlari tozalandi: o'chirildi=%s, qoldi=%s", len(expired), len(self._states))
+
+
+def create_session_store(backend: str) -> SessionStateStore:
+    """Sozlamadagi backend bo'yicha omborni yaratish"""
+    if backend == "memory":
+        return InMemorySessionStateStore()
+    raise ValueError(f"Noma'lum sessiya ombori: {backend}")
+
+
+session_store = create_session_store(settings.SESSION_STORE_BACKEND)
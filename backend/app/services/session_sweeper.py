@@ -0,0 +1,379 @@
+"""
+Muddati o'tgan test sessiyalarini yakunlash
+DeadlineScheduler boshlangan sessiyalarni deadline_at kelishi bilan
+yakunlaydi (min-heap, jadval skanerlanmaydi). Tozalovchi esa OTP muddati
+o'tgan (boshlanmagan yoki bloklangan) sessiyalarni partiyalab EXPIRED
+qiladi va scheduler'dan qolib ketgan sessiyalarni yakunlaydi; u fon
+thread'ida yoki `python manage.py sweep-sessions` bilan ishga tushiriladi.
+"""
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.test import Test
+from app.models.test_session import TestSession, SessionStatus
+from app.services.answer_buffer import answer_buffer
+from app.services.result_service import ResultService
+from app.services.session_store import session_store
+from app.logger import get_logger
+
+logger = get_logger("session_sweeper")
+settings = get_settings()
+
+# Bitta UPDATE'dagi sessiyalar soni
+SWEEP_BATCH_SIZE = 500
+
+# Test vaqti tugagandan keyin yo'ldagi javoblar uchun kutish
+FINISH_GRACE_SECONDS = 60
+
+# DeadlineScheduler deadline_at'dan keyin shuncha kutib yakunlaydi
+DEADLINE_GRACE_SECONDS = 5
+
+
+def compute_deadline(started_at: datetime, duration_minutes: Optional[int]) -> datetime:
+    """Test boshlangan vaqt va davomiyligidan deadline hisoblash"""
+    return started_at + timedelta(minutes=duration_minutes or settings.TEST_DURATION_MINUTES)
+
+
+class SessionSweeperService:
+
+    @staticmethod
+    def expire_sessions(db: Session, now: datetime, batch_size: int = SWEEP_BATCH_SIZE) -> tuple[int, int]:
+        """
+        OTP muddati o'tgan, boshlanmagan ACTIVE/BLOCKED sessiyalarni EXPIRED qilish
+
+        Returns:
+            tuple: (EXPIRED qilinganlar soni, partiyalar soni)
+        """
+        condition = (
+            TestSession.status.in_([SessionStatus.ACTIVE, SessionStatus.BLOCKED]),
+            TestSession.expires_at < now,
+            TestSession.started_at.is_(None)
+        )
+
+        expired = 0
+        batches = 0
+        while True:
+            ids = db.scalars(select(TestSession.id).where(*condition).limit(batch_size)).all()
+            if not ids:
+                break
+            result = db.execute(
+                update(TestSession).where(TestSession.id.in_(ids), *condition).values(
+                    status=SessionStatus.EXPIRED
+                ),
+                execution_options={"synchronize_session": False}
+            )
+            db.commit()
+            for session_id in ids:
+                session_store.delete(session_id)
+            expired += result.rowcount
+            batches += 1
+            if len(ids) < batch_size:
+                break
+        return expired, batches
+
+    @staticmethod
+    def finish_sessions(db: Session, session_ids: list[int], now: datetime) -> int:
+        """
+        Sessiyalarni COMPLETED qilish va natijasini hisoblash
+
+        Har bir sessiyaning status UPDATE'i va natijasi bitta tranzaksiyada
+        yoziladi. UPDATE faqat hali ACTIVE bo'lgan sessiyaga tegadi, shuning
+        uchun bir vaqtda kelgan /finish-test bilan natija ikki marta yozilmaydi.
+        Natijani hisoblashda xato bo'lsa, tranzaksiya bekor qilinadi va sessiya
+        ACTIVE qoladi: keyingi tozalashda qayta urinib ko'riladi.
+
+        Returns:
+            int: Yakunlangan sessiyalar soni
+        """
+        finished = 0
+        for session_id in session_ids:
+            answer_buffer.flush(session_id)
+            try:
+                completed_id = db.scalars(
+                    update(TestSession).where(
+                        TestSession.id == session_id,
+                        TestSession.status == SessionStatus.ACTIVE
+                    ).values(
+                        status=SessionStatus.COMPLETED,
+                        completed_at=now
+                    ).returning(TestSession.id),
+                    execution_options={"synchronize_session": False}
+                ).first()
+                if completed_id is None:
+                    db.rollback()
+                    continue
+                # calculate_result commit qiladi: status va natija birga yoziladi
+                ResultService.calculate_result(db, session_id)
+            except Exception as e:
+                db.rollback()
+                logger.error("Sessiyani yakunlab bo'lmadi: session_id=%s, error=%s", session_id, e, exc_info=True)
+                continue
+            session_store.delete(session_id)
+            finished += 1
+        return finished
+
+    @staticmethod
+    def backfill_deadlines(db: Session, batch_size: int = SWEEP_BATCH_SIZE) -> int:
+        """
+        deadline_at'i yo'q (migratsiyadan oldin boshlangan) faol sessiyalarga deadline yozish
+
+        Davomiylikni qo'shish dialektga bog'liq, shuning uchun deadline Python'da
+        hisoblanadi. Bunday sessiyalar faqat bir marta to'ldiriladi, keyin
+        muddati o'tganlar to'liq SQL sharti bilan tanlanadi.
+
+        Returns:
+            int: To'ldirilgan sessiyalar soni
+        """
+        filled = 0
+        while True:
+            rows = db.execute(
+                select(TestSession.id, TestSession.started_at, Test.duration_minutes).join(
+                    Test, TestSession.test_id == Test.id
+                ).where(
+                    TestSession.status == SessionStatus.ACTIVE,
+                    TestSession.started_at.isnot(None),
+                    TestSession.deadline_at.is_(None)
+                ).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            db.execute(
+                update(TestSession),
+                [
+                    {"id": row.id, "deadline_at": compute_deadline(row.started_at, row.duration_minutes)}
+                    for row in rows
+                ]
+            )
+            db.commit()
+            filled += len(rows)
+            if len(rows) < batch_size:
+                break
+        return filled
+
+    @staticmethod
+    def finish_overdue_sessions(db: Session, now: datetime, batch_size: int = SWEEP_BATCH_SIZE) -> tuple[int, int]:
+        """
+        Test vaqti (deadline_at yoki OTP muddati) tugagan boshlangan sessiyalarni yakunlash
+
+        Odatda bu ishni DeadlineScheduler bajaradi; bu yerda qayta ishga
+        tushishda yoki boshqa worker'da qolib ketgan sessiyalar yakunlanadi.
+        Muddati o'tganlar Python'da emas, SQL shartida tanlanadi va
+        har bir partiyada batch_size tadan ko'p qator o'qilmaydi.
+
+        Returns:
+            tuple: (yakunlanganlar soni, partiyalar soni)
+        """
+        SessionSweeperService.backfill_deadlines(db, batch_size)
+
+        condition = (
+            TestSession.status == SessionStatus.ACTIVE,
+            TestSession.started_at.isnot(None),
+            or_(
+                TestSession.expires_at < now,
+                TestSession.deadline_at < now - timedelta(seconds=FINISH_GRACE_SECONDS)
+            )
+        )
+
+        finished = 0
+        batches = 0
+        last_id = 0
+        while True:
+            # Yakunlab bo'lmagan sessiyalar ACTIVE qoladi, shuning uchun keyingi
+            # partiya id bo'yicha davom etadi (aks holda ular qayta tanlanadi)
+            ids = db.scalars(
+                select(TestSession.id).where(*condition, TestSession.id > last_id).order_by(TestSession.id).limit(batch_size)
+            ).all()
+            if not ids:
+                break
+            finished += SessionSweeperService.finish_sessions(db, ids, now)
+            batches += 1
+            last_id = ids[-1]
+            if len(ids) < batch_size:
+                break
+        return finished, batches
+
+    @staticmethod
+    def sweep(db: Session, now: Optional[datetime] = None, batch_size: int = SWEEP_BATCH_SIZE) -> dict:
+        """
+        Bitta tozalash aylanishi
+
+        Returns:
+            dict: expired, finished, batches va elapsed_ms
+        """
+        started = time.perf_counter()
+        now = now or datetime.utcnow()
+
+        expired, expire_batches = SessionSweeperService.expire_sessions(db, now, batch_size)
+        finished, finish_batches = SessionSweeperService.finish_overdue_sessions(db, now, batch_size)
+
+        report = {
+            "expired": expired,
+            "finished": finished,
+            "batches": expire_batches + finish_batches,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+        if expired or finished:
+            logger.info(
+                "Sessiyalar tozalandi: expired=%s, finished=%s, batches=%s, vaqt=%sms",
+                expired, finished, report['batches'], report['elapsed_ms']
+            )
+        return report
+
+
+class SessionSweeper:
+    """SessionSweeperService.sweep'ni vaqti-vaqti bilan bajaruvchi fon thread'i"""
+
+    def __init__(self, interval_seconds: int):
+        self.interval_seconds = interval_seconds
+        self.last_report: Optional[dict] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> dict:
+        db = SessionLocal()
+        try:
+            self.last_report = SessionSweeperService.sweep(db)
+            return self.last_report
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error("Sessiyalarni tozalashda xatolik: %s", e, exc_info=True)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="session-sweeper", daemon=True)
+        self._thread.start()
+        logger.info("Sessiyalar tozalovchisi ishga tushdi: interval=%ss", self.interval_seconds)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+
+class DeadlineScheduler:
+    """
+    Sessiyalarni deadline_at bo'yicha yakunlovchi rejalashtiruvchi
+
+    (deadline_at, session_id) juftliklari min-heap'da saqlanadi; thread
+    eng yaqin deadline'gacha uxlaydi va vaqti kelganlarini yakunlaydi.
+    Oldinroq /finish-test bilan yakunlangan sessiyalar heap'dan
+    o'chirilmaydi: finish_sessions ularni ACTIVE emasligi uchun o'tkazib yuboradi.
+    """
+
+    def __init__(self, grace_seconds: int = DEADLINE_GRACE_SECONDS):
+        self.grace = timedelta(seconds=grace_seconds)
+        self.finished = 0
+        self._heap: list[tuple[datetime, int]] = []
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def schedule(self, session_id: int, deadline_at: datetime) -> None:
+        with self._condition:
+            heapq.heappush(self._heap, (deadline_at, session_id))
+            # Yangi deadline eng yaqini bo'lsa, thread qayta hisoblashi kerak
+            if self._heap[0][1] == session_id:
+                self._condition.notify()
+
+    def pop_due(self, now: datetime) -> list[int]:
+        """Vaqti kelgan sessiyalarni heap'dan olish"""
+        due = []
+        with self._condition:
+            while self._heap and self._heap[0][0] + self.grace <= now:
+                due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def finish_due(self, now: Optional[datetime] = None) -> int:
+        """Vaqti kelgan sessiyalarni yakunlash"""
+        now = now or datetime.utcnow()
+        due = self.pop_due(now)
+        if not due:
+            return 0
+
+        db = SessionLocal()
+        try:
+            finished = SessionSweeperService.finish_sessions(db, due, now)
+        finally:
+            db.close()
+        self.finished += finished
+        logger.info("Deadline tugagan sessiyalar yakunlandi: due=%s, finished=%s", len(due), finished)
+        return finished
+
+    def load(self, db: Session) -> int:
+        """Ishga tushishda database'dagi faol sessiyalar deadline'larini yuklash"""
+        rows = db.execute(
+            select(TestSession.deadline_at, TestSession.id).where(
+                TestSession.status == SessionStatus.ACTIVE,
+                TestSession.deadline_at.isnot(None)
+            )
+        ).all()
+        with self._condition:
+            self._heap.extend((row.deadline_at, row.id) for row in rows)
+            heapq.heapify(self._heap)
+            self._condition.notify()
+        return len(rows)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                timeout = None
+                if self._heap:
+                    timeout = (self._heap[0][0] + self.grace - datetime.utcnow()).total_seconds()
+                if timeout is None or timeout > 0:
+                    self._condition.wait(timeout)
+                if self._stopped:
+                    return
+            try:
+                self.finish_due()
+            except Exception as e:
+                logger.error("Deadline bo'yicha yakunlashda xatolik: %s", e, exc_info=True)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        db = SessionLocal()
+        try:
+            loaded = self.load(db)
+        finally:
+            db.close()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="deadline-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Deadline rejalashtiruvchisi ishga tushdi: sessiyalar=%s", loaded)
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def clear(self) -> None:
+        with self._condition:
+            self._heap.clear()
+
+
+session_sweeper = SessionSweeper(interval_seconds=settings.SESSION_SWEEP_INTERVAL_SECONDS)
+deadline_scheduler = DeadlineScheduler()
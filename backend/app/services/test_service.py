@@ -1,11 +1,16 @@
 import random
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from app.models.test import Test
+from datetime import datetime
+from sqlalchemy.orm import Session, selectinload, load_only
+from sqlalchemy import and_, select
+from app.models.test import Test, test_topics
 from app.models.question import Question, Option
 from app.models.topic import Topic
 from app.models.test_session import TestSession
 from app.models.answer import Answer
+from app.schemas.answer_schema import AnswerSubmit
+from app.services.question_pool import QuestionPool, question_pool_cache, normalize_answer
+from app.services.answer_buffer import answer_buffer
+from app.services.answer_writer import answer_upsert, upsert_answers
 from app.config import get_settings
 from app.logger import get_logger
 from app.exceptions import NotFoundException, ValidationException
@@ -22,66 +27,233 @@ class TestService:
         if not test:
             return []
         
-        questions = db.query(Question).filter(Question.test_id == test_id).all()
+        questions = db.query(Question).options(
+            selectinload(Question.options)
+        ).filter(Question.test_id == test_id).all()
         return questions
     
     @staticmethod
-    def get_random_questions(db: Session, test_id: int, limit: int = 20) -> list[Question]:
+    def load_question_pool(db: Session, test_id: int) -> QuestionPool:
         """
-        Testga tegishli mavzulardan random savollar tanlash
+        Testga tegishli mavzulardagi barcha savollarni database'dan yuklash
 
         Args:
             db: Database session
             test_id: Test ID
-            limit: Nechta savol kerak
 
         Returns:
-            list[Question]: Tanlangan savollar ro'yxati
+            QuestionPool: Savollar va variantlarining tayyor ko'rinishi hamda javoblar kaliti
 
         Raises:
             NotFoundException: Test topilmasa
-            ValidationException: Savollar yetarli bo'lmasa
+            ValidationException: Savollar mavjud bo'lmasa
         """
-        logger.info(f"Random savollar olish: test_id={test_id}, limit={limit}")
+        logger.info("Savollar pulini yuklash: test_id=%s", test_id)
 
-        test = db.query(Test).filter(Test.id == test_id).first()
+        test = db.query(Test.id, Test.duration_minutes).filter(Test.id == test_id).first()
         if not test:
-            logger.error(f"Test topilmadi: test_id={test_id}")
+            logger.error("Test topilmadi: test_id=%s", test_id)
             raise NotFoundException("Test", test_id)
 
-        if not test.topics:
-            logger.warning(f"Testda mavzular yo'q: test_id={test_id}")
-            raise ValidationException("Test uchun mavzular tanlanmagan")
-
-        topic_ids = [topic.id for topic in test.topics]
-        logger.debug(f"Mavzular: topic_ids={topic_ids}")
+        # Mavzular alohida yuklanmaydi: test_topics subquery orqali filtrlanadi,
+        # variantlar esa bitta IN so'rov bilan (selectinload) olinadi
+        topic_ids = select(test_topics.c.topic_id).where(test_topics.c.test_id == test_id)
 
-        questions = db.query(Question).filter(
+        questions = db.query(Question).options(
+            load_only(Question.id, Question.text, Question.correct_answer),
+            selectinload(Question.options).load_only(Option.id, Option.text)
+        ).filter(
             and_(
                 Question.test_id == test_id,
                 Question.topic_id.in_(topic_ids)
             )
         ).all()
 
-        logger.info(f"Jami savollar: {len(questions)}, kerak: {limit}")
-
         if len(questions) == 0:
-            logger.error(f"Test uchun savollar topilmadi: test_id={test_id}")
+            has_topics = db.query(test_topics.c.topic_id).filter(
+                test_topics.c.test_id == test_id
+            ).first()
+            if not has_topics:
+                logger.warning("Testda mavzular yo'q: test_id=%s", test_id)
+                raise ValidationException("Test uchun mavzular tanlanmagan")
+            logger.error("Test uchun savollar topilmadi: test_id=%s", test_id)
             raise ValidationException("Test uchun savollar mavjud emas")
 
+        payloads = {}
+        answer_key = {}
+        for question in questions:
+            payloads[question.id] = {
+                "id": question.id,
+                "text": question.text,
+                "options": [{"id": opt.id, "text": opt.text} for opt in question.options]
+            }
+            answer_key[question.id] = normalize_answer(question.correct_answer)
+
+        logger.info("Savollar puli yuklandi: test_id=%s, savollar=%s", test_id, len(payloads))
+        return QuestionPool(test_id, payloads, answer_key, test.duration_minutes)
+
+    @staticmethod
+    def get_question_pool(db: Session, test_id: int) -> QuestionPool:
+        """Savollar pulini keshdan olish, bo'lmasa database'dan yuklash"""
+        pool = question_pool_cache.get(test_id)
+        if pool is None:
+            pool = TestService.load_question_pool(db, test_id)
+            question_pool_cache.put(pool)
+        return pool
+
+    @staticmethod
+    def get_random_questions(db: Session, test_id: int, limit: int = 20) -> list[dict]:
+        """
+        Testga tegishli mavzulardan random savollar tanlash
+
+        Args:
+            db: Database session
+            test_id: Test ID
+            limit: Nechta savol kerak
+
+        Returns:
+            list[dict]: Tanlangan savollar (id, text, options)
+
+        Raises:
+            NotFoundException: Test topilmasa
+            ValidationException: Savollar yetarli bo'lmasa
+        """
+        pool = TestService.get_question_pool(db, test_id)
+        logger.info("Random savollar olish: test_id=%s, jami=%s, kerak=%s", test_id, len(pool), limit)
+
         # Agar savollar kam bo'lsa, hammasi qaytariladi
-        if len(questions) <= limit:
-            logger.info(f"Barcha {len(questions)} ta savol qaytarildi")
-            return questions
+        if len(pool) <= limit:
+            return [pool.payloads[question_id] for question_id in pool.question_ids]
+
+        selected = random.sample(pool.question_ids, limit)
+        return [pool.payloads[question_id] for question_id in selected]
+
+    @staticmethod
+    def draw_question_set(db: Session, test_id: int, limit: int = 20) -> list[list]:
+        """
+        Sessiya uchun savollar to'plamini tanlash
+
+        Savollar va har bir savol variantlarining tartibi aralashtiriladi
+        va ixcham ro'yxat sifatida qaytariladi.
+
+        Args:
+            db: Database session
+            test_id: Test ID
+            limit: Nechta savol kerak
+
+        Returns:
+            list[list]: [[question_id, [option_id, ...]], ...]
+        """
+        question_set = []
+        for payload in TestService.get_random_questions(db, test_id, limit=limit):
+            option_ids = [opt["id"] for opt in payload["options"]]
+            random.shuffle(option_ids)
+            question_set.append([payload["id"], option_ids])
+        return question_set
+
+    @staticmethod
+    def get_session_questions(db: Session, session: TestSession, limit: int = 20) -> list[dict]:
+        """
+        Sessiyada saqlangan savollar to'plamini tayyor ko'rinishga keltirish
+
+        Savollar keshdagi puldan olinadi; pul keshda bo'lmasa faqat sessiya
+        savollari id bo'yicha yuklanadi. Eski (to'plami saqlanmagan) sessiyalar
+        uchun to'plam shu yerda tanlanib saqlanadi.
+
+        Args:
+            db: Database session
+            session: Test sessiyasi
+            limit: Nechta savol kerak
+
+        Returns:
+            list[dict]: Savollar (id, text, options) saqlangan tartibda
+        """
+        if session.question_set is None:
+            logger.info("Sessiya uchun savollar to'plami tanlanmoqda: session_id=%s", session.id)
+            session.question_set = TestService.draw_question_set(db, session.test_id, limit=limit)
+            db.commit()
+
+        question_set = session.question_set
+        pool = question_pool_cache.get(session.test_id)
+        payloads = {}
+        if pool is not None:
+            for question_id, _ in question_set:
+                if question_id in pool.payloads:
+                    payloads[question_id] = pool.payloads[question_id]
+
+        missing_ids = [question_id for question_id, _ in question_set if question_id not in payloads]
+        if missing_ids:
+            questions = db.query(Question).options(
+                load_only(Question.id, Question.text),
+                selectinload(Question.options).load_only(Option.id, Option.text)
+            ).filter(Question.id.in_(missing_ids)).all()
+            for question in questions:
+                payloads[question.id] = {
+                    "id": question.id,
+                    "text": question.text,
+                    "options": [{"id": opt.id, "text": opt.text} for opt in question.options]
+                }
+
+        result = []
+        for question_id, option_ids in question_set:
+            payload = payloads.get(question_id)
+            if payload is None:
+                logger.warning(
+                    "Sessiya savoli topilmadi: session_id=%s, question_id=%s",
+                    session.id, question_id
+                )
+                continue
+            options = {opt["id"]: opt for opt in payload["options"]}
+            result.append({
+                "id": payload["id"],
+                "text": payload["text"],
+                "options": [options[option_id] for option_id in option_ids if option_id in options]
+            })
+        return result
+
+    @staticmethod
+    def get_correct_answers(db: Session, test_id: int, question_ids) -> dict[int, str]:
+        """
+        Savollarning normalize qilingan to'g'ri javoblari
+
+        Javoblar savollar pulidagi kalitdan olinadi (pul savollar tanlanganda
+        yuklanadi va import'da bekor qilinadi). Kalitda bo'lmagan savollar
+        testga tegishliligi tekshirilgan holda database'dan o'qiladi.
+
+        Raises:
+            NotFoundException: Savol testga tegishli bo'lmasa
+        """
+        answer_key = TestService.get_question_pool(db, test_id).answer_key
+        correct_answers = {}
+        missing = []
+        for question_id in question_ids:
+            if question_id in answer_key:
+                correct_answers[question_id] = answer_key[question_id]
+            else:
+                missing.append(question_id)
+
+        if missing:
+            rows = db.query(Question.id, Question.correct_answer).filter(
+                and_(
+                    Question.test_id == test_id,
+                    Question.id.in_(missing)
+                )
+            ).all()
+            for row in rows:
+                correct_answers[row.id] = normalize_answer(row.correct_answer)
+
+            not_found = [question_id for question_id in missing if question_id not in correct_answers]
+            if not_found:
+                logger.error("Savollar topilmadi: test_id=%s, question_ids=%s", test_id, not_found)
+                raise NotFoundException("Savol", ", ".join(str(question_id) for question_id in not_found))
+
+        return correct_answers
 
-        selected = random.sample(questions, limit)
-        logger.info(f"{len(selected)} ta random savol tanlandi")
-        return selected
-    
     @staticmethod
     def submit_answer(
         db: Session,
         test_session_id: int,
+        test_id: int,
         question_id: int,
         student_answer: str
     ) -> Answer:
@@ -91,34 +263,102 @@ class TestService:
         Args:
             db: Database session
             test_session_id: Test sessiya ID
+            test_id: Sessiyaning test ID si
             question_id: Savol ID
             student_answer: Talaba javobi
 
         Returns:
-            Answer: Saqlangan javob
+            Answer: Saqlangan javob (write-behind rejimida hali yozilmagan, id'siz)
 
         Raises:
-            NotFoundException: Savol topilmasa
+            NotFoundException: Savol testga tegishli bo'lmasa
         """
-        logger.info(f"Javobni saqlash: session_id={test_session_id}, question_id={question_id}")
-
-        question = db.query(Question).filter(Question.id == question_id).first()
-        if not question:
-            logger.error(f"Savol topilmadi: question_id={question_id}")
-            raise NotFoundException("Savol", question_id)
-
-        is_correct = student_answer.strip().lower() == question.correct_answer.strip().lower()
-        logger.debug(f"Javob tekshirildi: is_correct={is_correct}")
-
-        answer = Answer(
-            test_session_id=test_session_id,
-            question_id=question_id,
-            student_answer=student_answer,
-            is_correct=is_correct
-        )
-        db.add(answer)
+        logger.info("Javobni saqlash: session_id=%s, question_id=%s", test_session_id, question_id)
+
+        correct_answer = TestService.get_correct_answers(db, test_id, [question_id])[question_id]
+        is_correct = normalize_answer(student_answer) == correct_answer
+        logger.debug("Javob tekshirildi: is_correct=%s", is_correct)
+
+        row = {
+            "test_session_id": test_session_id,
+            "question_id": question_id,
+            "student_answer": student_answer,
+            "is_correct": is_correct,
+            "created_at": datetime.utcnow()
+        }
+
+        if settings.ANSWER_WRITE_BEHIND:
+            answer_buffer.add([row])
+            return Answer(**row)
+
+        # Savolga avval berilgan javob almashtiriladi
+        answer = db.scalars(
+            answer_upsert(db).values(**row).returning(Answer),
+            execution_options={"populate_existing": True}
+        ).one()
+        logger.info("Javob saqlandi: answer_id=%s, is_correct=%s", answer.id, is_correct)
+        db.commit()
+        return answer
+
+    @staticmethod
+    def submit_answers(
+        db: Session,
+        test_session_id: int,
+        test_id: int,
+        answers: list[AnswerSubmit]
+    ) -> list[dict]:
+        """
+        Sessiyaning bir nechta javobini bitta tranzaksiyada saqlash
+
+        Javoblar keshdagi javoblar kaliti bo'yicha tekshiriladi va barcha
+        Answer qatorlari bitta upsert bilan yoziladi: savolga avval berilgan
+        javob almashtiriladi (write-behind rejimida esa javoblar buferiga
+        qo'shiladi).
+
+        Args:
+            db: Database session
+            test_session_id: Test sessiya ID
+            test_id: Sessiyaning test ID si
+            answers: Talaba javoblari
+
+        Returns:
+            list[dict]: Har bir savol uchun {question_id, is_correct}
+
+        Raises:
+            ValidationException: Javoblar bo'sh bo'lsa
+            NotFoundException: Savol testga tegishli bo'lmasa
+        """
+        logger.info("Javoblarni saqlash: session_id=%s, count=%s", test_session_id, len(answers))
+
+        if not answers:
+            raise ValidationException("Javoblar ro'yxati bo'sh")
+
+        # Bir savolga bir nechta javob kelsa, oxirgisi olinadi
+        latest = {item.question_id: item.answer for item in answers}
+
+        correct_answers = TestService.get_correct_answers(db, test_id, latest.keys())
+
+        graded = []
+        values = []
+        submitted_at = datetime.utcnow()
+        for question_id, student_answer in latest.items():
+            is_correct = normalize_answer(student_answer) == correct_answers[question_id]
+            graded.append({"question_id": question_id, "is_correct": is_correct})
+            values.append({
+                "test_session_id": test_session_id,
+                "question_id": question_id,
+                "student_answer": student_answer,
+                "is_correct": is_correct,
+                "created_at": submitted_at
+            })
+
+        if settings.ANSWER_WRITE_BEHIND:
+            answer_buffer.add(values)
+            logger.info("%s ta javob buferga qo'shildi: session_id=%s", len(values), test_session_id)
+            return graded
+
+        upsert_answers(db, values)
         db.commit()
-        db.refresh(answer)
 
-        logger.info(f"Javob saqlandi: answer_id={answer.id}, is_correct={is_correct}")
-        return answer
\ No newline at end of file
+        logger.info("%s ta javob saqlandi: session_id=%s", len(values), test_session_id)
+        return graded
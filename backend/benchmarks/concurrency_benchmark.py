@@ -0,0 +1,95 @@
+"""
+Talabalar endpoint'lari uchun parallel yuklama benchmark'i
+
+Ishga tushirilgan serverga (uvicorn) bir vaqtda --concurrency ta ulanishdan
+so'rov yuboradi va o'tkazuvchanlik (so'rov/s) hamda kechikish
+persentillarini (p50/p95/p99) chiqaradi. Faqat standart kutubxona ishlatiladi.
+
+Misol:
+    uvicorn app.main:app --port 8000
+    python benchmarks/concurrency_benchmark.py --path /api/student/groups \
+        --concurrency 50 100 200 --requests 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def fetch(host: str, port: int, path: str) -> int:
+    """Bitta GET so'rov (yangi ulanish), javob status kodini qaytaradi"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def run_level(host: str, port: int, path: str, concurrency: int, total: int, timeout: float) -> dict:
+    """
+    Berilgan parallellik darajasida total ta so'rov yuborish
+
+    timeout'dan oshgan so'rovlar xato hisoblanadi (server to'xtab qolganda
+    benchmark osilib qolmasligi uchun)
+    """
+    latencies: list[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(fetch(host, port, path), timeout)
+                if status >= 400:
+                    errors += 1
+            except (OSError, asyncio.TimeoutError):
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": quantiles[49],
+        "p95": quantiles[94],
+        "p99": quantiles[98],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parallel yuklama benchmark'i")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/api/student/groups")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Bitta so'rov uchun soniyalar")
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    print(f"{'parallel':>8} {'so`rov':>7} {'xato':>5} {'so`rov/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        stats = asyncio.run(
+            run_level(url.hostname, url.port or 80, args.path, concurrency, args.requests, args.timeout)
+        )
+        print(
+            f"{stats['concurrency']:>8} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>9.1f} "
+            f"{stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['p99']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
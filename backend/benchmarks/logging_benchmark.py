@@ -0,0 +1,120 @@
+"""
+So'rov boshiga logging xarajati benchmark'i
+
+Bir "so'rov" - hot path'dagi odatiy yozuvlar: 4 ta INFO va 2 ta DEBUG
+(DEBUG daraja o'chirilgan). Ikki sozlama solishtiriladi:
+
+  eski  - har bir modul logger'ida konsol + 2 ta RotatingFileHandler,
+          f-string xabarlar, yozuvlar ota logger handler'larida takrorlanadi
+  yangi - app.logger: bitta NonBlockingQueueHandler, `%` argumentlari,
+          yozish QueueListener thread'ida
+
+Chiqish: so'rov thread'idagi vaqt (mks/so'rov) va navbat bo'shaguncha
+umumiy vaqt. Konsol /dev/null ga, fayllar vaqtinchalik papkaga yoziladi.
+backend papkasidan ishga tushiriladi (.env kerak):
+
+    python benchmarks/logging_benchmark.py --requests 20000
+"""
+import argparse
+import logging
+import os
+import queue
+import sys
+import tempfile
+import time
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.logger import TEXT_FORMAT, DATE_FORMAT, NonBlockingQueueHandler, DebugSamplingFilter, create_handlers
+
+
+def old_handlers(directory: Path, stream) -> list[logging.Handler]:
+    """Oldingi setup_logger qo'shgan handler'lar"""
+    formatter = logging.Formatter(fmt=TEXT_FORMAT, datefmt=DATE_FORMAT)
+    handlers = [
+        logging.StreamHandler(stream),
+        RotatingFileHandler(directory / "app.log", maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"),
+        RotatingFileHandler(directory / "errors.log", maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"),
+    ]
+    handlers[2].setLevel(logging.ERROR)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def old_request(logger: logging.Logger, session_id: int, answers: list) -> None:
+    logger.info(f"Javoblarni saqlash: session_id={session_id}, count={len(answers)}")
+    logger.debug(f"Javob tekshirildi: answers={answers}")
+    logger.info(f"{len(answers)} ta javob saqlandi: session_id={session_id}")
+    logger.debug(f"Sessiya holati: session_id={session_id}, answers={answers}")
+    logger.info(f"Natija: correct={len(answers) // 2}, total={len(answers)}, percentage={50.0:.2f}%")
+    logger.info(f"Test yakunlandi: session_id={session_id}, natija={50.0:.1f}%")
+
+
+def new_request(logger: logging.Logger, session_id: int, answers: list) -> None:
+    logger.info("Javoblarni saqlash: session_id=%s, count=%s", session_id, len(answers))
+    logger.debug("Javob tekshirildi: answers=%s", answers)
+    logger.info("%s ta javob saqlandi: session_id=%s", len(answers), session_id)
+    logger.debug("Sessiya holati: session_id=%s, answers=%s", session_id, answers)
+    logger.info("Natija: correct=%s, total=%s, percentage=%.2f%%", len(answers) // 2, len(answers), 50.0)
+    logger.info("Test yakunlandi: session_id=%s, natija=%.1f%%", session_id, 50.0)
+
+
+def run(request, logger: logging.Logger, requests: int) -> float:
+    answers = [{"question_id": i, "answer": f"Javob {i}"} for i in range(20)]
+    started = time.perf_counter()
+    for session_id in range(requests):
+        request(logger, session_id, answers)
+    return time.perf_counter() - started
+
+
+def bench_old(directory: Path, stream, requests: int) -> tuple[float, float]:
+    parent = logging.getLogger("bench_old")
+    child = logging.getLogger("bench_old.test_service")
+    for logger in (parent, child):
+        logger.setLevel(logging.INFO)
+        for handler in old_handlers(directory, stream):
+            logger.addHandler(handler)
+
+    elapsed = run(old_request, child, requests)
+    return elapsed, elapsed
+
+
+def bench_new(directory: Path, stream, requests: int) -> tuple[float, float]:
+    parent = logging.getLogger("bench_new")
+    parent.setLevel(logging.INFO)
+    parent.propagate = False
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=requests * 6))
+    handler.addFilter(DebugSamplingFilter(1.0))
+    parent.addHandler(handler)
+    listener = QueueListener(
+        handler.queue,
+        *create_handlers(directory=directory, stream=stream),
+        respect_handler_level=True
+    )
+    listener.start()
+
+    started = time.perf_counter()
+    elapsed = run(new_request, logging.getLogger("bench_new.test_service"), requests)
+    listener.stop()
+    return elapsed, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Logging xarajati benchmark'i")
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'sozlama':>8} {'mks/so`rov':>11} {'jami s':>8}")
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        for name, bench in (("eski", bench_old), ("yangi", bench_new)):
+            directory = Path(tmp) / name
+            directory.mkdir()
+            elapsed, total = bench(directory, devnull, args.requests)
+            print(f"{name:>8} {elapsed / args.requests * 1e6:>11.1f} {total:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
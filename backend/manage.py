@@ -0,0 +1,72 @@
+"""
+Boshqaruv buyruqlari
+
+    python manage.py migrate [--target VERSION]
+    python manage.py downgrade VERSION
+    python manage.py status
+    python manage.py sweep-sessions
+"""
+import argparse
+from app.database import engine, SessionLocal
+from app.migrations import MigrationRunner, load_models
+from app.services.session_sweeper import SessionSweeperService
+
+
+def _format_versions(versions: list[str]) -> str:
+    return ", ".join(versions) if versions else "yo'q"
+
+
+def migrate(args: argparse.Namespace) -> None:
+    applied = MigrationRunner(engine).upgrade(args.target)
+    print(f"Qo'llangan migratsiyalar: {_format_versions(applied)}")
+
+
+def downgrade(args: argparse.Namespace) -> None:
+    reverted = MigrationRunner(engine).downgrade(args.version)
+    print(f"Qaytarilgan migratsiyalar: {_format_versions(reverted)}")
+
+
+def status(args: argparse.Namespace) -> None:
+    for item in MigrationRunner(engine).status():
+        mark = "x" if item["applied"] else " "
+        print(f"[{mark}] {item['version']}_{item['name']}")
+
+
+def sweep_sessions(args: argparse.Namespace) -> None:
+    load_models()
+    db = SessionLocal()
+    try:
+        report = SessionSweeperService.sweep(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(
+        f"EXPIRED: {report['expired']}, yakunlangan: {report['finished']}, "
+        f"partiyalar: {report['batches']}, vaqt: {report['elapsed_ms']}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Test Platform boshqaruv buyruqlari")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="Qo'llanmagan migratsiyalarni qo'llash")
+    migrate_parser.add_argument("--target", help="Shu versiyagacha qo'llash")
+    migrate_parser.set_defaults(func=migrate)
+
+    downgrade_parser = commands.add_parser("downgrade", help="Berilgan versiyagacha orqaga qaytarish")
+    downgrade_parser.add_argument("version", help="Qoladigan oxirgi versiya (hammasi uchun 0000)")
+    downgrade_parser.set_defaults(func=downgrade)
+
+    status_parser = commands.add_parser("status", help="Migratsiyalar holati")
+    status_parser.set_defaults(func=status)
+
+    sweep_parser = commands.add_parser("sweep-sessions", help="Muddati o'tgan sessiyalarni tozalash")
+    sweep_parser.add_argument("--batch-size", type=int, default=500, help="Bitta UPDATE'dagi sessiyalar soni")
+    sweep_parser.set_defaults(func=sweep_sessions)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+-- Tez-tez ishlatiladigan so'rovlar uchun indekslar (PostgreSQL va SQLite)
+-- Yangi database'da bu indekslar modellardan yaratiladi.
+
+-- Unikal indeksdan oldin takroriy natijalardan faqat oxirgisi qoldiriladi
+DELETE FROM results
+WHERE id NOT IN (SELECT MAX(id) FROM results GROUP BY student_id, test_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_results_student_test ON results (student_id, test_id);
+CREATE INDEX IF NOT EXISTS ix_answers_session_question ON answers (test_session_id, question_id);
+CREATE INDEX IF NOT EXISTS ix_questions_test_topic ON questions (test_id, topic_id);
+CREATE INDEX IF NOT EXISTS ix_questions_test_text ON questions (test_id, text);
+CREATE INDEX IF NOT EXISTS ix_options_question_id ON options (question_id);
+CREATE INDEX IF NOT EXISTS ix_test_sessions_student_test_status ON test_sessions (student_id, test_id, status);
+CREATE INDEX IF NOT EXISTS ix_students_group_id ON students (group_id);
+
+-- downgrade
+DROP INDEX IF EXISTS ix_students_group_id;
+DROP INDEX IF EXISTS ix_test_sessions_student_test_status;
+DROP INDEX IF EXISTS ix_options_question_id;
+DROP INDEX IF EXISTS ix_questions_test_text;
+DROP INDEX IF EXISTS ix_questions_test_topic;
+DROP INDEX IF EXISTS ix_answers_session_question;
+DROP INDEX IF EXISTS uq_results_student_test;
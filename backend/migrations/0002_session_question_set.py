@@ -0,0 +1,16 @@
+"""
+test_sessions.question_set ustuni: OTP tasdiqlanganda tanlangan savollar
+va variantlar tartibi ([[question_id, [option_id, ...]], ...])
+"""
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("test_sessions")}
+    if "question_set" not in columns:
+        connection.exec_driver_sql("ALTER TABLE test_sessions ADD COLUMN question_set JSON")
+
+
+def downgrade(connection: Connection) -> None:
+    connection.exec_driver_sql("ALTER TABLE test_sessions DROP COLUMN question_set")
@@ -0,0 +1,5 @@
+-- Sessiyalar tozalovchisi uchun: status bo'yicha muddati o'tgan sessiyalar
+CREATE INDEX IF NOT EXISTS ix_test_sessions_status_expires ON test_sessions (status, expires_at);
+
+-- downgrade
+DROP INDEX IF EXISTS ix_test_sessions_status_expires;
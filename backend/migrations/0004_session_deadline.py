@@ -0,0 +1,16 @@
+"""
+test_sessions.deadline_at ustuni: test tugashi kerak bo'lgan vaqt
+(started_at + tests.duration_minutes)
+"""
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("test_sessions")}
+    if "deadline_at" not in columns:
+        connection.exec_driver_sql("ALTER TABLE test_sessions ADD COLUMN deadline_at TIMESTAMP")
+
+
+def downgrade(connection: Connection) -> None:
+    connection.exec_driver_sql("ALTER TABLE test_sessions DROP COLUMN deadline_at")
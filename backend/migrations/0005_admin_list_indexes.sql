@@ -0,0 +1,7 @@
+-- Admin ro'yxatlari keyset paginatsiyasi: filtr ustuni va id bo'yicha tartib
+CREATE INDEX IF NOT EXISTS ix_results_test_id ON results (test_id, id);
+CREATE INDEX IF NOT EXISTS ix_tests_subject_id ON tests (subject_id, id);
+
+-- downgrade
+DROP INDEX IF EXISTS ix_tests_subject_id;
+DROP INDEX IF EXISTS ix_results_test_id;
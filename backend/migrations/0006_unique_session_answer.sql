@@ -0,0 +1,13 @@
+-- Sessiyada har bir savolga bitta javob: javoblar upsert bilan yoziladi.
+-- Yangi database'da bu indeks modeldan yaratiladi.
+
+-- Unikal indeksdan oldin takroriy javoblardan faqat oxirgisi qoldiriladi
+DELETE FROM answers
+WHERE id NOT IN (SELECT MAX(id) FROM answers GROUP BY test_session_id, question_id);
+
+DROP INDEX IF EXISTS ix_answers_session_question;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_answers_session_question ON answers (test_session_id, question_id);
+
+-- downgrade
+DROP INDEX IF EXISTS uq_answers_session_question;
+CREATE INDEX IF NOT EXISTS ix_answers_session_question ON answers (test_session_id, question_id);
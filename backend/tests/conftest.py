@@ -0,0 +1,145 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# Sozlamalar app import qilinishidan oldin o'rnatilishi kerak
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'test_platform_pytest.db')}"
+)
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("ADMIN_LOGIN", "admin")
+os.environ.setdefault("ADMIN_PASSWORD", "admin")
+
+import pytest
+from contextlib import contextmanager
+from app.database import Base, engine, SessionLocal
+from app.models.group import Group
+from app.models.student import Student
+from app.models.subject import Subject
+from app.models.topic import Topic
+from app.models.test import Test
+from app.models.question import Question, Option
+from app.models.answer import Answer
+from app.models.test_session import TestSession, SessionStatus
+from app.services.question_pool import question_pool_cache
+from app.services.session_store import session_store
+from app.services.answer_buffer import answer_buffer
+from app.services.session_sweeper import deadline_scheduler
+from app.profiler import capture_queries
+
+QUESTION_COUNT = 25
+
+
+@pytest.fixture
+def db():
+    """Har bir test uchun toza database"""
+    question_pool_cache.invalidate()
+    session_store.clear()
+    answer_buffer.clear()
+    deadline_scheduler.clear()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def query_budget():
+    """
+    SQL so'rovlar byudjeti: blok ichida max_queries dan ko'p so'rov yoki
+    takrorlangan shakl (N+1) bo'lsa test yiqiladi
+
+    Misol: `with query_budget(4): client.get(...)`
+    """
+
+    @contextmanager
+    def budget(max_queries: int, allow_repeated: bool = False):
+        with capture_queries() as profile:
+            yield profile
+        assert profile.total_queries <= max_queries, profile.report()
+        if not allow_repeated:
+            assert not profile.repeated(), profile.report()
+
+    return budget
+
+
+@pytest.fixture
+def student_id(db) -> int:
+    group = Group(name="101-guruh")
+    db.add(group)
+    db.flush()
+    student = Student(group_id=group.id, full_name="Ali Valiyev")
+    db.add(student)
+    db.commit()
+    return student.id
+
+
+def create_test_with_questions(db, question_count: int = QUESTION_COUNT, name: str = "Algebra") -> int:
+    """Mavzu, savollar va variantlari bilan test yaratish"""
+    subject = db.query(Subject).filter(Subject.name == "Matematika").first()
+    if not subject:
+        subject = Subject(name="Matematika")
+        db.add(subject)
+        db.flush()
+
+    topic = Topic(subject_id=subject.id, topic_number=1, name=name)
+    db.add(topic)
+    db.flush()
+
+    test = Test(name=name, subject_id=subject.id, duration_minutes=60)
+    test.topics.append(topic)
+    db.add(test)
+    db.flush()
+
+    for i in range(question_count):
+        question = Question(
+            test_id=test.id,
+            topic_id=topic.id,
+            text=f"Savol {i}",
+            correct_answer=f"Javob {i}"
+        )
+        question.options = [Option(text=f"Javob {i}"), Option(text=f"Xato {i}")]
+        db.add(question)
+
+    db.commit()
+    return test.id
+
+
+@pytest.fixture
+def test_id(db) -> int:
+    return create_test_with_questions(db)
+
+
+@pytest.fixture
+def started_session_id(db, student_id: int, test_id: int) -> int:
+    """OTP tasdiqlangan (boshlangan) sessiya"""
+    session = TestSession(
+        student_id=student_id,
+        test_id=test_id,
+        otp="123456",
+        status=SessionStatus.ACTIVE,
+        expires_at=datetime.utcnow() + timedelta(hours=1),
+        started_at=datetime.utcnow()
+    )
+    db.add(session)
+    db.commit()
+    return session.id
+
+
+@pytest.fixture
+def test_session_id(db, started_session_id: int, test_id: int) -> int:
+    """Javoblari bor sessiya"""
+    questions = db.query(Question).filter(Question.test_id == test_id).limit(4).all()
+    for i, question in enumerate(questions):
+        db.add(Answer(
+            test_session_id=started_session_id,
+            question_id=question.id,
+            student_answer=question.correct_answer if i % 2 == 0 else "xato",
+            is_correct=i % 2 == 0
+        ))
+    db.commit()
+    return started_session_id
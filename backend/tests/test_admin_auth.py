@@ -0,0 +1,91 @@
+import pytest
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+from app.exceptions import AppException
+from app.exception_handlers import app_exception_handler
+from app.middleware import auth
+from app.middleware.auth import admin_token_cache, create_admin_token, verify_admin_token
+from app.routers.admin import admin_auth, router
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    admin_token_cache.clear()
+    yield
+    admin_token_cache.clear()
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.add_exception_handler(AppException, app_exception_handler)
+    app.include_router(router)
+
+    @app.get("/protected")
+    def protected(authenticated: bool = Depends(admin_auth)):
+        return {"ok": authenticated}
+
+    return TestClient(app)
+
+def test_token_roundtrip():
+    """Yaratilgan token tekshiruvdan o'tadi va keshga tushadi"""
+    token, _ = create_admin_token("admin")
+
+    assert verify_admin_token(token) is True
+    assert len(admin_token_cache) == 1
+
+def test_tampered_token_rejected():
+    """Payload yoki imzosi o'zgartirilgan token rad etiladi"""
+    token, _ = create_admin_token("admin")
+    payload, signature = token.split(".")
+    other_payload, _ = create_admin_token("boshqa")[0].split(".")
+
+    assert verify_admin_token(f"{other_payload}.{signature}") is False
+    assert verify_admin_token(f"{payload}.{signature[:-2]}xx") is False
+    assert verify_admin_token("yaroqsiz") is False
+    assert verify_admin_token(f"{payload}.imzo\u00e9") is False
+    assert len(admin_token_cache) == 0
+
+def test_expired_token_rejected(monkeypatch):
+    """Muddati o'tgan token, keshda bo'lsa ham, rad etiladi"""
+    token, _ = create_admin_token("admin")
+    assert verify_admin_token(token) is True
+
+    now = auth.time.time()
+    monkeypatch.setattr(auth.time, "time", lambda: now + auth.settings.ADMIN_TOKEN_EXPIRY_MINUTES * 60 + 1)
+
+    assert verify_admin_token(token) is False
+    admin_token_cache.clear()
+    assert verify_admin_token(token) is False
+
+def test_cached_token_skips_signature(monkeypatch):
+    """Keshdagi token uchun imzo qayta hisoblanmaydi"""
+    token, _ = create_admin_token("admin")
+    verify_admin_token(token)
+    monkeypatch.setattr(auth, "_sign", lambda payload: pytest.fail("imzo qayta hisoblandi"))
+
+    assert verify_admin_token(token) is True
+
+def test_cache_evicts_least_recent():
+    """LRU kesh hajmidan oshganda eng eski token chiqariladi"""
+    cache = auth.AdminTokenCache(max_size=2)
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    cache.get("a")
+    cache.put("c", 3.0)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1.0, 3.0)
+
+def test_login_issues_token(client: TestClient):
+    """Login token beradi, token bilan himoyalangan endpoint ochiladi"""
+    response = client.post("/api/admin/login", json={"login": "admin", "password": "admin"})
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    assert client.get("/protected", headers={"Authorization": f"Bearer {token}"}).json() == {"ok": True}
+
+def test_login_and_token_failures(client: TestClient):
+    """Xato parol va tokensiz so'rov 401 qaytaradi"""
+    assert client.post("/api/admin/login", json={"login": "admin", "password": "xato"}).status_code == 401
+    assert client.get("/protected").status_code == 401
+    assert client.get("/protected", headers={"Authorization": "Bearer xato.token"}).status_code == 401
+    assert client.get("/protected", headers={"Authorization": "Bearer xato.t\u00f6ken".encode("latin-1")}).status_code == 401
@@ -0,0 +1,88 @@
+import time
+import pytest
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.models.answer import Answer
+from app.schemas.answer_schema import AnswerSubmit
+from app.services.answer_buffer import AnswerBuffer, answer_buffer
+from app.services.result_service import ResultService
+from app.services.test_service import TestService
+
+@pytest.fixture
+def write_behind(monkeypatch):
+    """Write-behind rejimini test davomida yoqish"""
+    monkeypatch.setattr(get_settings(), "ANSWER_WRITE_BEHIND", True)
+    yield answer_buffer
+    answer_buffer.clear()
+
+def answer_count(db: Session, session_id: int) -> int:
+    return db.query(Answer).filter(Answer.test_session_id == session_id).count()
+
+def test_answers_are_buffered_until_flush(db: Session, started_session_id: int, test_id: int, write_behind):
+    """Javob darhol tekshiriladi, lekin flush'gacha yozilmaydi"""
+    question = TestService.get_random_questions(db, test_id, limit=1)[0]
+    correct = question["text"].replace("Savol", "Javob")
+
+    answer = TestService.submit_answer(db, started_session_id, test_id, question["id"], correct)
+    graded = TestService.submit_answers(
+        db, started_session_id, test_id, [AnswerSubmit(question_id=question["id"], answer="xato")]
+    )
+
+    assert answer.is_correct is True
+    assert graded == [{"question_id": question["id"], "is_correct": False}]
+    assert write_behind.pending == 2
+    assert answer_count(db, started_session_id) == 0
+
+    # Bir savolga ikki javob: oxirgisi yoziladi
+    assert write_behind.flush(started_session_id) == 1
+    assert write_behind.pending == 0
+    assert answer_count(db, started_session_id) == 1
+    assert db.query(Answer).filter(Answer.test_session_id == started_session_id).one().is_correct is False
+
+def test_flush_before_result(db: Session, started_session_id: int, test_id: int, write_behind):
+    """Sessiya flush qilingandan keyin natija buferdagi javoblarni hisobga oladi"""
+    questions = TestService.get_random_questions(db, test_id, limit=3)
+    TestService.submit_answers(db, started_session_id, test_id, [
+        AnswerSubmit(question_id=question["id"], answer=question["text"].replace("Savol", "Javob"))
+        for question in questions
+    ])
+
+    write_behind.flush(started_session_id)
+    result = ResultService.calculate_result(db, started_session_id)
+
+    assert (result.correct_count, result.total_count) == (3, 3)
+
+def test_flush_drops_only_failing_session(db: Session, started_session_id: int, test_id: int):
+    """O'chirilgan sessiyaning javoblari boshqa sessiyalar yozilishiga to'sqinlik qilmaydi"""
+    question_id = TestService.get_random_questions(db, test_id, limit=1)[0]["id"]
+    buffer = AnswerBuffer(flush_interval_ms=50, max_rows=100)
+    row = {"question_id": question_id, "student_answer": "x", "is_correct": False}
+    buffer.add([{**row, "test_session_id": started_session_id}, {**row, "test_session_id": None}])
+
+    assert buffer.flush() == 1
+    assert buffer.dropped_rows == 1
+    assert answer_count(db, started_session_id) == 1
+
+def test_background_flush_on_max_rows(db: Session, started_session_id: int, test_id: int):
+    """max_rows'ga yetganda fon thread'i kutmasdan yozadi, stop() qolganini yozadi"""
+    question_ids = [question["id"] for question in TestService.get_random_questions(db, test_id, limit=4)]
+    buffer = AnswerBuffer(flush_interval_ms=60_000, max_rows=3)
+    rows = [
+        {"test_session_id": started_session_id, "question_id": question_id, "student_answer": "x", "is_correct": False}
+        for question_id in question_ids
+    ]
+    buffer.start()
+    try:
+        buffer.add(rows[:3])
+        for _ in range(100):
+            if buffer.flushed_rows == 3:
+                break
+            time.sleep(0.02)
+        assert buffer.flushed_rows == 3
+
+        buffer.add(rows[3:])
+    finally:
+        buffer.stop()
+
+    assert buffer.flushed_rows == 4
+    assert answer_count(db, started_session_id) == 4
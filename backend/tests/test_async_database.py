@@ -0,0 +1,38 @@
+import asyncio
+from sqlalchemy.orm import Session
+from app.database import AsyncSessionLocal, get_async_database_url
+from app.models.test_session import TestSession
+from app.routers.student import get_groups, get_students_by_group
+from app.services.test_service import TestService
+
+def test_async_database_url():
+    """Sync URL async drayverga o'tkaziladi"""
+    assert get_async_database_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert get_async_database_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert get_async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+
+def test_async_student_endpoints(db: Session, student_id: int):
+    """Guruh va talabalar async sessiya orqali o'qiladi"""
+    async def run():
+        async with AsyncSessionLocal() as async_db:
+            groups = await get_groups(db=async_db)
+            students = await get_students_by_group(groups[0].id, db=async_db)
+            return groups, students
+
+    groups, students = asyncio.run(run())
+
+    assert [group.name for group in groups] == ["101-guruh"]
+    assert [student.id for student in students] == [student_id]
+
+def test_sync_service_via_run_sync(db: Session, started_session_id: int):
+    """Sync servislar async sessiyada run_sync orqali ishlaydi"""
+    async def run():
+        async with AsyncSessionLocal() as async_db:
+            session = await async_db.get(TestSession, started_session_id)
+            return await async_db.run_sync(TestService.get_session_questions, session, 20)
+
+    questions = asyncio.run(run())
+
+    assert len(questions) == 20
+    db.expire_all()
+    assert db.get(TestSession, started_session_id).question_set is not None
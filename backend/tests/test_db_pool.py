@@ -0,0 +1,71 @@
+import os
+import tempfile
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.database import (
+    PoolMetrics,
+    TimedQueuePool,
+    TimedAsyncAdaptedQueuePool,
+    get_pool_options,
+    get_pool_stats,
+    instrument_pool
+)
+
+@pytest.fixture
+def pool_engine():
+    """Bitta ulanishli, overflow'siz pool"""
+    path = os.path.join(tempfile.gettempdir(), "test_platform_pool.db")
+    engine = create_engine(
+        f"sqlite:///{path}", poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1
+    )
+    metrics = PoolMetrics()
+    instrument_pool(engine, metrics)
+    yield engine, metrics
+    engine.dispose()
+
+def test_pool_options_for_postgres():
+    """PostgreSQL uchun pool sozlamalari Settings'dan olinadi"""
+    options = get_pool_options("postgresql://u:p@db/app")
+    assert options["poolclass"] is TimedQueuePool
+    assert set(options) == {"poolclass", "pool_size", "max_overflow", "pool_recycle", "pool_timeout"}
+    assert get_pool_options("postgresql+asyncpg://u:p@db/app", is_async=True)["poolclass"] is TimedAsyncAdaptedQueuePool
+    assert get_pool_options("sqlite:///./app.db") == {}
+
+def test_pool_metrics_checkout_and_timeout(pool_engine):
+    """Band ulanishlar, kutish vaqti va timeout'lar hisoblanadi"""
+    engine, metrics = pool_engine
+
+    connection = engine.connect()
+    connection.execute(text("SELECT 1"))
+    assert metrics.snapshot(engine.pool)["in_use"] == 1
+
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    connection.close()
+    stats = metrics.snapshot(engine.pool)
+    assert stats["in_use"] == 0
+    assert stats["peak_in_use"] == 1
+    assert stats["checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["wait_avg_ms"] is not None
+    assert stats["size"] == 1 and stats["checked_in"] == 1
+
+def test_pool_metrics_survive_dispose(pool_engine):
+    """dispose() dan keyin yangi pool ham o'sha metrikaga yozadi"""
+    engine, metrics = pool_engine
+    engine.dispose()
+
+    with engine.connect():
+        pass
+
+    assert engine.pool.metrics is metrics
+    assert metrics.snapshot(engine.pool)["checkouts"] == 1
+
+def test_get_pool_stats(db):
+    """Admin endpoint'i uchun ikkala engine statistikasi"""
+    db.execute(text("SELECT 1"))
+    stats = get_pool_stats()
+    assert set(stats) == {"sync", "async"}
+    assert stats["sync"]["in_use"] >= 1
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models.question import Question
+from app.models.result import Result
+from app.models.test_session import TestSession, SessionStatus
+from app.services.otp_service import OTPService
+from app.services.session_sweeper import DEADLINE_GRACE_SECONDS, DeadlineScheduler, deadline_scheduler
+
+def test_verify_sets_deadline(db: Session, student_id: int, test_id: int):
+    """OTP tasdiqlanganda deadline_at = started_at + duration_minutes va rejalashtiriladi"""
+    session = OTPService.create_session(db, student_id, test_id)
+
+    is_valid, state = OTPService.verify_otp(db, session.id, session.otp)
+
+    assert is_valid is True
+    db.refresh(session)
+    assert session.deadline_at == session.started_at + timedelta(minutes=60)
+    assert state.deadline_at == session.deadline_at
+    assert len(deadline_scheduler) == 1
+
+def test_reverify_keeps_deadline(db: Session, student_id: int, test_id: int):
+    """Qayta kirish test vaqtini uzaytirmaydi"""
+    session = OTPService.create_session(db, student_id, test_id)
+    OTPService.verify_otp(db, session.id, session.otp)
+    db.refresh(session)
+    deadline_at = session.deadline_at
+
+    OTPService.verify_otp(db, session.id, session.otp)
+
+    db.refresh(session)
+    assert session.deadline_at == deadline_at
+
+def test_session_inactive_after_deadline(db: Session, started_session_id: int):
+    """deadline_at o'tgandan keyin javob qabul qilinmaydi"""
+    session = db.get(TestSession, started_session_id)
+    session.deadline_at = datetime.utcnow() + timedelta(minutes=1)
+    assert OTPService.is_session_active(session) is True
+
+    session.deadline_at = datetime.utcnow() - timedelta(seconds=1)
+    assert OTPService.is_session_active(session) is False
+
+def test_final_answers_accepted_at_deadline(db: Session, started_session_id: int, test_id: int):
+    """Deadline paytida yuborilgan yakuniy javoblar grace ichida qabul qilinib natijaga kiradi"""
+    session = db.get(TestSession, started_session_id)
+    session.deadline_at = datetime.utcnow() - timedelta(seconds=DEADLINE_GRACE_SECONDS - 3)
+    db.commit()
+    questions = db.query(Question).filter(Question.test_id == test_id).limit(3).all()
+    client = TestClient(app)
+
+    info = client.get(f"/api/test/session/{started_session_id}").json()
+    assert info["server_time"] > info["deadline_at"]
+
+    response = client.post("/api/test/submit-answers", json={
+        "session_id": started_session_id,
+        "answers": [{"question_id": q.id, "answer": q.correct_answer} for q in questions]
+    })
+    assert response.status_code == 200
+    finished = client.post(f"/api/test/finish-test/{started_session_id}").json()
+    assert finished["correct_count"] == 3
+
+def test_answers_rejected_after_deadline_grace(db: Session, started_session_id: int, test_id: int):
+    """Grace tugagach javoblar qabul qilinmaydi"""
+    session = db.get(TestSession, started_session_id)
+    session.deadline_at = datetime.utcnow() - timedelta(seconds=DEADLINE_GRACE_SECONDS + 1)
+    db.commit()
+    question = db.query(Question).filter(Question.test_id == test_id).first()
+
+    response = TestClient(app).post("/api/test/submit-answers", json={
+        "session_id": started_session_id,
+        "answers": [{"question_id": question.id, "answer": question.correct_answer}]
+    })
+
+    assert response.status_code == 401
+
+def test_scheduler_finishes_due_sessions(db: Session, test_session_id: int, started_session_id: int):
+    """Vaqti kelgan sessiya yakunlanadi, hali vaqti bor sessiya heap'da qoladi"""
+    now = datetime.utcnow()
+    scheduler = DeadlineScheduler(grace_seconds=0)
+    scheduler.schedule(test_session_id, now - timedelta(seconds=1))
+    scheduler.schedule(10**6, now + timedelta(minutes=30))
+
+    assert scheduler.finish_due(now) == 1
+
+    db.expire_all()
+    assert db.get(TestSession, test_session_id).status == SessionStatus.COMPLETED
+    result = db.query(Result).one()
+    assert (result.correct_count, result.total_count) == (2, 4)
+    assert len(scheduler) == 1
+
+def test_scheduler_skips_finished_sessions(db: Session, test_session_id: int):
+    """/finish-test bilan yakunlangan sessiya qayta yakunlanmaydi"""
+    session = db.get(TestSession, test_session_id)
+    session.status = SessionStatus.COMPLETED
+    db.commit()
+    scheduler = DeadlineScheduler(grace_seconds=0)
+    scheduler.schedule(test_session_id, datetime.utcnow() - timedelta(seconds=1))
+
+    assert scheduler.finish_due() == 0
+    assert db.query(Result).count() == 0
+
+def test_scheduler_loads_active_deadlines(db: Session, started_session_id: int):
+    """Ishga tushishda faol sessiyalar deadline'lari database'dan yuklanadi"""
+    session = db.get(TestSession, started_session_id)
+    session.deadline_at = datetime.utcnow() + timedelta(minutes=5)
+    db.commit()
+    scheduler = DeadlineScheduler()
+
+    assert scheduler.load(db) == 1
+    assert scheduler.pop_due(session.deadline_at + scheduler.grace) == [started_session_id]
@@ -0,0 +1,63 @@
+import os
+import json
+from datetime import date, timedelta
+from io import BytesIO
+from openpyxl import load_workbook
+from sqlalchemy.orm import Session
+from app.models.group import Group
+from app.models.result import Result
+from app.models.student import Student
+from app.services.export_service import ExportService, EXCEL_HEADERS
+
+def test_export_results_to_excel_file(db: Session, student_id: int, test_id: int):
+    """Natijalar write-only workbook orqali vaqtinchalik faylga yoziladi"""
+    db.add(Result(student_id=student_id, test_id=test_id, correct_count=17, total_count=20, percentage=85.0))
+    db.commit()
+
+    path = ExportService.export_results_to_excel_file(db)
+    try:
+        rows = list(load_workbook(path).active.iter_rows(values_only=True))
+    finally:
+        os.remove(path)
+
+    assert rows[0] == tuple(EXCEL_HEADERS)
+    assert rows[1] == (student_id, "101-guruh", "Ali Valiyev", "Algebra", 17)
+
+def test_export_results_to_excel_bytes(db: Session):
+    """Bo'sh jadval uchun faqat sarlavha yoziladi"""
+    content = ExportService.export_results_to_excel(db)
+
+    rows = list(load_workbook(BytesIO(content)).active.iter_rows(values_only=True))
+    assert rows == [tuple(EXCEL_HEADERS)]
+
+def _add_results(db: Session, student_id: int, test_id: int):
+    other_group = Group(name="202-guruh")
+    db.add(other_group)
+    db.flush()
+    other_student = Student(group_id=other_group.id, full_name="Vali Aliyev")
+    db.add(other_student)
+    db.flush()
+    db.add(Result(student_id=student_id, test_id=test_id, correct_count=17, total_count=20, percentage=85.0))
+    db.add(Result(student_id=other_student.id, test_id=test_id, correct_count=5, total_count=20, percentage=25.0))
+    db.commit()
+    return other_group.id
+
+def test_export_results_csv_with_group_filter(db: Session, student_id: int, test_id: int):
+    """CSV eksport guruh filtri bilan"""
+    other_group_id = _add_results(db, student_id, test_id)
+
+    content = "".join(ExportService.iter_results_csv(group_id=other_group_id))
+
+    lines = content.strip().splitlines()
+    assert len(lines) == 2
+    assert lines[1].split(",")[1:] == ["202-guruh", "Vali Aliyev", "Algebra", "5"]
+
+def test_export_results_ndjson(db: Session, student_id: int, test_id: int):
+    """NDJSON eksport: har qatorda bitta natija"""
+    _add_results(db, student_id, test_id)
+
+    rows = [json.loads(line) for line in "".join(ExportService.iter_results_ndjson(test_id=test_id)).splitlines()]
+    assert [row["correct_count"] for row in rows] == [17, 5]
+
+    tomorrow = date.today() + timedelta(days=1)
+    assert "".join(ExportService.iter_results_ndjson(date_from=tomorrow)) == ""
@@ -0,0 +1,106 @@
+import json
+from io import BytesIO
+import pytest
+from sqlalchemy.orm import Session
+from app.models.question import Question, Option
+from app.models.subject import Subject
+from app.models.test import Test
+from app.services.import_service import ImportService, QuestionBankWriter, iter_json_array
+
+def make_bank(question_count: int, subject: str = "Fizika", theme: str = "Mexanika") -> list:
+    return [{
+        "subject": subject,
+        "tests": {
+            "theme": theme,
+            "testQuestions": [
+                {
+                    "id": i,
+                    "question": f"{theme} savol {i}",
+                    "options": ["A", "B", "C", "D"],
+                    "correctAnswer": "A"
+                }
+                for i in range(question_count)
+            ]
+        }
+    }]
+
+def test_import_tests_from_json(db: Session):
+    """Savollar va variantlar partiyalab yoziladi"""
+    data = make_bank(25) + make_bank(5, theme="Optika") + [{"tests": {}}]
+
+    result = ImportService.import_tests_from_json(db, json.dumps(data))
+
+    assert result["success"] is True
+    assert result["imported_count"] == 30
+    assert result["errors"] == ["Fanning nomi topilmadi"]
+    assert db.query(Subject).count() == 1
+    assert db.query(Test).count() == 2
+    assert db.query(Question).count() == 30
+    assert db.query(Option).count() == 120
+
+    test = db.query(Test).filter(Test.name == "Mexanika").first()
+    assert [topic.name for topic in test.topics] == ["Mexanika"]
+
+def test_import_skips_duplicates(db: Session):
+    """Mavjud va fayl ichida takrorlangan savollar qayta yozilmaydi"""
+    ImportService.import_tests_from_json(db, json.dumps(make_bank(10)))
+
+    result = ImportService.import_tests_from_json(db, json.dumps(make_bank(12) + make_bank(12)))
+
+    assert result["imported_count"] == 2
+    assert db.query(Question).count() == 12
+
+def test_import_reports_batches(db: Session):
+    """Har bir partiya uchun vaqt hisoboti qaytariladi"""
+    writer = QuestionBankWriter(db, batch_size=10)
+    for item in make_bank(25):
+        writer.add_item(item)
+    result = writer.finish()
+
+    assert [batch["questions"] for batch in result["batches"]] == [10, 10, 5]
+    assert all(batch["options"] == batch["questions"] * 4 for batch in result["batches"])
+    assert all("elapsed_ms" in batch for batch in result["batches"])
+
+    options = db.query(Option).join(Question).filter(Question.text == "Mexanika savol 24").all()
+    assert [opt.text for opt in options] == ["A", "B", "C", "D"]
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_iter_json_array(chunk_size: int):
+    """Massiv elementlari fayldan qismlab o'qiladi"""
+    data = [{"subject": "Ona tili", "n": 12345}, [], 3.5, "so'z", {"a": [1, {"b": None}]}]
+    raw = ("\ufeff \n" + json.dumps(data, ensure_ascii=False, indent=2)).encode("utf-8")
+
+    assert list(iter_json_array(BytesIO(raw), chunk_size=chunk_size)) == data
+    assert list(iter_json_array(BytesIO(b" [ ] "), chunk_size=chunk_size)) == []
+
+@pytest.mark.parametrize("raw", [b"", b"{}", b"[1, 2", b"[1,]", b"[1 2]", b"[1] x"])
+def test_iter_json_array_invalid(raw: bytes):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(BytesIO(raw), chunk_size=2))
+
+def test_import_tests_from_stream(db: Session):
+    """Yuklangan fayl oqim sifatida import qilinadi"""
+    raw = json.dumps(make_bank(30) + make_bank(3, theme="Optika")).encode("utf-8")
+
+    result = ImportService.import_tests_from_stream(db, BytesIO(raw))
+
+    assert result["imported_count"] == 33
+    assert db.query(Question).count() == 33
+
+def test_import_tests_from_stream_invalid(db: Session):
+    result = ImportService.import_tests_from_stream(db, BytesIO(b"[{\"subject\": "))
+
+    assert result["success"] is False
+    assert result["message"].startswith("JSON parsing xatosi")
+
+def test_import_rolls_back_on_late_parse_error(db: Session):
+    """Fayl oxiridagi JSON xatosi oldingi partiyalarni ham bekor qiladi"""
+    valid = json.dumps(make_bank(1100) + make_bank(5, theme="Optika"))
+    raw = (valid[:-1] + ', {"subject": ').encode("utf-8")
+
+    result = ImportService.import_tests_from_stream(db, BytesIO(raw))
+
+    assert result["success"] is False
+    assert result["imported_count"] == 0
+    assert db.query(Question).count() == 0
+    assert db.query(Test).count() == 0
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from app.models.answer import Answer
+from app.models.question import Question, Option
+from app.models.result import Result
+from app.models.student import Student
+from app.models.test import Test
+from app.models.test_session import TestSession, SessionStatus
+
+def query_plan(db: Session, statement) -> str:
+    """SQLite EXPLAIN QUERY PLAN natijasi bitta satrda"""
+    sql = str(statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    return " | ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+@pytest.mark.parametrize("statement, index_name", [
+    (select(Answer).where(Answer.test_session_id == 1), "uq_answers_session_question"),
+    (select(Result).where(Result.student_id == 1, Result.test_id == 1), "uq_results_student_test"),
+    (select(Question.id).where(Question.test_id == 1, Question.topic_id.in_([1, 2])), "ix_questions_test_topic"),
+    (select(Question.text).where(Question.test_id == 1, Question.text == "Savol"), "ix_questions_test_text"),
+    (select(Option).where(Option.question_id.in_([1, 2, 3])), "ix_options_question_id"),
+    (
+        select(TestSession.id).where(
+            TestSession.student_id == 1,
+            TestSession.test_id == 1,
+            TestSession.status == SessionStatus.ACTIVE
+        ),
+        "ix_test_sessions_student_test_status"
+    ),
+    (select(Student).where(Student.group_id == 1), "ix_students_group_id"),
+    (
+        select(Result.id).where(Result.test_id == 1, Result.id > 100).order_by(Result.id).limit(50),
+        "ix_results_test_id"
+    ),
+    (
+        select(Test.id, Test.name).where(Test.subject_id == 1, Test.id > 100).order_by(Test.id).limit(50),
+        "ix_tests_subject_id"
+    ),
+])
+def test_hot_query_uses_index(db: Session, statement, index_name: str):
+    """Har bir tez-tez ishlatiladigan so'rov jadvalni to'liq skanerlamaydi"""
+    plan = query_plan(db, statement)
+    assert index_name in plan, plan
+    assert "SCAN" not in plan, plan
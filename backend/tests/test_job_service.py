@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import time
+import pytest
+from datetime import datetime, timedelta
+from io import BytesIO
+from sqlalchemy.orm import Session
+from app.models.question import Question
+from app.models.result import Result
+from app.services import job_service
+from app.services.pagination import count_cache
+from app.services.job_service import Job, JobManager, JobService, JobStatus, job_manager
+from tests.test_import_service import make_bank
+
+@pytest.fixture(autouse=True)
+def jobs_dir(tmp_path, monkeypatch):
+    """Vazifa fayllari backend/jobs o'rniga vaqtinchalik papkaga yoziladi"""
+    monkeypatch.setattr(job_service, "JOBS_DIR", tmp_path)
+    return tmp_path
+
+def wait_for(job: Job, timeout: float = 10) -> Job:
+    """Vazifa yakunlanib, holati diskka yozilguncha kutish"""
+    deadline = time.monotonic() + timeout
+    while not job.is_finished or Job.load(job.id).finished_at is None:
+        assert time.monotonic() < deadline, "Vazifa o'z vaqtida yakunlanmadi"
+        time.sleep(0.01)
+    return job
+
+def test_import_job(db: Session):
+    """Import fonda bajariladi va natija holatda saqlanadi"""
+    raw = json.dumps(make_bank(40)).encode("utf-8")
+
+    job = wait_for(JobService.submit_import(BytesIO(raw), "bank.json"))
+
+    assert job.status == JobStatus.COMPLETED
+    assert job.processed == 40
+    assert job.result["imported_count"] == 40
+    assert db.query(Question).count() == 40
+
+def test_import_job_invalidates_test_count(db: Session):
+    """Fondagi import yangi testlar qo'shsa, keshlangan testlar soni tozalanadi"""
+    count_cache.put(("tests",), 0)
+
+    wait_for(JobService.submit_import(BytesIO(json.dumps(make_bank(5)).encode("utf-8")), "bank.json"))
+
+    assert count_cache.get(("tests",)) is None
+
+def test_export_job_progress_and_file(db: Session, student_id: int, test_id: int):
+    """Eksport fonda faylga yoziladi; holat diskdan ham o'qiladi"""
+    db.add(Result(student_id=student_id, test_id=test_id, correct_count=17, total_count=20, percentage=85.0))
+    db.commit()
+
+    job = wait_for(JobService.submit_export("csv", test_id=test_id))
+
+    assert job.status == JobStatus.COMPLETED
+    assert job.total == 1
+    assert job.processed == 1
+    with open(job.result_path, encoding="utf-8") as f:
+        assert len(f.read().strip().splitlines()) == 2
+
+    stored = Job.load(job.id).to_dict()
+    assert stored["status"] == "completed"
+    assert stored["progress"] == 100.0
+    assert stored["download_ready"] is True
+
+def test_failed_job(db: Session):
+    job = wait_for(JobService.submit_import(BytesIO(b"[{"), "buzuq.json"))
+
+    assert job.status == JobStatus.FAILED
+    assert job.error.startswith("JSON parsing xatosi")
+    assert job_manager.get(job.id) is job
+    assert job_manager.get("../../etc/passwd") is None
+
+def test_shutdown_marks_unfinished_jobs_failed():
+    """To'xtashda navbatdagi vazifa FAILED bo'ladi, yuklangan fayli o'chiriladi"""
+    manager = JobManager(max_workers=1, retention_hours=24)
+    release = threading.Event()
+    running = manager.submit(Job("import"), lambda job: release.wait(5))
+    pending = Job("import")
+    pending.upload_path.write_bytes(b"[]")
+    manager.submit(pending, lambda job: None)
+    while running.status != JobStatus.RUNNING:
+        time.sleep(0.01)
+
+    manager.shutdown()
+
+    assert Job.load(pending.id).status == JobStatus.FAILED
+    assert not pending.upload_path.exists()
+    assert Job.load(running.id).status == JobStatus.FAILED
+
+    # Bajarilayotgan vazifa tugagach holatini o'zi qayta yozadi
+    release.set()
+    deadline = time.monotonic() + 5
+    while Job.load(running.id).status != JobStatus.COMPLETED:
+        assert time.monotonic() < deadline, "Vazifa o'z vaqtida yakunlanmadi"
+        time.sleep(0.01)
+
+def make_stale_job(status: JobStatus, touched_hours_ago: float) -> Job:
+    """25 soat oldin yaratilgan, holat fayli touched_hours_ago oldin yozilgan import vazifasi"""
+    job = Job("import")
+    job.status = status
+    job.created_at = datetime.utcnow() - timedelta(hours=25)
+    job.save()
+    job.upload_path.write_bytes(b"[]")
+    touched = time.time() - touched_hours_ago * 3600
+    os.utime(job.state_path, (touched, touched))
+    return job
+
+def test_prune_removes_stale_unfinished_job():
+    """Process to'xtab qolgan eski "running" vazifa yuklangan fayli bilan o'chiriladi"""
+    job = make_stale_job(JobStatus.RUNNING, touched_hours_ago=25)
+
+    JobManager(max_workers=1, retention_hours=24).prune()
+
+    assert Job.load(job.id) is None
+    assert not job.upload_path.exists()
+
+def test_prune_skips_running_jobs():
+    """Holati yangilanib turgan yoki shu process'da bajarilayotgan vazifa o'chirilmaydi"""
+    manager = JobManager(max_workers=1, retention_hours=24)
+    other_worker = make_stale_job(JobStatus.RUNNING, touched_hours_ago=1)
+    local = make_stale_job(JobStatus.RUNNING, touched_hours_ago=25)
+    manager._jobs[local.id] = local
+
+    manager.prune()
+
+    for job in (other_worker, local):
+        assert Job.load(job.id).status == JobStatus.RUNNING
+        assert job.upload_path.exists()
+
+def test_concurrent_saves_do_not_collide(jobs_dir):
+    """Bir vazifani bir vaqtda saqlagan thread'lar vaqtinchalik faylda to'qnashmaydi"""
+    job = Job("export")
+    errors = []
+
+    def save_many() -> None:
+        try:
+            for _ in range(50):
+                job.save()
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert Job.load(job.id).kind == "export"
+    assert list(jobs_dir.glob("*.tmp")) == []
@@ -0,0 +1,96 @@
+import json
+import logging
+import queue
+import pytest
+from app.logger import (
+    DebugSamplingFilter,
+    JsonFormatter,
+    LoggingPipeline,
+    NonBlockingQueueHandler,
+    get_logger,
+    parse_levels,
+    setup_logging
+)
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+@pytest.fixture
+def captured():
+    """Logging'ni ro'yxatga yozadigan pipeline, testdan keyin odatiy sozlama tiklanadi"""
+    handler = ListHandler()
+    pipeline = LoggingPipeline()
+    pipeline.setup(levels="demo_debug=DEBUG", handlers=[handler])
+    yield pipeline, handler
+    pipeline.stop()
+    setup_logging()
+
+def make_record(level: int = logging.INFO, msg: str = "xabar %s", args: tuple = ("a",)) -> logging.LogRecord:
+    return logging.LogRecord("test_platform.demo", level, __file__, 1, msg, args, None)
+
+def test_queue_handler_defers_formatting():
+    """Xabar chaqiruvchi thread'da formatlanmaydi"""
+    handler = NonBlockingQueueHandler(queue.Queue())
+    record = make_record()
+
+    handler.handle(record)
+
+    queued = handler.queue.get_nowait()
+    assert queued is record
+    assert queued.args == ("a",)
+    assert not hasattr(queued, "message")
+
+def test_queue_handler_drops_when_full():
+    """Navbat to'lsa yozuv kutmasdan tashlanadi"""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+    handler.handle(make_record())
+    handler.handle(make_record())
+
+    assert handler.dropped == 1
+
+def test_debug_sampling():
+    """Faqat DEBUG yozuvlari tanlab o'tkaziladi"""
+    never = DebugSamplingFilter(rate=0)
+    assert never.filter(make_record(logging.DEBUG)) is False
+    assert never.filter(make_record(logging.INFO)) is True
+    assert DebugSamplingFilter(rate=1).filter(make_record(logging.DEBUG)) is True
+
+def test_parse_levels():
+    assert parse_levels("test_service=DEBUG, database=warning,") == {
+        "test_service": logging.DEBUG,
+        "database": logging.WARNING
+    }
+
+def test_parse_levels_skips_invalid_entries():
+    """Noto'g'ri yozuv import paytida xato bermaydi, faqat o'tkazib yuboriladi"""
+    assert parse_levels("database=verbose,test_service,=INFO,otp_service=ERROR") == {
+        "otp_service": logging.ERROR
+    }
+
+def test_json_formatter():
+    """JSON qatorida xabar argumentlari bilan va extra maydonlar bo'ladi"""
+    record = make_record()
+    record.path = "/api/test"
+
+    data = json.loads(JsonFormatter().format(record))
+
+    assert data["message"] == "xabar a"
+    assert data["level"] == "INFO"
+    assert data["path"] == "/api/test"
+
+def test_pipeline_writes_once_with_module_levels(captured):
+    """Har bir yozuv bir marta yoziladi, modul darajalari Settings'dan olinadi"""
+    pipeline, handler = captured
+
+    get_logger("demo").info("bir %s", 1)
+    get_logger("demo").debug("ko'rinmaydi")
+    get_logger("demo_debug").debug("ikki %s", 2)
+    pipeline.stop()
+
+    assert [record.getMessage() for record in handler.records] == ["bir 1", "ikki 2"]
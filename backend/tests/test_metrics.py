@@ -0,0 +1,63 @@
+import threading
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.metrics import Counter, MetricsRegistry, http_request_db_queries, http_requests, registry
+from app.middleware.metrics import MetricsMiddleware, UNMATCHED_ROUTE
+
+def test_counter_sums_thread_shards():
+    """Har bir thread o'z shard'iga yozadi, o'qishda yig'iladi"""
+    counter = Counter("demo_total", "demo", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(("a",))
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc(("b",), 2)
+
+    assert counter.values() == {("a",): 4000, ("b",): 2}
+
+def test_histogram_renders_cumulative_buckets():
+    """Bucket'lar Prometheus formatida kumulyativ chiqariladi"""
+    metrics = MetricsRegistry()
+    histogram = metrics.histogram("demo_seconds", "demo", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, ("/x",))
+
+    lines = metrics.render().splitlines()
+
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/x",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{route="/x"} 4' in lines
+
+def test_middleware_records_route_template_and_queries(db: Session):
+    """So'rov route shabloni bo'yicha, SQL so'rovlari soni bilan yoziladi"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int, db: Session = Depends(get_db)):
+        db.execute(text("SELECT 1"))
+        db.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    registry.reset()
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/yoq")
+
+    assert http_requests.value(("GET", "/items/{item_id}", "200")) == 2
+    assert http_requests.value(("GET", UNMATCHED_ROUTE, "404")) == 1
+    counts = http_request_db_queries.values()[("/items/{item_id}",)]
+    assert counts[-1] == 4
+    assert 'route="/items/{item_id}"' in registry.render()
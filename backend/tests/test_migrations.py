@@ -0,0 +1,85 @@
+import os
+import tempfile
+import pytest
+from sqlalchemy import create_engine, inspect
+from app.database import Base
+from app.migrations import MigrationRunner, discover_migrations
+from app.exceptions import ValidationException
+
+@pytest.fixture
+def migration_engine():
+    """Asosiy test database'idan alohida bo'sh database"""
+    path = os.path.join(tempfile.gettempdir(), "test_platform_migrations.db")
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(f"sqlite:///{path}")
+    yield engine
+    engine.dispose()
+
+def index_names(engine, table: str) -> set[str]:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+def test_migrate_empty_database(migration_engine):
+    """Bo'sh database'da sxema modellardan yaratiladi va migratsiyalar belgilanadi"""
+    runner = MigrationRunner(migration_engine)
+
+    applied = runner.upgrade()
+
+    assert applied == [migration.version for migration in runner.migrations]
+    assert runner.pending() == []
+    assert "uq_results_student_test" in index_names(migration_engine, "results")
+    assert runner.upgrade() == []
+
+def test_migrate_legacy_database(migration_engine):
+    """Migratsiyadan oldingi database'ga yetishmayotgan indeks va ustunlar qo'shiladi"""
+    Base.metadata.create_all(migration_engine)
+    with migration_engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX uq_answers_session_question")
+        connection.exec_driver_sql("ALTER TABLE test_sessions DROP COLUMN question_set")
+
+    applied = MigrationRunner(migration_engine).upgrade()
+
+    assert applied == ["0001", "0002", "0003", "0004", "0005", "0006"]
+    assert "uq_answers_session_question" in index_names(migration_engine, "answers")
+    assert "ix_answers_session_question" not in index_names(migration_engine, "answers")
+    columns = {column["name"] for column in inspect(migration_engine).get_columns("test_sessions")}
+    assert "question_set" in columns
+
+def test_downgrade_and_upgrade_again(migration_engine):
+    """Orqaga qaytarilgan migratsiyalar qayta qo'llanadi"""
+    runner = MigrationRunner(migration_engine)
+    runner.upgrade()
+
+    assert runner.downgrade("0000") == ["0006", "0005", "0004", "0003", "0002", "0001"]
+    assert "uq_results_student_test" not in index_names(migration_engine, "results")
+    assert not any(item["applied"] for item in runner.status())
+
+    assert runner.upgrade(target="0001") == ["0001"]
+    assert "uq_results_student_test" in index_names(migration_engine, "results")
+    assert runner.upgrade() == ["0002", "0003", "0004", "0005", "0006"]
+
+def test_unique_answer_migration_keeps_latest(migration_engine):
+    """Unikal javob indeksidan oldin takroriy javoblardan oxirgisi qoldiriladi"""
+    runner = MigrationRunner(migration_engine)
+    runner.upgrade()
+    runner.downgrade("0005")
+    with migration_engine.begin() as connection:
+        for answer_id, student_answer, is_correct in [(1, "A", 0), (2, "B", 1), (3, "C", 1)]:
+            connection.exec_driver_sql(
+                "INSERT INTO answers (id, test_session_id, question_id, student_answer, is_correct) "
+                f"VALUES ({answer_id}, 1, {1 if answer_id < 3 else 2}, '{student_answer}', {is_correct})"
+            )
+
+    assert runner.upgrade() == ["0006"]
+
+    with migration_engine.connect() as connection:
+        rows = connection.exec_driver_sql("SELECT id, question_id FROM answers ORDER BY id").all()
+    assert [tuple(row) for row in rows] == [(2, 1), (3, 2)]
+    assert "uq_answers_session_question" in index_names(migration_engine, "answers")
+
+def test_duplicate_versions_rejected(tmp_path):
+    """Bir xil versiyali ikki migratsiya xato beradi"""
+    (tmp_path / "0001_first.sql").write_text("SELECT 1;")
+    (tmp_path / "0001_second.sql").write_text("SELECT 2;")
+    with pytest.raises(ValidationException):
+        discover_migrations(tmp_path)
@@ -1,8 +1,13 @@
 import pytest
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
+from app.models.student import Student
 from app.models.test_session import TestSession, SessionStatus
 from app.services.otp_service import OTPService
+from app.services.session_store import SessionStateStore, session_store
+from app.exceptions import ValidationException
+from app.profiler import capture_queries
+from tests.conftest import create_test_with_questions
 
 def test_generate_otp():
     """OTP generatsiyasini tekshirish"""
@@ -32,4 +37,145 @@ def test_otp_block_after_three_attempts(db: Session, student_id: int, test_id: i
         assert is_valid is False
     
     db.refresh(session)
-    assert session.status == SessionStatus.BLOCKED
\ No newline at end of file
+    assert session.status == SessionStatus.BLOCKED
+
+def test_failed_attempt_not_written_to_db(db: Session, student_id: int, test_id: int):
+    """Noto'g'ri urinish faqat omborda sanaladi"""
+    session = OTPService.create_session(db, student_id, test_id)
+
+    with capture_queries() as profile:
+        is_valid, state = OTPService.verify_otp(db, session.id, "999999")
+
+    assert is_valid is False
+    assert state.otp_attempts == 1
+    assert profile.total_queries == 0
+    db.refresh(session)
+    assert session.otp_attempts == 0
+
+def test_verify_without_questions_keeps_session_unstarted(db: Session, student_id: int):
+    """Savolsiz testda to'g'ri OTP xato beradi, sessiya boshlanmaydi va urinish sarflanmaydi"""
+    empty_test_id = create_test_with_questions(db, question_count=0, name="Bo'sh")
+    session = OTPService.create_session(db, student_id, empty_test_id)
+
+    with pytest.raises(ValidationException):
+        OTPService.verify_otp(db, session.id, session.otp)
+
+    state = session_store.get(session.id)
+    assert (state.status, state.otp_attempts, state.started_at) == (SessionStatus.ACTIVE, 0, None)
+    db.refresh(session)
+    assert session.started_at is None and session.question_set is None
+
+    # Bloklash tugagan sessiya ham tiklanmaydi: ombor database bilan mos qoladi
+    for attempt in range(3):
+        OTPService.verify_otp(db, session.id, f"99999{attempt}")
+    state.blocked_until = datetime.utcnow() - timedelta(seconds=1)
+
+    with pytest.raises(ValidationException):
+        OTPService.verify_otp(db, session.id, session.otp)
+
+    assert (state.status, state.otp_attempts) == (SessionStatus.BLOCKED, 3)
+
+def test_verify_success_writes_through(db: Session, student_id: int, test_id: int):
+    """OTP tasdiqlanganda boshlanish vaqti database'ga yoziladi"""
+    session = OTPService.create_session(db, student_id, test_id)
+    session_store.clear()
+
+    is_valid, state = OTPService.verify_otp(db, session.id, session.otp)
+
+    assert is_valid is True
+    db.refresh(session)
+    assert session.started_at is not None
+    assert session.status == SessionStatus.ACTIVE
+    assert session_store.get(session.id) is state
+
+def test_stale_state_does_not_reopen_completed_session(db: Session, student_id: int, test_id: int):
+    """Boshqa worker'da yakunlangan sessiya eskirgan ombor holati bilan qayta ochilmaydi"""
+    session = OTPService.create_session(db, student_id, test_id)
+    OTPService.verify_otp(db, session.id, session.otp)
+    db.query(TestSession).filter(TestSession.id == session.id).update({"status": SessionStatus.COMPLETED})
+    db.commit()
+
+    is_valid, state = OTPService.verify_otp(db, session.id, session.otp)
+
+    assert is_valid is False
+    assert state.status == SessionStatus.COMPLETED
+    db.refresh(session)
+    assert session.status == SessionStatus.COMPLETED
+    assert session_store.get(session.id).status == SessionStatus.COMPLETED
+
+def test_block_recovery_writes_active_status(db: Session, student_id: int, test_id: int):
+    """Bloklash muddati tugagach to'g'ri OTP sessiyani ACTIVE qiladi"""
+    session = OTPService.create_session(db, student_id, test_id)
+    for i in range(3):
+        OTPService.verify_otp(db, session.id, f"99999{i}")
+    session_store.get(session.id).blocked_until = datetime.utcnow() - timedelta(seconds=1)
+
+    is_valid, state = OTPService.verify_otp(db, session.id, session.otp)
+
+    assert is_valid is True
+    db.refresh(session)
+    assert (session.status, session.otp_attempts) == (SessionStatus.ACTIVE, 0)
+
+def test_new_session_evicts_old_state(db: Session, student_id: int, test_id: int):
+    """Yangi sessiya eski sessiya holatini ombordan o'chiradi"""
+    old_session = OTPService.create_session(db, student_id, test_id)
+    OTPService.create_session(db, student_id, test_id)
+
+    assert session_store.get(old_session.id) is None
+    db.refresh(old_session)
+    assert old_session.status == SessionStatus.EXPIRED
+
+def add_group_students(db: Session, group_id: int, count: int) -> None:
+    db.add_all(Student(group_id=group_id, full_name=f"Talaba {i:02d}") for i in range(count))
+    db.commit()
+
+def test_group_sessions_bulk_created(db: Session, student_id: int, test_id: int):
+    """Guruh sessiyalari bitta UPDATE va bitta INSERT bilan yaratiladi"""
+    group_id = db.get(Student, student_id).group_id
+    add_group_students(db, group_id, 29)
+    old_session = OTPService.create_session(db, student_id, test_id)
+
+    with capture_queries() as profile:
+        roster = OTPService.create_group_sessions(db, group_id, test_id)
+
+    assert len(roster) == 30
+    assert [row["full_name"] for row in roster] == sorted(row["full_name"] for row in roster)
+    assert len({row["otp"] for row in roster}) == 30
+    writes = [count for shape, (count, _) in profile.shapes.items() if shape.upper().startswith(("UPDATE", "INSERT"))]
+    assert sum(writes) == 2
+    assert profile.total_queries <= 4
+
+    db.refresh(old_session)
+    assert old_session.status == SessionStatus.EXPIRED
+    assert session_store.get(old_session.id) is None
+    for row in roster:
+        session = db.get(TestSession, row["session_id"])
+        assert (session.student_id, session.otp) == (row["student_id"], row["otp"])
+        assert session_store.get(session.id).otp == row["otp"]
+
+def test_group_session_otp_verifies(db: Session, student_id: int, test_id: int):
+    """Guruh uchun yaratilgan OTP odatdagidek tasdiqlanadi"""
+    group_id = db.get(Student, student_id).group_id
+    row = OTPService.create_group_sessions(db, group_id, test_id)[0]
+    session_store.clear()
+
+    is_valid, state = OTPService.verify_otp(db, row["session_id"], row["otp"])
+
+    assert is_valid is True
+
+def test_unique_otps_skip_taken(db: Session, student_id: int, test_id: int, monkeypatch):
+    """Database'da band OTP qayta berilmaydi"""
+    session = OTPService.create_session(db, student_id, test_id)
+    candidates = iter([session.otp, session.otp, "111111", "222222"])
+    monkeypatch.setattr(OTPService, "generate_otp", staticmethod(lambda: next(candidates)))
+
+    assert sorted(OTPService.generate_unique_otps(db, 2)) == ["111111", "222222"]
+
+def test_session_store_backend_must_implement_interface():
+    """Metodlarini amalga oshirmagan ombor backend'i yaratilmaydi"""
+    class PartialStore(SessionStateStore):
+        def get(self, session_id: int):
+            return None
+
+    with pytest.raises(TypeError):
+        PartialStore()
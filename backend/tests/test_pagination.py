@@ -0,0 +1,81 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.main import app
+from app.middleware.auth import create_admin_token
+from app.models.group import Group
+from app.models.result import Result
+from app.models.student import Student
+from app.services.pagination import count_cache
+
+def admin_client() -> TestClient:
+    token, _ = create_admin_token("admin")
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+def create_results(db: Session, test_id: int, count: int) -> list[int]:
+    """Bitta guruhda count ta o'quvchi va har biriga natija"""
+    group = Group(name="Natijalar")
+    db.add(group)
+    db.flush()
+    students = [Student(group_id=group.id, full_name=f"Talaba {i}") for i in range(count)]
+    db.add_all(students)
+    db.flush()
+    results = [
+        Result(student_id=student.id, test_id=test_id, correct_count=i, total_count=20, percentage=i * 5.0)
+        for i, student in enumerate(students)
+    ]
+    db.add_all(results)
+    db.commit()
+    return [result.id for result in results]
+
+def test_results_keyset_pages_cover_all_rows(db: Session, test_id: int, query_budget):
+    """after_id kursori bilan barcha natijalar takrorlanmasdan o'qiladi"""
+    result_ids = create_results(db, test_id, 25)
+    client = admin_client()
+
+    seen = []
+    params = {"test_id": test_id, "limit": 10}
+    while True:
+        with query_budget(1):
+            response = client.get("/api/admin/results", params=params)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        next_after_id = response.headers.get("X-Next-After-Id")
+        if next_after_id is None:
+            break
+        params["after_id"] = int(next_after_id)
+
+    assert seen == sorted(result_ids)
+    assert set(response.json()[0]) == {
+        "id", "student_id", "test_id", "correct_count", "total_count", "percentage", "created_at"
+    }
+
+def test_results_descending_sort(db: Session, test_id: int):
+    """sort=-id eng yangi natijalardan boshlaydi, kursor kamayish tomonga"""
+    result_ids = create_results(db, test_id, 5)
+    client = admin_client()
+
+    first = client.get("/api/admin/results", params={"sort": "-id", "limit": 3})
+    second = client.get("/api/admin/results", params={
+        "sort": "-id", "limit": 3, "after_id": first.headers["X-Next-After-Id"]
+    })
+
+    ids = [item["id"] for item in first.json() + second.json()]
+    assert ids == sorted(result_ids, reverse=True)
+    assert "X-Next-After-Id" not in second.headers
+    assert client.get("/api/admin/results", params={"sort": "percentage"}).status_code == 422
+
+def test_total_count_is_optional_and_cached(db: Session, student_id: int, query_budget):
+    """Umumiy son faqat so'ralganda hisoblanadi, keshlanadi va yozuvda yangilanadi"""
+    count_cache.invalidate()
+    client = admin_client()
+
+    assert "X-Total-Count" not in client.get("/api/admin/groups").headers
+    assert client.get("/api/admin/groups", params={"include_total": True}).headers["X-Total-Count"] == "1"
+    with query_budget(2):
+        response = client.get("/api/admin/groups", params={"include_total": True, "limit": 1})
+    assert response.headers["X-Total-Count"] == "1"
+
+    client.post("/api/admin/groups", json={"name": "102-guruh"})
+    response = client.get("/api/admin/groups", params={"include_total": True})
+    assert response.headers["X-Total-Count"] == "2"
+    assert [len(group["students"]) for group in response.json()] == [1, 0]
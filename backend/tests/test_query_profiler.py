@@ -0,0 +1,104 @@
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.main import app
+from app.middleware.auth import create_admin_token
+from app.middleware.profiler import QueryProfilerMiddleware
+from app.models.question import Question
+from app.models.student import Student
+from app.profiler import QueryProfile, capture_queries, normalize_sql
+from app.services.otp_service import OTPService
+
+def test_normalize_sql_replaces_literals_and_parameters():
+    """Literal, parametr va IN ro'yxatlari bir xil shaklga keltiriladi"""
+    assert normalize_sql("SELECT * FROM options WHERE question_id = 17") == (
+        "SELECT * FROM options WHERE question_id = ?"
+    )
+    assert normalize_sql("SELECT *\n  FROM students WHERE full_name = 'Ali' AND id = %(id_1)s") == (
+        "SELECT * FROM students WHERE full_name = ? AND id = ?"
+    )
+    assert normalize_sql("SELECT id FROM questions WHERE id IN (?, ?, ?)") == normalize_sql(
+        "SELECT id FROM questions WHERE id IN (1, 2, 3, 4, 5)"
+    )
+
+def test_profile_flags_repeated_shapes():
+    """Threshold'dan ko'p takrorlangan shakl N+1 gumoni sifatida belgilanadi"""
+    profile = QueryProfile(repeat_threshold=3)
+    for question_id in range(5):
+        profile.add(f"SELECT * FROM options WHERE question_id = {question_id}", 0.001)
+    profile.add("SELECT * FROM questions WHERE test_id = 1", 0.002)
+
+    assert profile.total_queries == 6
+    assert [(shape, count) for shape, count, _ in profile.repeated()] == [
+        ("SELECT * FROM options WHERE question_id = ?", 5)
+    ]
+    assert profile.server_timing(0.01) == 'db;dur=7.0;desc="6 queries", app;dur=10.0'
+
+def test_middleware_adds_server_timing_header(db: Session):
+    """Javobda SQL so'rovlar soni va vaqti Server-Timing sarlavhasida"""
+    demo = FastAPI()
+    demo.add_middleware(QueryProfilerMiddleware)
+
+    @demo.get("/items/{item_id}")
+    def read_item(item_id: int, db: Session = Depends(get_db)):
+        db.execute(text("SELECT 1"))
+        db.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    response = TestClient(demo).get("/items/1")
+
+    assert response.status_code == 200
+    assert 'desc="2 queries"' in response.headers["server-timing"]
+
+def test_capture_counts_queries_from_other_threads(db: Session):
+    """capture_queries TestClient thread'idagi so'rovlarni ham yig'adi"""
+    demo = FastAPI()
+
+    @demo.get("/ping")
+    def ping(db: Session = Depends(get_db)):
+        db.execute(text("SELECT 1"))
+        return {}
+
+    with capture_queries() as profile:
+        TestClient(demo).get("/ping")
+
+    assert profile.total_queries == 1
+
+def test_question_endpoints_query_budget(db: Session, student_id: int, test_id: int, query_budget):
+    """Savollarni olish va javoblarni yuborish savollar soniga bog'liq emas"""
+    session = OTPService.create_session(db, student_id, test_id)
+    OTPService.verify_otp(db, session.id, session.otp)
+    questions = db.query(Question).filter(Question.test_id == test_id).limit(10).all()
+    client = TestClient(app)
+
+    with query_budget(3):
+        response = client.get(f"/api/test/questions/{session.id}")
+    assert response.status_code == 200
+    assert len(response.json()) == 20
+
+    with query_budget(6):
+        response = client.post("/api/test/submit-answers", json={
+            "session_id": session.id,
+            "answers": [{"question_id": q.id, "answer": q.correct_answer} for q in questions]
+        })
+    assert response.status_code == 200
+    assert response.json()["saved_count"] == 10
+
+def test_admin_endpoints_query_budget(db: Session, student_id: int, test_id: int, query_budget):
+    """Admin endpoint'lari talabalar soniga qarab so'rov qo'shmaydi"""
+    group_id = db.get(Student, student_id).group_id
+    db.add_all(Student(group_id=group_id, full_name=f"Talaba {i}") for i in range(10))
+    db.commit()
+    token, _ = create_admin_token("admin")
+    client = TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+    with query_budget(3):
+        response = client.get("/api/admin/groups")
+    assert len(response.json()[0]["students"]) == 11
+    with query_budget(3):
+        assert client.get("/api/admin/tests").status_code == 200
+    with query_budget(6):
+        response = client.post(f"/api/admin/groups/{group_id}/generate-otps", params={"test_id": test_id})
+    assert len(response.json()["students"]) == 11
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy.orm import Session
+from app.models.question import Question
+from app.services.test_service import TestService
+from app.services.question_pool import QuestionPoolCache, QuestionPool, question_pool_cache
+from app.exceptions import NotFoundException
+
+def test_random_questions_from_pool(db: Session, test_id: int):
+    """Random savollar puldan tanlanadi va variantlari bilan qaytadi"""
+    questions = TestService.get_random_questions(db, test_id, limit=20)
+
+    assert len(questions) == 20
+    assert len({q["id"] for q in questions}) == 20
+    assert all(len(q["options"]) == 2 for q in questions)
+
+def test_pool_is_cached(db: Session, test_id: int):
+    """Ikkinchi chaqiruv database'ga murojaat qilmaydi"""
+    TestService.get_random_questions(db, test_id)
+    db.query(Question).delete()
+    db.commit()
+
+    questions = TestService.get_random_questions(db, test_id)
+    assert len(questions) == 20
+
+def test_pool_invalidation(db: Session, test_id: int):
+    """Bekor qilingandan keyin pul qayta yuklanadi"""
+    pool = TestService.get_question_pool(db, test_id)
+    question_pool_cache.invalidate(test_id)
+
+    assert question_pool_cache.get(test_id) is None
+    assert TestService.get_question_pool(db, test_id) is not pool
+
+def test_pool_ttl_expiry():
+    """TTL o'tgan pul keshdan chiqariladi"""
+    cache = QuestionPoolCache(ttl_seconds=0)
+    pool = QuestionPool(1, {1: {"id": 1, "text": "Savol", "options": []}})
+    pool.loaded_at -= 1
+    cache.put(pool)
+
+    assert cache.get(1) is None
+
+def test_pool_unknown_test(db: Session):
+    with pytest.raises(NotFoundException):
+        TestService.get_random_questions(db, 12345)
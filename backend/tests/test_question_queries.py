@@ -0,0 +1,42 @@
+from sqlalchemy.orm import Session
+from app.profiler import capture_queries
+from app.services.test_service import TestService
+from tests.conftest import create_test_with_questions
+
+def test_pool_load_query_count_is_constant(db: Session):
+    """Savollar sonidan qat'i nazar so'rovlar soni o'zgarmaydi (N+1 yo'q)"""
+    small_test_id = create_test_with_questions(db, question_count=20, name="Kichik")
+    large_test_id = create_test_with_questions(db, question_count=200, name="Katta")
+
+    with capture_queries() as small_profile:
+        small_pool = TestService.load_question_pool(db, small_test_id)
+    with capture_queries() as large_profile:
+        large_pool = TestService.load_question_pool(db, large_test_id)
+
+    assert len(small_pool) == 20
+    assert len(large_pool) == 200
+    assert small_profile.total_queries == large_profile.total_queries
+    assert small_profile.total_queries <= 3
+
+def test_pool_payload_has_options(db: Session):
+    test_id = create_test_with_questions(db, question_count=20)
+
+    pool = TestService.load_question_pool(db, test_id)
+
+    for payload in pool.payloads.values():
+        assert [opt["text"] for opt in payload["options"]] == [
+            payload["text"].replace("Savol", "Javob"),
+            payload["text"].replace("Savol", "Xato"),
+        ]
+
+def test_random_questions_query_count(db: Session):
+    """20 savollik test: birinchi chaqiruv doimiy, keyingilari esa so'rovsiz"""
+    test_id = create_test_with_questions(db, question_count=20)
+
+    with capture_queries() as first_profile:
+        TestService.get_random_questions(db, test_id, limit=20)
+    with capture_queries() as cached_profile:
+        TestService.get_random_questions(db, test_id, limit=20)
+
+    assert first_profile.total_queries <= 3
+    assert cached_profile.total_queries == 0
@@ -1,5 +1,10 @@
 import pytest
+from sqlalchemy.orm import Session
+from app.models.answer import Answer
+from app.models.result import Result
 from app.services.result_service import ResultService
+from app.exceptions import NotFoundException
+from app.profiler import capture_queries
 
 def test_calculate_result(db: Session, test_session_id: int):
     """Natija hisoblashni tekshirish"""
@@ -15,4 +20,40 @@ def test_percentage_calculation(db: Session, test_session_id: int):
     result = ResultService.calculate_result(db, test_session_id)
     
     expected_percentage = (result.correct_count / result.total_count * 100) if result.total_count > 0 else 0
-    assert result.percentage == expected_percentage
\ No newline at end of file
+    assert result.percentage == expected_percentage
+
+def test_calculate_result_counts(db: Session, test_session_id: int):
+    """4 ta javobdan 2 tasi to'g'ri (conftest)"""
+    result = ResultService.calculate_result(db, test_session_id)
+
+    assert (result.correct_count, result.total_count, result.percentage) == (2, 4, 50.0)
+
+def test_calculate_result_upserts(db: Session, test_session_id: int):
+    """Qayta hisoblash mavjud natija qatorini yangilaydi"""
+    first = ResultService.calculate_result(db, test_session_id)
+    answer = db.query(Answer).filter(Answer.test_session_id == test_session_id, Answer.is_correct.is_(False)).first()
+    answer.is_correct = True
+    db.commit()
+
+    second = ResultService.calculate_result(db, test_session_id)
+
+    assert second.id == first.id
+    assert second.correct_count == 3
+    assert db.query(Result).count() == 1
+
+def test_calculate_result_statement_count(db: Session, test_session_id: int):
+    """Aggregate SELECT va upsert: jami ikki so'rov"""
+    with capture_queries() as profile:
+        ResultService.calculate_result(db, test_session_id)
+
+    assert profile.total_queries == 2
+
+def test_calculate_result_without_answers(db: Session, started_session_id: int):
+    """Javobsiz sessiya uchun 0 / 0"""
+    result = ResultService.calculate_result(db, started_session_id)
+
+    assert (result.correct_count, result.total_count, result.percentage) == (0, 0, 0)
+
+def test_calculate_result_missing_session(db: Session):
+    with pytest.raises(NotFoundException):
+        ResultService.calculate_result(db, 99999)
@@ -0,0 +1,53 @@
+from sqlalchemy.orm import Session
+from app.models.test_session import TestSession
+from app.services.otp_service import OTPService
+from app.services.test_service import TestService
+from app.services.question_pool import question_pool_cache
+from app.profiler import capture_queries
+
+def test_question_set_frozen_on_verify(db: Session, student_id: int, test_id: int):
+    """OTP tasdiqlanganda savollar to'plami sessiyaga yoziladi"""
+    session = OTPService.create_session(db, student_id, test_id)
+    OTPService.verify_otp(db, session.id, session.otp)
+
+    db.refresh(session)
+    assert len(session.question_set) == 20
+    assert all(len(option_ids) == 2 for _, option_ids in session.question_set)
+
+def test_session_questions_are_stable(db: Session, student_id: int, test_id: int):
+    """Sahifa yangilanganda bir xil savollar va variant tartibi qaytadi"""
+    session = OTPService.create_session(db, student_id, test_id)
+    OTPService.verify_otp(db, session.id, session.otp)
+
+    first = TestService.get_session_questions(db, session)
+    question_pool_cache.invalidate()
+    second = TestService.get_session_questions(db, session)
+
+    assert first == second
+    assert [q["id"] for q in first] == [question_id for question_id, _ in session.question_set]
+    assert [[opt["id"] for opt in q["options"]] for q in first] == [
+        option_ids for _, option_ids in session.question_set
+    ]
+
+def test_session_questions_hydrate_by_id(db: Session, student_id: int, test_id: int):
+    """Pul keshda bo'lmasa faqat sessiya savollari yuklanadi"""
+    session = OTPService.create_session(db, student_id, test_id)
+    OTPService.verify_otp(db, session.id, session.otp)
+    session = db.query(TestSession).filter(TestSession.id == session.id).first()
+    question_pool_cache.invalidate()
+
+    with capture_queries() as profile:
+        questions = TestService.get_session_questions(db, session)
+
+    assert len(questions) == 20
+    assert profile.total_queries == 2
+
+def test_legacy_session_draws_once(db: Session, started_session_id: int):
+    """To'plami saqlanmagan sessiya birinchi so'rovda to'plam oladi"""
+    session = db.query(TestSession).filter(TestSession.id == started_session_id).first()
+
+    first = TestService.get_session_questions(db, session)
+    db.refresh(session)
+
+    assert session.question_set is not None
+    assert TestService.get_session_questions(db, session) == first
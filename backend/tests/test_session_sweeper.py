@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from app.models.result import Result
+from app.models.test_session import TestSession, SessionStatus
+from app.services.result_service import ResultService
+from app.services.session_store import SessionState, session_store
+from app.services.session_sweeper import SessionSweeperService
+
+def add_session(db: Session, student_id: int, test_id: int, otp: str, **values) -> int:
+    session = TestSession(
+        student_id=student_id,
+        test_id=test_id,
+        otp=otp,
+        status=values.pop("status", SessionStatus.ACTIVE),
+        expires_at=values.pop("expires_at", datetime.utcnow() + timedelta(hours=1)),
+        **values
+    )
+    db.add(session)
+    db.commit()
+    return session.id
+
+def status_of(db: Session, session_id: int) -> SessionStatus:
+    db.expire_all()
+    return db.get(TestSession, session_id).status
+
+def test_sweep_expires_unstarted_sessions(db: Session, student_id: int, test_id: int):
+    """OTP muddati o'tgan faol va bloklangan sessiyalar partiyalab EXPIRED qilinadi"""
+    past = datetime.utcnow() - timedelta(minutes=1)
+    expired_ids = [
+        add_session(db, student_id, test_id, "100001", expires_at=past),
+        add_session(db, student_id, test_id, "100002", expires_at=past),
+        add_session(db, student_id, test_id, "100003", expires_at=past, status=SessionStatus.BLOCKED),
+    ]
+    fresh_id = add_session(db, student_id, test_id, "100004")
+    completed_id = add_session(db, student_id, test_id, "100005", expires_at=past, status=SessionStatus.COMPLETED)
+    session = db.get(TestSession, expired_ids[0])
+    session_store.put(SessionState.from_session(session))
+
+    report = SessionSweeperService.sweep(db, batch_size=2)
+
+    assert report["expired"] == 3
+    assert report["batches"] == 2
+    assert all(status_of(db, session_id) == SessionStatus.EXPIRED for session_id in expired_ids)
+    assert status_of(db, fresh_id) == SessionStatus.ACTIVE
+    assert status_of(db, completed_id) == SessionStatus.COMPLETED
+    assert session_store.get(expired_ids[0]) is None
+
+def test_sweep_finishes_overdue_sessions(db: Session, test_session_id: int):
+    """Test vaqti tugagan boshlangan sessiya yakunlanadi va natijasi hisoblanadi"""
+    session = db.get(TestSession, test_session_id)
+    session.started_at = datetime.utcnow() - timedelta(minutes=session.test.duration_minutes + 5)
+    db.commit()
+
+    report = SessionSweeperService.sweep(db)
+
+    assert report["finished"] == 1
+    assert status_of(db, test_session_id) == SessionStatus.COMPLETED
+    result = db.query(Result).one()
+    assert (result.correct_count, result.total_count) == (2, 4)
+    assert SessionSweeperService.sweep(db)["finished"] == 0
+
+def test_sweep_keeps_sessions_in_progress(db: Session, test_session_id: int):
+    """Vaqti tugamagan sessiyaga tegilmaydi"""
+    report = SessionSweeperService.sweep(db)
+
+    assert (report["expired"], report["finished"]) == (0, 0)
+    assert status_of(db, test_session_id) == SessionStatus.ACTIVE
+    assert db.query(Result).count() == 0
+
+def test_sweep_selects_overdue_in_sql_batches(db: Session, student_id: int, test_id: int):
+    """Muddati o'tganlar SQL'da partiyalab tanlanadi; eski sessiyalarga deadline yoziladi"""
+    now = datetime.utcnow()
+    overdue_ids = [
+        add_session(db, student_id, test_id, f"20000{i}", started_at=now - timedelta(minutes=30),
+                    deadline_at=now - timedelta(minutes=5))
+        for i in range(3)
+    ]
+    legacy_id = add_session(db, student_id, test_id, "200010", started_at=now - timedelta(hours=2))
+    running_id = add_session(db, student_id, test_id, "200011", started_at=now,
+                             deadline_at=now + timedelta(minutes=30))
+
+    finished, batches = SessionSweeperService.finish_overdue_sessions(db, now, batch_size=2)
+
+    assert (finished, batches) == (4, 2)
+    assert all(status_of(db, session_id) == SessionStatus.COMPLETED for session_id in overdue_ids + [legacy_id])
+    assert status_of(db, running_id) == SessionStatus.ACTIVE
+    assert db.get(TestSession, legacy_id).deadline_at is not None
+
+def test_failed_result_leaves_session_for_next_sweep(db: Session, student_id: int, test_id: int, monkeypatch):
+    """Natijani hisoblash xato bersa sessiya ACTIVE qoladi, boshqalari yakunlanadi, keyingi tozalash qayta urinadi"""
+    now = datetime.utcnow()
+    session_ids = [
+        add_session(db, student_id, test_id, f"30000{i}", started_at=now - timedelta(minutes=30),
+                    deadline_at=now - timedelta(minutes=5))
+        for i in range(3)
+    ]
+    calculate_result = ResultService.calculate_result
+
+    def failing(db: Session, test_session_id: int):
+        if test_session_id == session_ids[0]:
+            raise RuntimeError("natija yozilmadi")
+        return calculate_result(db, test_session_id)
+
+    monkeypatch.setattr(ResultService, "calculate_result", staticmethod(failing))
+
+    finished, batches = SessionSweeperService.finish_overdue_sessions(db, now, batch_size=1)
+
+    assert (finished, batches) == (2, 3)
+    assert status_of(db, session_ids[0]) == SessionStatus.ACTIVE
+    assert [status_of(db, session_id) for session_id in session_ids[1:]] == [SessionStatus.COMPLETED] * 2
+
+    monkeypatch.setattr(ResultService, "calculate_result", staticmethod(calculate_result))
+    assert SessionSweeperService.finish_overdue_sessions(db, now)[0] == 1
+    assert status_of(db, session_ids[0]) == SessionStatus.COMPLETED
+    assert db.query(Result).count() == 1
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy.orm import Session
+from app.models.answer import Answer
+from app.models.question import Question
+from app.schemas.answer_schema import AnswerSubmit
+from app.services.result_service import ResultService
+from app.services.test_service import TestService
+from app.exceptions import NotFoundException
+from app.profiler import capture_queries
+
+def test_submit_answers_batch(db: Session, started_session_id: int, test_id: int):
+    """Bir nechta javobni bitta so'rovda saqlash"""
+    questions = db.query(Question).filter(Question.test_id == test_id).limit(3).all()
+    answers = [
+        AnswerSubmit(question_id=questions[0].id, answer=questions[0].correct_answer.upper()),
+        AnswerSubmit(question_id=questions[1].id, answer="xato"),
+        AnswerSubmit(question_id=questions[2].id, answer=f"  {questions[2].correct_answer} "),
+    ]
+
+    graded = TestService.submit_answers(db, started_session_id, test_id, answers)
+
+    assert [item["is_correct"] for item in graded] == [True, False, True]
+    assert db.query(Answer).filter(Answer.test_session_id == started_session_id).count() == 3
+
+def test_submit_answers_keeps_last_answer(db: Session, started_session_id: int, test_id: int):
+    """Bir savolga takroriy javobdan faqat oxirgisi saqlanadi"""
+    question = db.query(Question).filter(Question.test_id == test_id).first()
+    answers = [
+        AnswerSubmit(question_id=question.id, answer="xato"),
+        AnswerSubmit(question_id=question.id, answer=question.correct_answer),
+    ]
+
+    graded = TestService.submit_answers(db, started_session_id, test_id, answers)
+
+    assert graded == [{"question_id": question.id, "is_correct": True}]
+
+def test_resubmitted_answer_replaces_previous(db: Session, started_session_id: int, test_id: int):
+    """Avtosaqlash o'zgargan javobni qayta yuborsa, savol natijada bir marta sanaladi"""
+    question = db.query(Question).filter(Question.test_id == test_id).first()
+
+    TestService.submit_answers(db, started_session_id, test_id, [AnswerSubmit(question_id=question.id, answer="xato")])
+    TestService.submit_answers(
+        db, started_session_id, test_id, [AnswerSubmit(question_id=question.id, answer=question.correct_answer)]
+    )
+    result = ResultService.calculate_result(db, started_session_id)
+
+    assert (result.correct_count, result.total_count, result.percentage) == (1, 1, 100.0)
+    assert db.query(Answer).filter(Answer.test_session_id == started_session_id).count() == 1
+
+def test_submit_answer_retry_replaces_batch_answer(db: Session, started_session_id: int, test_id: int):
+    """Partiyada saqlangan savolga keyingi bitta javob yangi qator qo'shmaydi"""
+    questions = db.query(Question).filter(Question.test_id == test_id).limit(2).all()
+    TestService.submit_answers(db, started_session_id, test_id, [
+        AnswerSubmit(question_id=question.id, answer=question.correct_answer) for question in questions
+    ])
+
+    first = TestService.submit_answer(db, started_session_id, test_id, questions[0].id, "xato")
+    retry = TestService.submit_answer(db, started_session_id, test_id, questions[0].id, "xato")
+    result = ResultService.calculate_result(db, started_session_id)
+
+    assert retry.id == first.id
+    assert retry.student_answer == "xato" and retry.is_correct is False
+    assert (result.correct_count, result.total_count) == (1, 2)
+
+def test_submit_answers_rejects_foreign_question(db: Session, started_session_id: int, test_id: int):
+    """Boshqa testning savoli qabul qilinmaydi"""
+    with pytest.raises(NotFoundException):
+        TestService.submit_answers(
+            db, started_session_id, test_id, [AnswerSubmit(question_id=99999, answer="x")]
+        )
+    assert db.query(Answer).count() == 0
+
+def test_answer_key_is_normalized(db: Session, test_id: int):
+    """Pul yuklanganda to'g'ri javoblar normalize qilingan holda saqlanadi"""
+    question = db.query(Question).filter(Question.test_id == test_id).first()
+    question.correct_answer = "  Javob X "
+    db.commit()
+
+    pool = TestService.load_question_pool(db, test_id)
+
+    assert pool.answer_key[question.id] == "javob x"
+    assert len(pool.answer_key) == len(pool)
+
+def test_grading_uses_cached_answer_key(db: Session, started_session_id: int, test_id: int):
+    """Savollar tanlangandan keyin javoblarni tekshirish uchun SELECT yuborilmaydi"""
+    questions = TestService.get_random_questions(db, test_id, limit=3)
+    answers = [AnswerSubmit(question_id=question["id"], answer="xato") for question in questions]
+
+    with capture_queries() as profile:
+        TestService.submit_answers(db, started_session_id, test_id, answers)
+        TestService.submit_answer(db, started_session_id, test_id, questions[0]["id"], "xato")
+
+    assert not any(shape.upper().startswith("SELECT") for shape in profile.shapes)
+
+def test_submit_answer_rejects_foreign_question(db: Session, started_session_id: int, test_id: int):
+    """Bitta javob uchun ham boshqa testning savoli qabul qilinmaydi"""
+    with pytest.raises(NotFoundException):
+        TestService.submit_answer(db, started_session_id, test_id, 99999, "x")
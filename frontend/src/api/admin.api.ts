@@ -1,3 +1,4 @@
+import type { AxiosResponse } from 'axios';
 import axiosInstance from './axios';
 import type {
   Group,
@@ -7,104 +8,130 @@ import type {
   Test,
   Result,
   OTPResponse,
+  GroupOTPResponse,
+  AdminTokenResponse,
+  Page,
+  PageParams,
 } from '../types';
 
 const API_PREFIX = '/api/admin';
 
+// Largest page the backend accepts (ADMIN_MAX_PAGE_SIZE)
+const MAX_PAGE_SIZE = 1000;
+
+const toPage = <T>(response: AxiosResponse<T[]>): Page<T> => {
+  const next = response.headers['x-next-after-id'];
+  const total = response.headers['x-total-count'];
+  return {
+    items: response.data,
+    nextAfterId: next ? Number(next) : null,
+    total: total ? Number(total) : null,
+  };
+};
+
+// Follows the keyset cursor until the last page; for small lists used in dropdowns
+const fetchAllPages = async <T>(
+  url: string,
+  params: Record<string, unknown> = {}
+): Promise<T[]> => {
+  const items: T[] = [];
+  let afterId: number | null = null;
+  do {
+    const response = await axiosInstance.get<T[]>(url, {
+      params: { ...params, limit: MAX_PAGE_SIZE, after_id: afterId ?? undefined },
+    });
+    const page = toPage(response);
+    items.push(...page.items);
+    afterId = page.nextAfterId;
+  } while (afterId !== null);
+  return items;
+};
+
 export const adminApi = {
-  // Groups
-  createGroup: async (name: string, login: string, password: string) => {
-    const response = await axiosInstance.post<Group>(
-      `${API_PREFIX}/groups?login=${login}&password=${password}`,
-      { name }
+  // Auth
+  login: async (login: string, password: string) => {
+    const response = await axiosInstance.post<AdminTokenResponse>(
+      `${API_PREFIX}/login`,
+      { login, password }
     );
     return response.data;
   },
 
-  getGroups: async (login: string, password: string) => {
-    const response = await axiosInstance.get<Group[]>(
-      `${API_PREFIX}/groups?login=${login}&password=${password}`
-    );
+  // Groups
+  createGroup: async (name: string) => {
+    const response = await axiosInstance.post<Group>(`${API_PREFIX}/groups`, {
+      name,
+    });
     return response.data;
   },
 
-  deleteGroup: async (groupId: number, login: string, password: string) => {
+  getGroups: async () => {
+    return fetchAllPages<Group>(`${API_PREFIX}/groups`);
+  },
+
+  getGroupsPage: async (params: PageParams = {}) => {
+    const response = await axiosInstance.get<Group[]>(`${API_PREFIX}/groups`, {
+      params,
+    });
+    return toPage(response);
+  },
+
+  deleteGroup: async (groupId: number) => {
     const response = await axiosInstance.delete(
-      `${API_PREFIX}/groups/${groupId}?login=${login}&password=${password}`
+      `${API_PREFIX}/groups/${groupId}`
     );
     return response.data;
   },
 
   // Students
-  createStudent: async (
-    groupId: number,
-    fullName: string,
-    login: string,
-    password: string
-  ) => {
+  createStudent: async (groupId: number, fullName: string) => {
     const response = await axiosInstance.post<Student>(
-      `${API_PREFIX}/students?login=${login}&password=${password}`,
+      `${API_PREFIX}/students`,
       { group_id: groupId, full_name: fullName }
     );
     return response.data;
   },
 
-  getStudentsByGroup: async (
-    groupId: number,
-    login: string,
-    password: string
-  ) => {
-    const response = await axiosInstance.get<Student[]>(
-      `${API_PREFIX}/groups/${groupId}/students?login=${login}&password=${password}`
-    );
-    return response.data;
+  getStudentsByGroup: async (groupId: number) => {
+    return fetchAllPages<Student>(`${API_PREFIX}/groups/${groupId}/students`);
   },
 
-  deleteStudent: async (studentId: number, login: string, password: string) => {
+  deleteStudent: async (studentId: number) => {
     const response = await axiosInstance.delete(
-      `${API_PREFIX}/students/${studentId}?login=${login}&password=${password}`
+      `${API_PREFIX}/students/${studentId}`
     );
     return response.data;
   },
 
   // Subjects
-  createSubject: async (name: string, login: string, password: string) => {
+  createSubject: async (name: string) => {
     const response = await axiosInstance.post<Subject>(
-      `${API_PREFIX}/subjects?login=${login}&password=${password}`,
+      `${API_PREFIX}/subjects`,
       { name }
     );
     return response.data;
   },
 
-  getSubjects: async (login: string, password: string) => {
+  getSubjects: async () => {
     const response = await axiosInstance.get<Subject[]>(
-      `${API_PREFIX}/subjects?login=${login}&password=${password}`
+      `${API_PREFIX}/subjects`
     );
     return response.data;
   },
 
   // Topics
-  createTopic: async (
-    subjectId: number,
-    topicNumber: number,
-    name: string,
-    login: string,
-    password: string
-  ) => {
-    const response = await axiosInstance.post<Topic>(
-      `${API_PREFIX}/topics?login=${login}&password=${password}`,
-      { subject_id: subjectId, topic_number: topicNumber, name }
-    );
+  createTopic: async (subjectId: number, topicNumber: number, name: string) => {
+    const response = await axiosInstance.post<Topic>(`${API_PREFIX}/topics`, {
+      subject_id: subjectId,
+      topic_number: topicNumber,
+      name,
+    });
     return response.data;
   },
 
-  getTopicsBySubject: async (
-    subjectId: number,
-    login: string,
-    password: string
-  ) => {
+  getTopicsBySubject: async (subjectId: number) => {
     const response = await axiosInstance.get<Topic[]>(
-      `${API_PREFIX}/subjects/${subjectId}/topics?login=${login}&password=${password}`
+      `${API_PREFIX}/subjects/${subjectId}/topics`
     );
     return response.data;
   },
@@ -114,67 +141,64 @@ export const adminApi = {
     name: string,
     subjectId: number,
     durationMinutes: number,
-    topicNumbers: number[],
-    login: string,
-    password: string
+    topicNumbers: number[]
   ) => {
-    const response = await axiosInstance.post<Test>(
-      `${API_PREFIX}/tests?login=${login}&password=${password}`,
-      {
-        name,
-        subject_id: subjectId,
-        duration_minutes: durationMinutes,
-        topic_numbers: topicNumbers,
-      }
-    );
+    const response = await axiosInstance.post<Test>(`${API_PREFIX}/tests`, {
+      name,
+      subject_id: subjectId,
+      duration_minutes: durationMinutes,
+      topic_numbers: topicNumbers,
+    });
     return response.data;
   },
 
-  getTests: async (login: string, password: string, subjectId?: number) => {
-    let url = `${API_PREFIX}/tests?login=${login}&password=${password}`;
-    if (subjectId) {
-      url += `&subject_id=${subjectId}`;
-    }
-    const response = await axiosInstance.get<Test[]>(url);
-    return response.data;
+  getTests: async (subjectId?: number) => {
+    return fetchAllPages<Test>(`${API_PREFIX}/tests`, { subject_id: subjectId });
+  },
+
+  getTestsPage: async (params: PageParams = {}) => {
+    const response = await axiosInstance.get<Test[]>(`${API_PREFIX}/tests`, {
+      params,
+    });
+    return toPage(response);
   },
 
   // OTP
-  generateOTP: async (
-    studentId: number,
-    testId: number,
-    login: string,
-    password: string
-  ) => {
+  generateOTP: async (studentId: number, testId: number) => {
     const response = await axiosInstance.post<OTPResponse>(
-      `${API_PREFIX}/generate-otp?student_id=${studentId}&test_id=${testId}&login=${login}&password=${password}`
+      `${API_PREFIX}/generate-otp`,
+      null,
+      { params: { student_id: studentId, test_id: testId } }
+    );
+    return response.data;
+  },
+
+  generateGroupOTPs: async (groupId: number, testId: number) => {
+    const response = await axiosInstance.post<GroupOTPResponse>(
+      `${API_PREFIX}/groups/${groupId}/generate-otps`,
+      null,
+      { params: { test_id: testId } }
     );
     return response.data;
   },
 
   // Results
   getResults: async (
-    login: string,
-    password: string,
     studentId?: number,
-    testId?: number
+    testId?: number,
+    params: PageParams = {}
   ) => {
-    let url = `${API_PREFIX}/results?login=${login}&password=${password}`;
-    if (studentId) {
-      url += `&student_id=${studentId}`;
-    }
-    if (testId) {
-      url += `&test_id=${testId}`;
-    }
-    const response = await axiosInstance.get<Result[]>(url);
-    return response.data;
+    const response = await axiosInstance.get<Result[]>(
+      `${API_PREFIX}/results`,
+      { params: { student_id: studentId, test_id: testId, ...params } }
+    );
+    return toPage(response);
   },
 
-  exportResults: async (login: string, password: string) => {
-    const response = await axiosInstance.get(
-      `${API_PREFIX}/export-results?login=${login}&password=${password}`,
-      { responseType: 'blob' }
-    );
+  exportResults: async () => {
+    const response = await axiosInstance.get(`${API_PREFIX}/export-results`, {
+      responseType: 'blob',
+    });
     return response.data;
   },
 };
@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { useAuthStore } from '../store/authStore';
 
 const axiosInstance = axios.create({
   baseURL: import.meta.env.VITE_API_URL || 'http://localhost:8000',
@@ -11,6 +12,10 @@ const axiosInstance = axios.create({
 // Request interceptor
 axiosInstance.interceptors.request.use(
   (config) => {
+    const token = useAuthStore.getState().token;
+    if (token && config.url?.startsWith('/api/admin')) {
+      config.headers.Authorization = `Bearer ${token}`;
+    }
     return config;
   },
   (error) => {
@@ -27,6 +32,14 @@ axiosInstance.interceptors.response.use(
     if (error.response?.data?.detail) {
       console.error('API Error:', error.response.data.detail);
     }
+    // Expired or invalid admin token: send the admin back to the login page
+    if (
+      error.response?.status === 401 &&
+      error.config?.url?.startsWith('/api/admin') &&
+      error.config.url !== '/api/admin/login'
+    ) {
+      useAuthStore.getState().logout();
+    }
     return Promise.reject(error);
   }
 );
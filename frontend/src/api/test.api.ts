@@ -40,6 +40,20 @@ export const testApi = {
     return response.data;
   },
 
+  submitAnswers: async (
+    sessionId: number,
+    answers: { questionId: number; answer: string }[]
+  ) => {
+    const response = await axiosInstance.post<{ saved_count: number }>(
+      `${API_PREFIX}/submit-answers`,
+      {
+        session_id: sessionId,
+        answers: answers.map((a) => ({ question_id: a.questionId, answer: a.answer })),
+      }
+    );
+    return response.data;
+  },
+
   finishTest: async (sessionId: number) => {
     const response = await axiosInstance.post<{ success: boolean }>(
       `${API_PREFIX}/finish-test/${sessionId}`
@@ -22,8 +22,8 @@ export const AdminLogin: React.FC = () => {
     setLoading(true);
 
     try {
-      await adminApi.getGroups(login, password);
-      setAuth(login, password);
+      const { access_token, expires_at } = await adminApi.login(login, password);
+      setAuth(access_token, expires_at);
       navigate('/admin/dashboard');
     } catch (err: any) {
       setError(
@@ -1,5 +1,4 @@
 import { useEffect, useState } from 'react';
-import { useAuthStore } from '../../store/authStore';
 import { adminApi } from '../../api/admin.api';
 import { Card, CardHeader, CardTitle, CardContent } from '../../components/ui/Card';
 import { Loading } from '../../components/ui/Loading';
@@ -14,7 +13,6 @@ interface Stats {
 }
 
 export const DashboardHome: React.FC = () => {
-  const { login, password } = useAuthStore();
   const [stats, setStats] = useState<Stats>({ groups: 0, subjects: 0, tests: 0, results: 0 });
   const [loading, setLoading] = useState(true);
 
@@ -24,18 +22,20 @@ export const DashboardHome: React.FC = () => {
 
   const fetchStats = async () => {
     try {
+      // Only the totals are needed: one-row pages with the cached count
+      const countOnly = { limit: 1, include_total: true };
       const [groups, subjects, tests, results] = await Promise.all([
-        adminApi.getGroups(login, password),
-        adminApi.getSubjects(login, password),
-        adminApi.getTests(login, password),
-        adminApi.getResults(login, password),
+        adminApi.getGroupsPage(countOnly),
+        adminApi.getSubjects(),
+        adminApi.getTestsPage(countOnly),
+        adminApi.getResults(undefined, undefined, countOnly),
       ]);
 
       setStats({
-        groups: groups.length,
+        groups: groups.total ?? 0,
         subjects: subjects.length,
-        tests: tests.length,
-        results: results.length,
+        tests: tests.total ?? 0,
+        results: results.total ?? 0,
       });
     } catch (error: any) {
       console.error('Failed to fetch stats:', error);
@@ -1,5 +1,4 @@
 import { useEffect, useState } from 'react';
-import { useAuthStore } from '../../store/authStore';
 import { adminApi } from '../../api/admin.api';
 import type { Group, Student } from '../../types';
 import { Card, CardHeader, CardTitle, CardContent } from '../../components/ui/Card';
@@ -11,7 +10,6 @@ import { Plus, Trash2, Users as UsersIcon } from 'lucide-react';
 import { motion } from 'framer-motion';
 
 export const GroupsPage: React.FC = () => {
-  const { login, password } = useAuthStore();
   const [groups, setGroups] = useState<Group[]>([]);
   const [students, setStudents] = useState<Student[]>([]);
   const [selectedGroupId, setSelectedGroupId] = useState<number | null>(null);
@@ -29,7 +27,7 @@ export const GroupsPage: React.FC = () => {
 
   const fetchGroups = async () => {
     try {
-      const data = await adminApi.getGroups(login, password);
+      const data = await adminApi.getGroups();
       setGroups(data);
     } catch (error: any) {
       alert(error.response?.data?.detail || 'Failed to fetch groups');
@@ -41,7 +39,7 @@ export const GroupsPage: React.FC = () => {
   const fetchStudents = async (groupId: number) => {
     setLoadingStudents(true);
     try {
-      const data = await adminApi.getStudentsByGroup(groupId, login, password);
+      const data = await adminApi.getStudentsByGroup(groupId);
       setStudents(data);
       setSelectedGroupId(groupId);
     } catch (error: any) {
@@ -57,7 +55,7 @@ export const GroupsPage: React.FC = () => {
 
     setCreating(true);
     try {
-      await adminApi.createGroup(newGroupName.trim(), login, password);
+      await adminApi.createGroup(newGroupName.trim());
       setNewGroupName('');
       await fetchGroups();
       alert('Group created successfully!');
@@ -72,7 +70,7 @@ export const GroupsPage: React.FC = () => {
     if (!confirm(`Are you sure you want to delete group "${groupName}"?`)) return;
 
     try {
-      await adminApi.deleteGroup(groupId, login, password);
+      await adminApi.deleteGroup(groupId);
       await fetchGroups();
       if (selectedGroupId === groupId) {
         setSelectedGroupId(null);
@@ -92,9 +90,7 @@ export const GroupsPage: React.FC = () => {
     try {
       await adminApi.createStudent(
         selectedGroupId,
-        newStudentName.trim(),
-        login,
-        password
+        newStudentName.trim()
       );
       setNewStudentName('');
       await fetchStudents(selectedGroupId);
@@ -110,7 +106,7 @@ export const GroupsPage: React.FC = () => {
     if (!confirm(`Are you sure you want to delete student "${studentName}"?`)) return;
 
     try {
-      await adminApi.deleteStudent(studentId, login, password);
+      await adminApi.deleteStudent(studentId);
       if (selectedGroupId) {
         await fetchStudents(selectedGroupId);
       }
@@ -1,5 +1,4 @@
 import { useEffect, useState } from 'react';
-import { useAuthStore } from '../../store/authStore';
 import { adminApi } from '../../api/admin.api';
 import type { Result, Test, Group, Student } from '../../types';
 import { Card, CardHeader, CardTitle, CardContent } from '../../components/ui/Card';
@@ -10,8 +9,10 @@ import { Download, Filter, TrendingUp } from 'lucide-react';
 import { motion } from 'framer-motion';
 
 export const ResultsPage: React.FC = () => {
-  const { login, password } = useAuthStore();
   const [results, setResults] = useState<Result[]>([]);
+  const [totalResults, setTotalResults] = useState(0);
+  const [nextAfterId, setNextAfterId] = useState<number | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [tests, setTests] = useState<Test[]>([]);
   const [groups, setGroups] = useState<Group[]>([]);
   const [students, setStudents] = useState<Student[]>([]);
@@ -38,8 +39,8 @@ export const ResultsPage: React.FC = () => {
   const fetchData = async () => {
     try {
       const [testsData, groupsData] = await Promise.all([
-        adminApi.getTests(login, password),
-        adminApi.getGroups(login, password),
+        adminApi.getTests(),
+        adminApi.getGroups(),
       ]);
       setTests(testsData);
       setGroups(groupsData);
@@ -53,28 +54,49 @@ export const ResultsPage: React.FC = () => {
 
   const fetchStudents = async (groupId: number) => {
     try {
-      const data = await adminApi.getStudentsByGroup(groupId, login, password);
+      const data = await adminApi.getStudentsByGroup(groupId);
       setStudents(data);
     } catch (error: any) {
       console.error('Failed to fetch students:', error);
     }
   };
 
-  const fetchResults = async () => {
+  // Newest results first; further pages are loaded with the keyset cursor
+  const fetchResults = async (afterId?: number) => {
     try {
       const studentId = filterStudentId ? parseInt(filterStudentId) : undefined;
       const testId = filterTestId ? parseInt(filterTestId) : undefined;
-      const data = await adminApi.getResults(login, password, studentId, testId);
-      setResults(data);
+      const page = await adminApi.getResults(studentId, testId, {
+        sort: '-id',
+        after_id: afterId,
+        include_total: afterId === undefined,
+      });
+      if (afterId === undefined) {
+        setResults(page.items);
+        setTotalResults(page.total ?? page.items.length);
+      } else {
+        setResults((current) => [...current, ...page.items]);
+      }
+      setNextAfterId(page.nextAfterId);
     } catch (error: any) {
       alert(error.response?.data?.detail || 'Failed to fetch results');
     }
   };
 
+  const handleLoadMore = async () => {
+    if (nextAfterId === null) return;
+    setLoadingMore(true);
+    try {
+      await fetchResults(nextAfterId);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleExport = async () => {
     setExporting(true);
     try {
-      const blob = await adminApi.exportResults(login, password);
+      const blob = await adminApi.exportResults();
       const url = window.URL.createObjectURL(blob);
       const a = document.createElement('a');
       a.href = url;
@@ -192,7 +214,7 @@ export const ResultsPage: React.FC = () => {
               <Button
                 variant="primary"
                 leftIcon={<Filter />}
-                onClick={fetchResults}
+                onClick={() => fetchResults()}
               >
                 Apply Filters
               </Button>
@@ -205,7 +227,9 @@ export const ResultsPage: React.FC = () => {
       <motion.div initial={{ opacity: 0, y: 20 }} animate={{ opacity: 1, y: 0 }}>
         <Card>
           <CardHeader>
-            <CardTitle>Results ({results.length})</CardTitle>
+            <CardTitle>
+              Results ({results.length} of {totalResults})
+            </CardTitle>
           </CardHeader>
           <CardContent>
             <div className="space-y-3">
@@ -216,7 +240,7 @@ export const ResultsPage: React.FC = () => {
                     key={result.id}
                     initial={{ opacity: 0, x: -20 }}
                     animate={{ opacity: 1, x: 0 }}
-                    transition={{ delay: index * 0.05 }}
+                    transition={{ delay: Math.min(index, 20) * 0.05 }}
                     className="flex items-center justify-between p-4 border-2 border-gray-200 rounded-xl hover:border-primary-400 transition-all bg-white"
                   >
                     <div className="flex items-center gap-4 flex-1">
@@ -248,6 +272,17 @@ export const ResultsPage: React.FC = () => {
                 );
               })}
             </div>
+            {nextAfterId !== null && (
+              <div className="mt-4 text-center">
+                <Button
+                  variant="primary"
+                  onClick={handleLoadMore}
+                  isLoading={loadingMore}
+                >
+                  Load more
+                </Button>
+              </div>
+            )}
             {results.length === 0 && (
               <p className="text-gray-500 text-center py-12">
                 No results found. Try adjusting the filters.
@@ -1,5 +1,4 @@
 import { useEffect, useState } from 'react';
-import { useAuthStore } from '../../store/authStore';
 import { adminApi } from '../../api/admin.api';
 import type { Subject, Topic } from '../../types';
 import { Card, CardHeader, CardTitle, CardContent } from '../../components/ui/Card';
@@ -11,7 +10,6 @@ import { Plus, BookOpen } from 'lucide-react';
 import { motion } from 'framer-motion';
 
 export const SubjectsPage: React.FC = () => {
-  const { login, password } = useAuthStore();
   const [subjects, setSubjects] = useState<Subject[]>([]);
   const [topics, setTopics] = useState<Topic[]>([]);
   const [selectedSubjectId, setSelectedSubjectId] = useState<number | null>(null);
@@ -30,7 +28,7 @@ export const SubjectsPage: React.FC = () => {
 
   const fetchSubjects = async () => {
     try {
-      const data = await adminApi.getSubjects(login, password);
+      const data = await adminApi.getSubjects();
       setSubjects(data);
     } catch (error: any) {
       alert(error.response?.data?.detail || 'Failed to fetch subjects');
@@ -42,7 +40,7 @@ export const SubjectsPage: React.FC = () => {
   const fetchTopics = async (subjectId: number) => {
     setLoadingTopics(true);
     try {
-      const data = await adminApi.getTopicsBySubject(subjectId, login, password);
+      const data = await adminApi.getTopicsBySubject(subjectId);
       setTopics(data);
       setSelectedSubjectId(subjectId);
     } catch (error: any) {
@@ -58,7 +56,7 @@ export const SubjectsPage: React.FC = () => {
 
     setCreating(true);
     try {
-      await adminApi.createSubject(newSubjectName.trim(), login, password);
+      await adminApi.createSubject(newSubjectName.trim());
       setNewSubjectName('');
       await fetchSubjects();
       alert('Subject created successfully!');
@@ -84,9 +82,7 @@ export const SubjectsPage: React.FC = () => {
       await adminApi.createTopic(
         selectedSubjectId,
         topicNum,
-        newTopicName.trim(),
-        login,
-        password
+        newTopicName.trim()
       );
       setNewTopicName('');
       setNewTopicNumber('');
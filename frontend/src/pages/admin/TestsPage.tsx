@@ -1,17 +1,15 @@
 import { useEffect, useState } from 'react';
-import { useAuthStore } from '../../store/authStore';
 import { adminApi } from '../../api/admin.api';
-import type { Test, Subject, Student, Group } from '../../types';
+import type { Test, Subject, Student, Group, GroupOTPResponse } from '../../types';
 import { Card, CardHeader, CardTitle, CardContent } from '../../components/ui/Card';
 import { Button } from '../../components/ui/Button';
 import { Input } from '../../components/ui/Input';
 import { Loading } from '../../components/ui/Loading';
 import { Badge } from '../../components/ui/Badge';
-import { Plus, FileText, Key } from 'lucide-react';
+import { Plus, FileText, Key, Printer } from 'lucide-react';
 import { motion } from 'framer-motion';
 
 export const TestsPage: React.FC = () => {
-  const { login, password } = useAuthStore();
   const [tests, setTests] = useState<Test[]>([]);
   const [subjects, setSubjects] = useState<Subject[]>([]);
   const [groups, setGroups] = useState<Group[]>([]);
@@ -19,6 +17,7 @@ export const TestsPage: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [creating, setCreating] = useState(false);
   const [generatingOTP, setGeneratingOTP] = useState(false);
+  const [generatingGroupOTPs, setGeneratingGroupOTPs] = useState(false);
 
   const [newTestName, setNewTestName] = useState('');
   const [selectedSubjectId, setSelectedSubjectId] = useState('');
@@ -36,9 +35,9 @@ export const TestsPage: React.FC = () => {
   const fetchData = async () => {
     try {
       const [testsData, subjectsData, groupsData] = await Promise.all([
-        adminApi.getTests(login, password),
-        adminApi.getSubjects(login, password),
-        adminApi.getGroups(login, password),
+        adminApi.getTests(),
+        adminApi.getSubjects(),
+        adminApi.getGroups(),
       ]);
       setTests(testsData);
       setSubjects(subjectsData);
@@ -52,7 +51,7 @@ export const TestsPage: React.FC = () => {
 
   const fetchStudents = async (groupId: number) => {
     try {
-      const data = await adminApi.getStudentsByGroup(groupId, login, password);
+      const data = await adminApi.getStudentsByGroup(groupId);
       setStudents(data);
     } catch (error: any) {
       alert(error.response?.data?.detail || 'Failed to fetch students');
@@ -88,9 +87,7 @@ export const TestsPage: React.FC = () => {
         newTestName.trim(),
         parseInt(selectedSubjectId),
         durationNum,
-        topicsArray,
-        login,
-        password
+        topicsArray
       );
       setNewTestName('');
       setSelectedSubjectId('');
@@ -115,9 +112,7 @@ export const TestsPage: React.FC = () => {
     try {
       const result = await adminApi.generateOTP(
         parseInt(otpStudentId),
-        parseInt(otpTestId),
-        login,
-        password
+        parseInt(otpTestId)
       );
       alert(
         `OTP Generated!\n\nSession ID: ${result.session_id}\nOTP: ${result.otp}\nExpires: ${new Date(result.expires_at).toLocaleString()}`
@@ -129,6 +124,63 @@ export const TestsPage: React.FC = () => {
     }
   };
 
+  const printRoster = (roster: GroupOTPResponse) => {
+    const rows = roster.students
+      .map(
+        (entry, index) =>
+          `<tr><td>${index + 1}</td><td>${entry.full_name}</td><td>${entry.session_id}</td><td class="otp">${entry.otp}</td></tr>`
+      )
+      .join('');
+    const printWindow = window.open('', '_blank');
+    if (!printWindow) {
+      alert('Please allow pop-ups to print the roster');
+      return;
+    }
+    printWindow.document.write(`
+      <html>
+        <head>
+          <title>${roster.group_name} - ${roster.test_name}</title>
+          <style>
+            body { font-family: sans-serif; padding: 24px; }
+            table { width: 100%; border-collapse: collapse; }
+            th, td { border: 1px solid #999; padding: 8px; text-align: left; }
+            .otp { font-family: monospace; font-size: 18px; letter-spacing: 2px; }
+          </style>
+        </head>
+        <body>
+          <h2>${roster.group_name} - ${roster.test_name}</h2>
+          <p>Expires: ${new Date(roster.expires_at).toLocaleString()}</p>
+          <table>
+            <thead><tr><th>#</th><th>Student</th><th>Session ID</th><th>OTP</th></tr></thead>
+            <tbody>${rows}</tbody>
+          </table>
+        </body>
+      </html>
+    `);
+    printWindow.document.close();
+    printWindow.print();
+  };
+
+  const handleGenerateGroupOTPs = async () => {
+    if (!selectedGroupForOTP || !otpTestId) {
+      alert('Please select both group and test');
+      return;
+    }
+
+    setGeneratingGroupOTPs(true);
+    try {
+      const roster = await adminApi.generateGroupOTPs(
+        parseInt(selectedGroupForOTP),
+        parseInt(otpTestId)
+      );
+      printRoster(roster);
+    } catch (error: any) {
+      alert(error.response?.data?.detail || 'Failed to generate OTPs');
+    } finally {
+      setGeneratingGroupOTPs(false);
+    }
+  };
+
   if (loading) {
     return <Loading size="xl" text="Loading tests..." fullScreen />;
   }
@@ -289,6 +341,18 @@ export const TestsPage: React.FC = () => {
               >
                 Generate OTP
               </Button>
+
+              <Button
+                variant="secondary"
+                size="lg"
+                className="w-full"
+                leftIcon={<Printer />}
+                onClick={handleGenerateGroupOTPs}
+                isLoading={generatingGroupOTPs}
+                disabled={!selectedGroupForOTP || !otpTestId}
+              >
+                Generate OTPs for whole group
+              </Button>
             </CardContent>
           </Card>
         </motion.div>
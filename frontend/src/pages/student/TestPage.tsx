@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { testApi } from '../../api/test.api';
 import { useTestStore } from '../../store/testStore';
@@ -9,6 +9,16 @@ import { Badge } from '../../components/ui/Badge';
 import { Clock, ChevronLeft, ChevronRight, CheckCircle } from 'lucide-react';
 import { motion } from 'framer-motion';
 
+// Answers are sent in the background so a lost final submit loses little
+const AUTOSAVE_INTERVAL_MS = 15000;
+
+// Only for sessions started before the server tracked deadlines
+const FALLBACK_DURATION_SECONDS = 30 * 60;
+
+// Server timestamps are naive UTC with microseconds; keep millisecond precision.
+// Both values are parsed the same way, so the timezone cancels out in the difference.
+const parseServerTime = (value: string) => Date.parse(value.slice(0, 23));
+
 export const TestPage: React.FC = () => {
   const { sessionId } = useParams<{ sessionId: string }>();
   const navigate = useNavigate();
@@ -22,12 +32,16 @@ export const TestPage: React.FC = () => {
     nextQuestion,
     previousQuestion,
     setTimeRemaining,
-    decrementTime,
   } = useTestStore();
 
   const [loading, setLoading] = useState(true);
   const [submitting, setSubmitting] = useState(false);
   const [selectedAnswer, setSelectedAnswer] = useState('');
+  // Local clock time at which the server deadline is reached
+  const deadlineRef = useRef<number | null>(null);
+  // Last answer sent to the server for each question
+  const savedAnswersRef = useRef(new Map<number, string>());
+  const finishingRef = useRef(false);
 
   useEffect(() => {
     if (sessionId) {
@@ -35,16 +49,27 @@ export const TestPage: React.FC = () => {
     }
   }, [sessionId]);
 
+  // The countdown is recomputed from the deadline, so throttled tabs don't drift
   useEffect(() => {
-    if (timeRemaining > 0) {
-      const timer = setInterval(() => {
-        decrementTime();
-      }, 1000);
-      return () => clearInterval(timer);
-    } else if (timeRemaining === 0 && questions.length > 0) {
-      handleFinish();
-    }
-  }, [timeRemaining]);
+    if (loading || deadlineRef.current === null) return;
+    const timer = setInterval(() => {
+      const remaining = Math.ceil((deadlineRef.current! - Date.now()) / 1000);
+      setTimeRemaining(Math.max(remaining, 0));
+      if (remaining <= 0) {
+        clearInterval(timer);
+        finishTest(true);
+      }
+    }, 1000);
+    return () => clearInterval(timer);
+  }, [loading]);
+
+  useEffect(() => {
+    if (loading) return;
+    const timer = setInterval(() => {
+      saveAnswers().catch((error) => console.error('Failed to save answers:', error));
+    }, AUTOSAVE_INTERVAL_MS);
+    return () => clearInterval(timer);
+  }, [loading]);
 
   useEffect(() => {
     const currentQuestion = questions[currentQuestionIndex];
@@ -56,9 +81,18 @@ export const TestPage: React.FC = () => {
 
   const fetchQuestions = async () => {
     try {
-      const data = await testApi.getQuestions(parseInt(sessionId!));
+      const [data, session] = await Promise.all([
+        testApi.getQuestions(parseInt(sessionId!)),
+        testApi.getSession(parseInt(sessionId!)),
+      ]);
+      // Remaining time comes from the server's deadline, which survives a page refresh
+      const remainingMs =
+        session.deadline_at && session.server_time
+          ? parseServerTime(session.deadline_at) - parseServerTime(session.server_time)
+          : FALLBACK_DURATION_SECONDS * 1000;
+      deadlineRef.current = Date.now() + remainingMs;
       setQuestions(data);
-      setTimeRemaining(30 * 60);
+      setTimeRemaining(Math.max(Math.ceil(remainingMs / 1000), 0));
     } catch (error: any) {
       alert(error.response?.data?.detail || 'Failed to load test');
       navigate('/student');
@@ -73,20 +107,43 @@ export const TestPage: React.FC = () => {
     submitAnswer(currentQuestion.id, answer);
   };
 
-  const handleFinish = async () => {
-    if (!confirm('Are you sure you want to finish the test?')) return;
+  // Sends only answers that changed since the last successful save
+  const saveAnswers = async () => {
+    const pending = useTestStore
+      .getState()
+      .answers.filter((a) => savedAnswersRef.current.get(a.questionId) !== a.answer);
+    if (pending.length === 0) return;
+    await testApi.submitAnswers(parseInt(sessionId!), pending);
+    pending.forEach((a) => savedAnswersRef.current.set(a.questionId, a.answer));
+  };
+
+  const finishTest = async (timeUp: boolean) => {
+    if (finishingRef.current) return;
+    if (!timeUp && !confirm('Are you sure you want to finish the test?')) return;
 
+    finishingRef.current = true;
     setSubmitting(true);
     try {
+      try {
+        await saveAnswers();
+      } catch (error) {
+        // When time is up the server may already have closed the session;
+        // autosaved answers are kept, so the test is still finished
+        if (!timeUp) throw error;
+        console.error('Failed to save final answers:', error);
+      }
       await testApi.finishTest(parseInt(sessionId!));
       navigate(`/result/${sessionId}`);
     } catch (error: any) {
+      finishingRef.current = false;
       alert(error.response?.data?.detail || 'Failed to submit test');
     } finally {
       setSubmitting(false);
     }
   };
 
+  const handleFinish = () => finishTest(false);
+
   const formatTime = (seconds: number) => {
     const mins = Math.floor(seconds / 60);
     const secs = seconds % 60;
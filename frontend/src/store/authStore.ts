@@ -2,22 +2,22 @@ import { create } from 'zustand';
 import { persist } from 'zustand/middleware';
 
 interface AuthState {
-  login: string;
-  password: string;
+  token: string;
+  expiresAt: string;
   isAuthenticated: boolean;
-  setAuth: (login: string, password: string) => void;
+  setAuth: (token: string, expiresAt: string) => void;
   logout: () => void;
 }
 
 export const useAuthStore = create<AuthState>()(
   persist(
     (set) => ({
-      login: '',
-      password: '',
+      token: '',
+      expiresAt: '',
       isAuthenticated: false,
-      setAuth: (login, password) =>
-        set({ login, password, isAuthenticated: true }),
-      logout: () => set({ login: '', password: '', isAuthenticated: false }),
+      setAuth: (token, expiresAt) =>
+        set({ token, expiresAt, isAuthenticated: true }),
+      logout: () => set({ token: '', expiresAt: '', isAuthenticated: false }),
     }),
     {
       name: 'admin-auth',
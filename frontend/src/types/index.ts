@@ -52,6 +52,13 @@ export interface Question {
   options: QuestionOption[];
 }
 
+// Admin auth types
+export interface AdminTokenResponse {
+  access_token: string;
+  token_type: string;
+  expires_at: string;
+}
+
 // OTP types
 export interface OTPResponse {
   session_id: number;
@@ -60,6 +67,24 @@ export interface OTPResponse {
   success: boolean;
 }
 
+export interface GroupOTPRosterEntry {
+  student_id: number;
+  full_name: string;
+  session_id: number;
+  otp: string;
+  expires_at: string;
+}
+
+export interface GroupOTPResponse {
+  group_id: number;
+  group_name: string;
+  test_id: number;
+  test_name: string;
+  expires_at: string;
+  students: GroupOTPRosterEntry[];
+  success: boolean;
+}
+
 // Result types
 export interface Result {
   id: number;
@@ -71,6 +96,20 @@ export interface Result {
   created_at?: string;
 }
 
+// Keyset pagination for admin lists
+export interface PageParams {
+  after_id?: number;
+  limit?: number;
+  sort?: 'id' | '-id';
+  include_total?: boolean;
+}
+
+export interface Page<T> {
+  items: T[];
+  nextAfterId: number | null;
+  total: number | null;
+}
+
 export interface TestResultResponse {
   correct_count: number;
   total_count: number;
@@ -91,4 +130,6 @@ export interface TestSession {
   otp: string;
   started_at?: string;
   expires_at: string;
+  deadline_at?: string;
+  server_time?: string;
 }